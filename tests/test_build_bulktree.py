@@ -0,0 +1,92 @@
+import json
+import random
+from toolbox.api.datagalaxy_api import build_bulktree, handle_timeserie, PATH_SEPARATOR
+
+
+# Reference: the original builder, scanning the children linearly
+
+def reference_build_bulktree(objects):
+    root = []
+
+    def find_or_create_child(children, path_segment, type_segment, functional_path_segment, attributes, dpis):
+        for child in children:
+            if child['technicalName'] == path_segment and child['type'] == type_segment:
+                for key, value in attributes.items():
+                    child.setdefault(key, value)
+                    handle_timeserie(child)
+                return child
+        new_child = {
+            'name': functional_path_segment,
+            'technicalName': path_segment,
+            'type': type_segment,
+            **attributes,
+            'children': []
+        }
+        if dpis is not None:
+            new_child['dataProcessingItems'] = dpis
+        handle_timeserie(new_child)
+        children.append(new_child)
+        return new_child
+
+    for obj in objects:
+        path_segments = obj['path'][1:].split(PATH_SEPARATOR)
+        type_segments = obj['typePath'][1:].split(PATH_SEPARATOR)
+        functional_path_segments = obj['functionalPath'][1:].split(PATH_SEPARATOR)
+        attributes = obj.get('attributes')
+        dpis = obj.get('dataProcessingItems')
+        current_level = root
+        for i, (path_segment, type_segment, functional_path_segment) in enumerate(zip(path_segments, type_segments, functional_path_segments)):
+            attributes_to_send = attributes if i == (len(path_segments) - 1) else {}
+            dpis_to_send = dpis if i == (len(path_segments) - 1) else None
+            next_node = find_or_create_child(current_level, path_segment, type_segment, functional_path_segment, attributes_to_send, dpis_to_send)
+            current_level = next_node['children']
+    return root
+
+
+def random_objects(seed, count):
+    generator = random.Random(seed)
+    objects = []
+    for _ in range(count):
+        depth = generator.randint(1, 4)
+        names = [f"n{generator.randint(0, 3)}" for _ in range(depth)]
+        types = [generator.choice(['Table', 'View', 'Column']) for _ in range(depth)]
+        attributes = {'description': f"d{generator.randint(0, 9)}"}
+        if generator.random() < 0.3:
+            attributes['timeserie'] = {'lastEntry': {'date': '2024-01-01', 'value': generator.randint(0, 9)}}
+        if generator.random() < 0.1:
+            attributes['emptyTimeserie'] = {'lastEntry': None}
+        obj = {
+            'path': '\\' + '\\'.join(names),
+            'typePath': '\\' + '\\'.join(types),
+            'functionalPath': '\\' + '\\'.join(name.upper() for name in names),
+            'attributes': attributes
+        }
+        if generator.random() < 0.2:
+            obj['dataProcessingItems'] = [{'name': 'dpi'}]
+        objects.append(obj)
+    return objects
+
+
+# Scenarios
+
+def test_build_bulktree_matches_reference_builder():
+    for seed in range(20):
+        expected = json.dumps(reference_build_bulktree(random_objects(seed, 200)))
+        assert json.dumps(build_bulktree(random_objects(seed, 200))) == expected
+
+
+def test_build_bulktree_merges_attributes_of_existing_nodes():
+    objects = [
+        {'path': '\\source\\table', 'typePath': '\\Relational\\Table', 'functionalPath': '\\Source\\Table', 'attributes': {'a': 1}},
+        {'path': '\\source', 'typePath': '\\Relational', 'functionalPath': '\\Source', 'attributes': {'b': {'lastEntry': None}}}
+    ]
+
+    tree = build_bulktree(objects)
+
+    assert tree == [{
+        'name': 'Source',
+        'technicalName': 'source',
+        'type': 'Relational',
+        'children': [{'name': 'Table', 'technicalName': 'table', 'type': 'Table', 'a': 1, 'children': []}],
+        'b': ''
+    }]
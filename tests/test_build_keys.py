@@ -0,0 +1,64 @@
+from toolbox.api.datagalaxy_api import index_paths
+from toolbox.commands.copy_module import build_keys
+
+
+# Mocks
+
+structures = [
+    [{'id': 'table1', 'path': '\\source\\schema\\table1'}],
+    [{'id': 'table2', 'path': '\\source\\schema\\table2'}]
+]
+
+primary_keys = [{
+    'technicalName': 'pk_table1',
+    'table': {'id': 'table1'},
+    'columns': [{'technicalName': 'id', 'pkOrder': 1}, {'technicalName': 'code', 'pkOrder': 2}]
+}]
+
+foreign_keys = [
+    {
+        'technicalName': 'fk_table2_table1',
+        'displayName': 'FK table2 table1',
+        'columns': [{'technicalName': 'table1_id'}],
+        'primaryKey': {'technicalName': 'pk_table1'},
+        'parents': {'structure': {'id': 'table1'}, 'columns': [{'technicalName': 'id'}]},
+        'children': {'structure': {'id': 'table2'}, 'columns': [{'technicalName': 'table1_id'}]}
+    },
+    {
+        'technicalName': 'functional',
+        'displayName': 'functional',
+        'columns': []
+    }
+]
+
+
+# Scenarios
+
+def test_index_paths():
+    assert index_paths(structures) == {'table1': '\\source\\schema\\table1', 'table2': '\\source\\schema\\table2'}
+
+
+def test_build_keys_resolves_the_table_paths():
+    pks, fks = build_keys('\\source', structures, primary_keys, foreign_keys)
+
+    assert pks == [
+        {'tablePath': '\\schema\\table1', 'columnName': 'id', 'pkName': 'pk_table1', 'pkOrder': 1},
+        {'tablePath': '\\schema\\table1', 'columnName': 'code', 'pkName': 'pk_table1', 'pkOrder': 2}
+    ]
+    assert fks == [{
+        'fkTechnicalName': 'fk_table2_table1',
+        'pkTechnicalName': 'pk_table1',
+        'pkTablePath': '\\schema\\table1',
+        'pkColumnName': 'id',
+        'fkTablePath': '\\schema\\table2',
+        'fkColumnName': 'table1_id',
+        'fkDisplayName': 'FK table2 table1'
+    }]
+
+
+def test_build_keys_with_a_shared_index_and_an_unknown_table():
+    unknown_table_key = dict(primary_keys[0], table={'id': 'unknown'})
+
+    pks, fks = build_keys('\\source', [], [unknown_table_key], [], table_paths=index_paths(structures))
+
+    assert pks[0]['tablePath'] == ''
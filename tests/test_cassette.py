@@ -0,0 +1,70 @@
+import gzip
+import io
+import json
+import pytest
+import requests
+from toolbox.api.cassette import CassettePlayer, CassetteRecorder
+from toolbox.api.datagalaxy_api_modules import DataGalaxyApiModules
+from toolbox.api.http_client import HttpClient
+
+
+# Mocks
+
+def make_page_response(results, next_page=None):
+    response = requests.Response()
+    response.status_code = 200
+    response.reason = 'OK'
+    response.headers['Content-Type'] = 'application/json'
+    response.raw = io.BytesIO(json.dumps({'results': results, 'next_page': next_page}).encode('utf-8'))
+    return response
+
+
+def make_modules_api(http_client):
+    return DataGalaxyApiModules(
+        url='https://api.datagalaxy.com/v2',
+        token='secret-token',
+        workspace={'versionId': 'versionId'},
+        module="Glossary",
+        http_client=http_client
+    )
+
+
+# Scenarios
+
+def test_record_then_replay_without_network(mocker, tmp_path):
+    cassette = str(tmp_path / 'run.cassette.gz')
+    request_mock = mocker.patch.object(requests.Session, 'request', autospec=True)
+    request_mock.side_effect = [
+        make_page_response([{'id': '1', 'name': 'Données'}], next_page='https://api.datagalaxy.com/v2/properties?page=2'),
+        make_page_response([{'id': '2'}]),
+        make_page_response([], next_page=None)
+    ]
+    recording_client = HttpClient(recorder=CassetteRecorder(cassette))
+    recorded = make_modules_api(recording_client).list_objects('workspace')
+    recording_client.post('https://api.datagalaxy.com/v2/properties/bulktree/versionId', json=[{'name': 'a'}], headers={'Authorization': 'Bearer secret-token'})
+    recording_client.close()
+
+    with gzip.open(cassette, 'rt', encoding='utf-8') as file:
+        content = file.read()
+    assert 'secret-token' not in content
+    assert len(content.splitlines()) == 3
+
+    request_mock.reset_mock()
+    sleep_mock = mocker.Mock()
+    replaying_client = HttpClient(player=CassettePlayer(cassette, latency_scale=2, sleep=sleep_mock))
+    replayed = make_modules_api(replaying_client).list_objects('workspace')
+    response = replaying_client.post('https://api.datagalaxy.com/v2/properties/bulktree/versionId', json=[{'name': 'a'}])
+
+    assert replayed == recorded
+    assert response.json() == {'results': [], 'next_page': None}
+    assert request_mock.call_count == 0
+    assert sleep_mock.call_count == 3
+
+
+def test_replay_fails_for_unknown_requests(mocker, tmp_path):
+    cassette = str(tmp_path / 'empty.cassette.gz')
+    CassetteRecorder(cassette).close()
+    http_client = HttpClient(player=CassettePlayer(cassette))
+
+    with pytest.raises(Exception, match='No response recorded'):
+        http_client.get('https://api.datagalaxy.com/v2/workspaces')
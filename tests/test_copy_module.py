@@ -1,15 +1,31 @@
-from toolbox.api.datagalaxy_api_modules import DataGalaxyApiModules
+import threading
+
+from toolbox.api.datagalaxy_api_modules import DataGalaxyApiModules, ModulesOptions
 from toolbox.api.datagalaxy_api_workspaces import DataGalaxyApiWorkspace
 from toolbox.api.http_client import HttpClient
-from toolbox.commands.copy_module import copy_module
+from toolbox.api.state_store import StateStore
+from toolbox.commands.copy_module import copy_module, fetch_source_children, handle_dpis, index_dpis, stream_dpis, upload_source
+from toolbox.commands.utils import Progress
 
 
 # Mocks
 
 def mock_list_objects_on_source_workspace(self, workspace_name):
     if workspace_name == 'workspace_source':
-        return [['object1', 'object2', 'object']]
-    return []
+        return iter([['object1', 'object2', 'object']])
+    return iter([])
+
+
+def mock_bulk_upsert_tree(uploaded):
+    # Keeps the pages of each call, each page being reported once "uploaded"
+    def bulk_upsert_tree(self, workspace_name, objects, tag_value, on_uploaded=None):
+        pages = []
+        for page in objects:
+            pages.append(list(page))
+            if on_uploaded is not None:
+                on_uploaded(page)
+        uploaded.append(pages)
+    return bulk_upsert_tree
 
 
 # Scenarios
@@ -22,7 +38,7 @@ def test_copy_objects_when_no_object_on_target(mocker):
     workspace_source_mock.return_value = {'name': 'workspace', 'defaultVersionId': 'versionId', 'isVersioningEnabled': False}
     objects_on_source_workspace_mock = mocker.patch.object(
         DataGalaxyApiModules,
-        'list_objects',
+        'iter_pages',
         autospec=True
     )
     objects_on_source_workspace_mock.side_effect = mock_list_objects_on_source_workspace
@@ -54,3 +70,338 @@ def test_copy_objects_when_no_object_on_target(mocker):
     assert result == 0
     assert objects_on_source_workspace_mock.call_count == 1
     assert bulk_upsert_objects_on_target_workspace_mock.call_count == 1
+
+
+def mock_list_children_objects(self, workspace_name, parent_id, object_type, include_links=False):
+    return [[{'id': f'{parent_id}-{object_type}', 'path': f'\\{parent_id}\\{object_type}'}]]
+
+
+def test_copy_dictionary_with_async_engine(mocker):
+    # GIVEN
+    workspace_source_mock = mocker.patch.object(DataGalaxyApiWorkspace, 'get_workspace', autospec=True)
+    workspace_source_mock.return_value = {'name': 'workspace', 'defaultVersionId': 'versionId', 'isVersioningEnabled': False}
+    list_objects_mock = mocker.patch.object(DataGalaxyApiModules, 'iter_pages', autospec=True)
+    list_objects_mock.return_value = iter([[{'id': 'source1', 'path': '\\source1'}, {'id': 'source2', 'path': '\\source2'}]])
+    list_children_mock = mocker.patch.object(DataGalaxyApiModules, 'list_children_objects', autospec=True)
+    list_children_mock.side_effect = mock_list_children_objects
+    list_keys_mock = mocker.patch.object(DataGalaxyApiModules, 'list_keys', autospec=True)
+    list_keys_mock.return_value = []
+    create_source_mock = mocker.patch.object(DataGalaxyApiModules, 'create_source', autospec=True)
+    create_source_mock.return_value = 'new_id'
+    bulk_upsert_source_tree_mock = mocker.patch.object(DataGalaxyApiModules, 'bulk_upsert_source_tree', autospec=True)
+    create_keys_mock = mocker.patch.object(DataGalaxyApiModules, 'create_keys', autospec=True)
+
+    # THEN
+    http_client = HttpClient(verify_ssl=True)
+    result = copy_module(
+        module="Dictionary",
+        url_source='url_source',
+        token_source='token_source',
+        url_target='url_target',
+        token_target='token_target',
+        workspace_source_name='workspace_source',
+        version_source_name=None,
+        workspace_target_name='workspace_target',
+        version_target_name=None,
+        tag_value=None,
+        http_client=http_client,
+        engine="async"
+    )
+
+    # ASSERT / VERIFY
+    assert result == 0
+    assert list_children_mock.call_count == 6
+    assert list_keys_mock.call_count == 4
+    assert create_source_mock.call_count == 2
+    assert create_keys_mock.call_count == 0
+    uploaded = sorted(call.kwargs['source']['id'] for call in bulk_upsert_source_tree_mock.call_args_list)
+    assert uploaded == ['source1', 'source2']
+    objects = bulk_upsert_source_tree_mock.call_args_list[0].kwargs['objects']
+    assert [page[0]['id'].split('-')[1] for page in objects] == ['containers', 'structures', 'fields']
+
+
+def test_copy_dictionary_with_workers_keeps_the_order_of_the_writes_of_each_source(mocker):
+    # GIVEN
+    workspace_source_mock = mocker.patch.object(DataGalaxyApiWorkspace, 'get_workspace', autospec=True)
+    workspace_source_mock.return_value = {'name': 'workspace', 'defaultVersionId': 'versionId', 'isVersioningEnabled': False}
+    sources = [{'id': f'source{index}', 'path': f'\\source{index}'} for index in range(6)]
+    list_objects_mock = mocker.patch.object(DataGalaxyApiModules, 'iter_pages', autospec=True)
+    list_objects_mock.return_value = iter([sources[:3], sources[3:]])
+    list_children_mock = mocker.patch.object(DataGalaxyApiModules, 'iter_children_pages', autospec=True)
+    list_children_mock.side_effect = lambda self, workspace_name, parent_id, object_type: iter(
+        [[{'id': f'{parent_id}-{object_type}', 'path': f'\\{parent_id}\\{object_type}'}]])
+    list_keys_mock = mocker.patch.object(DataGalaxyApiModules, 'list_keys', autospec=True)
+    list_keys_mock.side_effect = lambda self, workspace_name, source_id, mode: [{
+        'technicalName': f'{mode}_key', 'table': {'id': f'{source_id}-structures'}, 'columns': [{'technicalName': 'column', 'pkOrder': 1}]
+    }] if mode == 'primary' else []
+    writes = []
+    create_source_mock = mocker.patch.object(DataGalaxyApiModules, 'create_source', autospec=True)
+    create_source_mock.side_effect = lambda self, workspace_name, source: writes.append((source['id'], 'source')) or source['id']
+    bulk_upsert_source_tree_mock = mocker.patch.object(DataGalaxyApiModules, 'bulk_upsert_source_tree', autospec=True)
+    bulk_upsert_source_tree_mock.side_effect = \
+        lambda self, workspace_name, source, objects, tag_value, on_uploaded: writes.append((source['id'], 'tree', list(objects)))
+    create_keys_mock = mocker.patch.object(DataGalaxyApiModules, 'create_keys', autospec=True)
+    create_keys_mock.side_effect = lambda self, workspace_name, source_id, keys, mode: writes.append((source_id, mode, keys))
+
+    # THEN
+    http_client = HttpClient(verify_ssl=True)
+    result = copy_module(
+        module="Dictionary",
+        url_source='url_source',
+        token_source='token_source',
+        url_target='url_target',
+        token_target='token_target',
+        workspace_source_name='workspace_source',
+        version_source_name=None,
+        workspace_target_name='workspace_target',
+        version_target_name=None,
+        tag_value=None,
+        http_client=http_client,
+        workers=3
+    )
+
+    # ASSERT / VERIFY
+    assert result == 0
+    assert list_children_mock.call_count == 18
+    assert list_keys_mock.call_count == 12
+    for source in sources:
+        assert [write[1] for write in writes if write[0] == source['id']] == ['source', 'tree', 'primary']
+    # The children are streamed to the upload, the paths of the structures are indexed on the way
+    uploaded_pages = [write[2] for write in writes if write[:2] == ('source0', 'tree')][0]
+    assert [page[0]['id'] for page in uploaded_pages] == ['source0-containers', 'source0-structures', 'source0-fields']
+    primary_keys = [write[2] for write in writes if write[:2] == ('source0', 'primary')][0]
+    assert primary_keys[0]['tablePath'] == '\\structures'
+
+
+def test_handle_dpis_attaches_the_items_of_each_dp_with_workers(mocker):
+    # GIVEN
+    list_object_items_mock = mocker.patch.object(DataGalaxyApiModules, 'list_object_items', autospec=True)
+    list_object_items_mock.side_effect = lambda self, workspace_name, parent_id: [] if parent_id == 'dp2' else [{'id': f'{parent_id}-item'}]
+    objects = [
+        [{'id': 'dp0', 'type': 'DataProcessing'}, {'id': 'flow', 'type': 'DataFlow'}],
+        [{'id': f'dp{index}', 'type': 'DataProcessing'} for index in range(1, 20)]
+    ]
+    module_api = DataGalaxyApiModules(url='url', token='token', workspace={'versionId': 'versionId'}, module="DataProcessing", http_client=HttpClient())
+
+    # THEN
+    handle_dpis(objects, module_api, 'workspace', workers=4)
+
+    # ASSERT / VERIFY
+    assert list_object_items_mock.call_count == 20
+    assert 'dataProcessingItems' not in objects[0][1]
+    assert 'dataProcessingItems' not in objects[1][1]
+    for dp in objects[0][:1] + objects[1][:1] + objects[1][2:]:
+        assert dp['dataProcessingItems'] == [{'id': f"{dp['id']}-item"}]
+
+
+def test_progress_reports_the_rate():
+    now = [0]
+    progress = Progress('test', 10, 'DPs', clock=lambda: now[0])
+    now[0] = 2
+    progress.advance(5)
+
+    assert progress.done == 5
+    assert progress.rate() == 2.5
+
+
+def test_index_dpis_falls_back_to_per_dp_listing(mocker):
+    index_object_items_mock = mocker.patch.object(DataGalaxyApiModules, 'index_object_items', autospec=True)
+    index_object_items_mock.return_value = None
+    module_api = DataGalaxyApiModules(url='url', token='token', workspace={'versionId': 'versionId'}, module="DataProcessing", http_client=HttpClient())
+
+    assert index_dpis([[{'id': 'dp', 'type': 'DataProcessing', 'path': '\\dp'}]], module_api, 'workspace', 1024) is False
+    assert index_dpis([[{'id': 'dp', 'type': 'DataProcessing', 'path': '\\dp'}]], module_api, 'workspace', 0) is False
+    assert index_object_items_mock.call_count == 1
+
+    index_object_items_mock.return_value = {'dp': [{'id': 'item'}]}
+    objects = [[{'id': 'dp', 'type': 'DataProcessing', 'path': '\\dp'}, {'id': 'flow', 'type': 'DataFlow', 'path': '\\flow'}]]
+    assert index_dpis(objects, module_api, 'workspace', 1024) is True
+    assert objects[0][0]['dataProcessingItems'] == [{'id': 'item'}]
+
+
+def test_stream_dpis_fetches_the_items_page_by_page(mocker):
+    list_object_items_mock = mocker.patch.object(DataGalaxyApiModules, 'list_object_items', autospec=True)
+    list_object_items_mock.side_effect = lambda self, workspace_name, parent_id: [{'id': f'{parent_id}-item'}]
+    pages = [[{'id': 'dp1', 'type': 'DataProcessing'}], [{'id': 'dp2', 'type': 'DataProcessing'}]]
+    module_api = DataGalaxyApiModules(url='url', token='token', workspace={'versionId': 'versionId'}, module="DataProcessing", http_client=HttpClient())
+
+    stream = stream_dpis(pages, module_api, 'workspace')
+    first_page = next(stream)
+
+    assert first_page[0]['dataProcessingItems'] == [{'id': 'dp1-item'}]
+    assert list_object_items_mock.call_count == 1
+    assert [page[0]['id'] for page in stream] == ['dp2']
+    assert pages == []
+
+
+def mock_list_objects_with_delta(self, workspace_name):
+    if workspace_name == 'workspace_source':
+        return iter([[{'path': '\\A', 'typePath': '\\Concept', 'attributes': {'summary': 'a'}},
+                      {'path': '\\B', 'typePath': '\\Concept', 'attributes': {'summary': 'b'}}]])
+    return iter([[{'path': '\\A', 'typePath': '\\Concept', 'attributes': {'summary': 'a'}}]])
+
+
+def test_copy_glossary_with_delta_uploads_only_the_changed_objects(mocker):
+    # GIVEN
+    workspace_source_mock = mocker.patch.object(DataGalaxyApiWorkspace, 'get_workspace', autospec=True)
+    workspace_source_mock.return_value = {'name': 'workspace', 'defaultVersionId': 'versionId', 'isVersioningEnabled': False}
+    iter_pages_mock = mocker.patch.object(DataGalaxyApiModules, 'iter_pages', autospec=True)
+    iter_pages_mock.side_effect = mock_list_objects_with_delta
+    uploaded = []
+    bulk_upsert_tree_mock = mocker.patch.object(DataGalaxyApiModules, 'bulk_upsert_tree', autospec=True)
+    bulk_upsert_tree_mock.side_effect = lambda self, workspace_name, objects, tag_value, on_uploaded: uploaded.extend(objects)
+
+    # THEN
+    result = copy_module(
+        module="Glossary",
+        url_source='url_source',
+        token_source='token_source',
+        url_target='url_target',
+        token_target='token_target',
+        workspace_source_name='workspace_source',
+        version_source_name=None,
+        workspace_target_name='workspace_target',
+        version_target_name=None,
+        tag_value=None,
+        http_client=HttpClient(verify_ssl=True),
+        delta=True
+    )
+
+    # ASSERT / VERIFY
+    assert result == 0
+    assert iter_pages_mock.call_count == 2
+    assert [[obj['path'] for obj in page] for page in uploaded] == [['\\B']]
+
+
+def test_copy_glossary_with_state_uploads_only_the_objects_changed_since_the_last_sync(mocker, tmp_path):
+    # GIVEN
+    workspace_source_mock = mocker.patch.object(DataGalaxyApiWorkspace, 'get_workspace', autospec=True)
+    workspace_source_mock.return_value = {'name': 'workspace', 'defaultVersionId': 'versionId', 'isVersioningEnabled': False}
+    iter_pages_mock = mocker.patch.object(DataGalaxyApiModules, 'iter_pages', autospec=True)
+    uploaded = []
+    bulk_upsert_tree_mock = mocker.patch.object(DataGalaxyApiModules, 'bulk_upsert_tree', autospec=True)
+    bulk_upsert_tree_mock.side_effect = mock_bulk_upsert_tree(uploaded)
+    options = ModulesOptions(state=StateStore(str(tmp_path / 'state.db')))
+
+    def run(objects):
+        iter_pages_mock.return_value = iter([objects])
+        return copy_module(
+            module="Glossary",
+            url_source='url_source',
+            token_source='token_source',
+            url_target='url_target',
+            token_target='token_target',
+            workspace_source_name='workspace_source',
+            version_source_name=None,
+            workspace_target_name='workspace_target',
+            version_target_name=None,
+            tag_value=None,
+            http_client=HttpClient(verify_ssl=True),
+            options=options
+        )
+
+    # THEN
+    run([{'path': '\\A', 'typePath': '\\Concept', 'attributes': {'summary': 'a'}},
+         {'path': '\\B', 'typePath': '\\Concept', 'attributes': {'summary': 'b'}}])
+    result = run([{'path': '\\A', 'typePath': '\\Concept', 'attributes': {'summary': 'a'}},
+                  {'path': '\\B', 'typePath': '\\Concept', 'attributes': {'summary': 'changed'}}])
+
+    # ASSERT / VERIFY
+    assert result == 0
+    # The target is never listed
+    assert iter_pages_mock.call_count == 2
+    assert [[obj['path'] for obj in page] for page in uploaded[0]] == [['\\A', '\\B']]
+    assert [[obj['path'] for obj in page] for page in uploaded[1]] == [['\\B']]
+    options.close()
+
+
+def test_upload_source_with_state_skips_the_source_and_keys_already_created(mocker, tmp_path):
+    # GIVEN
+    create_source_mock = mocker.patch.object(DataGalaxyApiModules, 'create_source', autospec=True)
+    create_source_mock.return_value = 'target_id'
+    mocker.patch.object(DataGalaxyApiModules, 'bulk_upsert_source_tree', autospec=True)
+    create_keys_mock = mocker.patch.object(DataGalaxyApiModules, 'create_keys', autospec=True)
+    module_api = DataGalaxyApiModules(url='url', token='token', workspace={'versionId': 'versionId'}, module='Dictionary',
+                                      http_client=HttpClient(verify_ssl=True))
+    store = StateStore(str(tmp_path / 'state.db'))
+    state = store.sync('url_source', 'version_source', 'url_target', 'version_target')
+    source = {'id': 'source_id', 'path': '\\Source', 'typePath': '\\Relational', 'attributes': {}}
+    children = {
+        'containers': [], 'structures': [[{'id': 'table_id', 'path': '\\Source\\Table'}]], 'fields': [],
+        'primary_keys': [{'technicalName': 'pk', 'table': {'id': 'table_id'}, 'columns': [{'technicalName': 'id', 'pkOrder': 1}]}],
+        'foreign_keys': []
+    }
+
+    # THEN
+    for _ in range(2):
+        upload_source(source, children, module_api, 'workspace_target', None, None, state)
+        store.flush()
+
+    # ASSERT / VERIFY
+    assert create_source_mock.call_count == 1
+    assert create_keys_mock.call_count == 1
+    assert state.target_id('source_id') == 'target_id'
+    store.close()
+
+
+def test_fetch_source_children_streams_the_children_listings_concurrently(mocker):
+    # GIVEN
+    # Each listing waits for the two others: they only complete if the three of them are fetched at the same time
+    barrier = threading.Barrier(3, timeout=5)
+
+    def mock_stream_pages(self, url, params):
+        barrier.wait()
+        yield [{'id': url}]
+
+    mocker.patch.object(DataGalaxyApiModules, '_stream_pages', autospec=True).side_effect = mock_stream_pages
+    mocker.patch.object(DataGalaxyApiModules, 'list_keys', autospec=True).return_value = []
+    module_api = DataGalaxyApiModules(url='url', token='token', workspace={'versionId': 'versionId'}, module='Dictionary',
+                                      http_client=HttpClient(verify_ssl=True))
+
+    # THEN
+    children = fetch_source_children({'id': 'source'}, module_api, 'workspace', stream=True)
+
+    # ASSERT / VERIFY
+    assert [list(children[object_type]) for object_type in ['containers', 'structures', 'fields']] == \
+        [[[{'id': 'url/containers'}]], [[{'id': 'url/structures'}]], [[{'id': 'url/fields'}]]]
+
+
+def test_copy_glossary_with_state_after_a_tagged_run_uploads_the_untagged_objects(mocker, tmp_path):
+    # GIVEN
+    workspace_source_mock = mocker.patch.object(DataGalaxyApiWorkspace, 'get_workspace', autospec=True)
+    workspace_source_mock.return_value = {'name': 'workspace', 'defaultVersionId': 'versionId', 'isVersioningEnabled': False}
+    iter_pages_mock = mocker.patch.object(DataGalaxyApiModules, 'iter_pages', autospec=True)
+    uploaded = []
+    bulk_upsert_tree_mock = mocker.patch.object(DataGalaxyApiModules, 'bulk_upsert_tree', autospec=True)
+    bulk_upsert_tree_mock.side_effect = mock_bulk_upsert_tree(uploaded)
+    options = ModulesOptions(state=StateStore(str(tmp_path / 'state.db')))
+    objects = [{'path': '\\A', 'typePath': '\\Concept', 'attributes': {'tags': ['red']}},
+               {'path': '\\B', 'typePath': '\\Concept', 'attributes': {}}]
+
+    def run(tag_value):
+        iter_pages_mock.return_value = iter([objects])
+        return copy_module(
+            module="Glossary",
+            url_source='url_source',
+            token_source='token_source',
+            url_target='url_target',
+            token_target='token_target',
+            workspace_source_name='workspace_source',
+            version_source_name=None,
+            workspace_target_name='workspace_target',
+            version_target_name=None,
+            tag_value=tag_value,
+            http_client=HttpClient(verify_ssl=True),
+            options=options
+        )
+
+    # THEN
+    run('red')
+    run(None)
+    run(None)
+
+    # ASSERT / VERIFY
+    # The tagged run does not count as a sync of the untagged objects
+    assert [[obj['path'] for obj in page] for page in uploaded[1]] == [['\\A', '\\B']]
+    assert uploaded[2] == []
+    options.close()
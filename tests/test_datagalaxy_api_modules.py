@@ -0,0 +1,204 @@
+import io
+import json
+import pytest
+import requests
+from toolbox.api.datagalaxy_api_modules import DataGalaxyApiModules, ModulesOptions
+from toolbox.api.http_client import HttpClient
+from toolbox.api.journal import Journal
+
+
+# Mocks
+
+def make_page_response(results, next_page=None, status_code=200):
+    response = requests.Response()
+    response.status_code = status_code
+    response.raw = io.BytesIO(json.dumps({'results': results, 'next_page': next_page}).encode('utf-8'))
+    return response
+
+
+def make_modules_api(module="Glossary", options=None):
+    return DataGalaxyApiModules(
+        url='https://api.datagalaxy.com/v2',
+        token='token',
+        workspace={'versionId': 'versionId'},
+        module=module,
+        http_client=HttpClient(),
+        options=options
+    )
+
+
+# Scenarios
+
+def test_list_objects_follows_next_page(mocker):
+    get_mock = mocker.patch.object(HttpClient, 'get', autospec=True)
+    get_mock.side_effect = [
+        make_page_response([{'id': '1'}, {'id': '2'}], next_page='https://api.datagalaxy.com/v2/properties?page=2'),
+        make_page_response([{'id': '3'}])
+    ]
+
+    pages = make_modules_api().list_objects('workspace')
+
+    assert pages == [[{'id': '1'}, {'id': '2'}], [{'id': '3'}]]
+    assert get_mock.call_args_list[0].args[1] == 'https://api.datagalaxy.com/v2/properties'
+    assert get_mock.call_args_list[0].kwargs['params']['includeAttributes'] == 'true'
+    assert get_mock.call_args_list[1].args[1] == 'https://api.datagalaxy.com/v2/properties?page=2'
+    assert get_mock.call_args_list[1].kwargs['params'] is None
+
+
+def test_list_children_objects_raises_api_error(mocker):
+    get_mock = mocker.patch.object(HttpClient, 'get', autospec=True)
+    response = requests.Response()
+    response.status_code = 403
+    response.raw = io.BytesIO(b'{"error": "Forbidden"}')
+    get_mock.return_value = response
+    close_spy = mocker.spy(response, 'close')
+
+    with pytest.raises(Exception, match='Forbidden'):
+        make_modules_api("Dictionary").list_children_objects('workspace', 'source_id', 'fields')
+    # The connection goes back to the pool
+    assert close_spy.call_count == 1
+
+
+def test_iter_objects_reads_pages_ahead_with_the_page_limit_of_the_endpoint(mocker):
+    get_mock = mocker.patch.object(HttpClient, 'get', autospec=True)
+    get_mock.side_effect = [
+        make_page_response([{'id': '1'}], next_page='https://api.datagalaxy.com/v2/properties?page=2'),
+        make_page_response([{'id': '2'}])
+    ]
+    modules_api = DataGalaxyApiModules(
+        url='https://api.datagalaxy.com/v2',
+        token='token',
+        workspace={'versionId': 'versionId'},
+        module="Glossary",
+        http_client=HttpClient(),
+        options=ModulesOptions(page_limits={'properties': 100}, read_ahead=2)
+    )
+
+    objects = list(modules_api.iter_objects('workspace'))
+
+    assert objects == [{'id': '1'}, {'id': '2'}]
+    assert get_mock.call_args_list[0].kwargs['params']['limit'] == '100'
+    assert modules_api.page_limit('fields') == 5000
+
+
+def test_prefetch_children_objects_lists_each_type_once_and_groups_by_source(mocker):
+    get_mock = mocker.patch.object(HttpClient, 'get', autospec=True)
+    get_mock.side_effect = lambda self, url, params=None, headers=None, stream=False: make_page_response([
+        {'id': f'{url}-1', 'path': '\\source1\\object'},
+        {'id': f'{url}-2', 'path': '\\source2\\object\\child'},
+        {'id': f'{url}-3', 'path': '\\unknown\\object'}
+    ])
+    modules_api = make_modules_api("Dictionary")
+    sources = [{'id': 'id1', 'path': '\\source1'}, {'id': 'id2', 'path': '\\source2'}, {'id': 'id3', 'path': '\\source3'}]
+
+    assert modules_api.prefetch_children_objects('workspace', sources, min_sources=2) is True
+    assert get_mock.call_count == 3
+    assert 'parentId' not in get_mock.call_args_list[0].kwargs['params']
+
+    fields = modules_api.list_children_objects('workspace', 'id2', 'fields')
+    assert fields == [[{'id': 'https://api.datagalaxy.com/v2/fields-2', 'path': '\\source2\\object\\child'}]]
+    assert modules_api.list_children_objects('workspace', 'id3', 'containers') == [[]]
+    assert get_mock.call_count == 3
+
+
+def test_prefetch_children_objects_keeps_per_source_listing_for_few_sources(mocker):
+    get_mock = mocker.patch.object(HttpClient, 'get', autospec=True)
+    get_mock.return_value = make_page_response([])
+    modules_api = make_modules_api("Dictionary")
+
+    assert modules_api.prefetch_children_objects('workspace', [{'id': 'id1', 'path': '\\source1'}]) is False
+    modules_api.list_children_objects('workspace', 'id1', 'fields')
+    assert get_mock.call_count == 1
+    assert get_mock.call_args.kwargs['params']['parentId'] == 'id1'
+
+
+def test_index_object_items_groups_the_items_of_the_version_by_parent(mocker):
+    get_mock = mocker.patch.object(HttpClient, 'get', autospec=True)
+    get_mock.side_effect = [
+        make_page_response([{'id': 'item1', 'path': '\\flow\\dp1\\item1'}, {'id': 'item2', 'parentId': 'dp2', 'path': '\\dp2\\item2'}],
+                           next_page='https://api.datagalaxy.com/v2/dataProcessingItem?page=2'),
+        make_page_response([{'id': 'item3', 'path': '\\flow\\dp1\\item3'}, {'id': 'item4', 'path': '\\other\\item4'}])
+    ]
+    dps = [{'id': 'dp1', 'path': '\\flow\\dp1'}, {'id': 'dp2', 'path': '\\dp2'}, {'id': 'dp3', 'path': '\\dp3'}]
+
+    index = make_modules_api("DataProcessing").index_object_items('workspace', dps, max_bytes=1024 * 1024)
+
+    assert {dp_id: [item['id'] for item in items] for dp_id, items in index.items()} == {'dp1': ['item1', 'item3'], 'dp2': ['item2'], 'dp3': []}
+    assert get_mock.call_args_list[0].args[1] == 'https://api.datagalaxy.com/v2/dataProcessingItem'
+    assert 'parentId' not in get_mock.call_args_list[0].kwargs['params']
+
+
+def test_index_object_items_gives_up_beyond_the_memory_budget(mocker):
+    get_mock = mocker.patch.object(HttpClient, 'get', autospec=True)
+    get_mock.return_value = make_page_response([{'id': 'item1', 'path': '\\dp1\\item1'}], next_page='https://api.datagalaxy.com/v2/dataProcessingItem?page=2')
+
+    index = make_modules_api("DataProcessing").index_object_items('workspace', [{'id': 'dp1', 'path': '\\dp1'}], max_bytes=10)
+
+    assert index is None
+
+
+def test_bulk_upsert_tree_reports_the_failed_pages(mocker):
+    post_mock = mocker.patch.object(HttpClient, 'post', autospec=True)
+
+    def post(self, url, headers=None, json=None, params=None, idempotent=None):
+        response = requests.Response()
+        response.status_code = 400 if json[0]['technicalName'] == 'bad' else 200
+        response.raw = io.BytesIO(b'{"error": "Bad request"}' if response.status_code == 400 else b'{"created": 1}')
+        return response
+    post_mock.side_effect = post
+    pages = [
+        [{'path': '\\bad', 'typePath': '\\Term', 'functionalPath': '\\bad', 'attributes': {}}],
+        [{'path': '\\good', 'typePath': '\\Term', 'functionalPath': '\\good', 'attributes': {}}],
+        [{'path': '\\bad\\child', 'typePath': '\\Term\\Term', 'functionalPath': '\\bad\\child', 'attributes': {}}]
+    ]
+    modules_api = DataGalaxyApiModules(
+        url='https://api.datagalaxy.com/v2',
+        token='token',
+        workspace={'versionId': 'versionId'},
+        module="Glossary",
+        http_client=HttpClient(),
+        options=ModulesOptions(upload_workers=2)
+    )
+
+    uploaded = []
+
+    with pytest.raises(Exception, match='2 of 3 uploads failed, first error: Bad request'):
+        modules_api.bulk_upsert_tree('workspace', pages, None, on_uploaded=uploaded.append)
+    # The child of the failed page is not sent
+    assert post_mock.call_count == 2
+    # Only the uploaded page is reported
+    assert uploaded == [pages[1]]
+
+
+def test_prefetch_children_objects_falls_back_beyond_the_memory_budget(mocker):
+    get_mock = mocker.patch.object(HttpClient, 'get', autospec=True)
+    get_mock.side_effect = lambda self, url, params=None, headers=None, stream=False: make_page_response([{'id': '1', 'path': '\\source1\\object'}])
+    modules_api = make_modules_api("Dictionary")
+    sources = [{'id': 'id1', 'path': '\\source1'}]
+
+    assert modules_api.prefetch_children_objects('workspace', sources, min_sources=1, max_bytes=100) is False
+    modules_api.list_children_objects('workspace', 'id1', 'containers')
+    assert get_mock.call_args.kwargs['params']['parentId'] == 'id1'
+
+
+def test_resumed_run_does_not_send_the_completed_writes_again(mocker, tmp_path):
+    post_mock = mocker.patch.object(HttpClient, 'post', autospec=True)
+
+    def post(self, url, headers=None, json=None, params=None, idempotent=None):
+        response = requests.Response()
+        response.status_code = 201
+        response.raw = io.BytesIO(b'{"id": "new_source_id"}')
+        return response
+    post_mock.side_effect = post
+    source = {'name': 'source', 'path': '\\source'}
+
+    options = ModulesOptions(journal=Journal(str(tmp_path / 'journal.jsonl')))
+    assert make_modules_api("Dictionary", options).create_source('workspace', source) == 'new_source_id'
+    options.close()
+    options = ModulesOptions(journal=Journal(str(tmp_path / 'journal.jsonl'), resume=True))
+    modules_api = make_modules_api("Dictionary", options)
+    assert modules_api.create_source('workspace', source) == 'new_source_id'
+    modules_api.create_source('workspace', {'name': 'other', 'path': '\\other'})
+    options.close()
+
+    assert post_mock.call_count == 2
@@ -22,8 +22,8 @@ def test_delete_module(mocker):
     workspaces.return_value = ['workspace']
     workspace_mock = mocker.patch.object(DataGalaxyApiWorkspace, 'get_workspace', autospec=True)
     workspace_mock.return_value = {'name': 'workspace', 'defaultVersionId': 'versionId', 'isVersioningEnabled': False}
-    objects_list_mock = mocker.patch.object(DataGalaxyApiModules, 'list_objects', autospec=True)
-    objects_list_mock.return_value = mock_list_objects
+    objects_list_mock = mocker.patch.object(DataGalaxyApiModules, 'iter_pages', autospec=True)
+    objects_list_mock.return_value = iter(mock_list_objects)
     delete_objects_mock = mocker.patch.object(DataGalaxyApiModules, 'delete_objects', autospec=True)
     delete_objects_mock.return_value = True
 
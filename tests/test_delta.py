@@ -0,0 +1,76 @@
+from toolbox.api.delta import DeltaFilter, FingerprintRecorder, fingerprint
+from toolbox.api.state_store import StateStore
+
+
+# Scenarios
+
+def test_fingerprint_matches_the_normalized_copy():
+    source = {'id': 'id1', 'path': '\\Source\\Table', 'functionalPath': '\\Source\\Table', 'typePath': '\\Source\\Table',
+              'attributes': {'technologyCode': 'sql', 'kpi': {'lastEntry': {'date': '2024-01-01', 'value': 3}}}}
+    target = {'id': 'id2', 'path': '\\Source\\Table', 'functionalPath': '\\Source\\Table', 'typePath': '\\Source\\Table',
+              'attributes': {'kpi': '2024-01-01::3'}}
+
+    assert fingerprint(source) == fingerprint(target)
+    # The source object is left untouched
+    assert source['attributes']['technologyCode'] == 'sql'
+    # The children of the sources keep their technologyCode
+    assert fingerprint(source, remove_technology_code=False) != fingerprint(target, remove_technology_code=False)
+
+
+def test_fingerprint_changes_with_the_name():
+    obj = {'path': '\\Term', 'functionalPath': '\\Term', 'typePath': '\\Concept', 'attributes': {}}
+
+    assert fingerprint(obj) != fingerprint({**obj, 'functionalPath': '\\Renamed term'})
+
+
+def test_fingerprint_changes_with_the_attributes_and_the_path():
+    obj = {'path': '\\Term', 'typePath': '\\Concept', 'attributes': {'summary': 'a'}}
+
+    assert fingerprint(obj) != fingerprint({**obj, 'attributes': {'summary': 'b'}})
+    assert fingerprint(obj) != fingerprint({**obj, 'path': '\\Other'})
+    assert fingerprint(obj) != fingerprint({**obj, 'typePath': '\\Term'})
+
+
+def test_filter_pages_keeps_the_new_or_changed_objects():
+    delta_filter = DeltaFilter()
+    delta_filter.add_target_pages(iter([
+        [{'path': '\\A', 'typePath': '\\Concept', 'attributes': {'summary': 'a'}}],
+        [{'path': '\\B', 'typePath': '\\Concept', 'attributes': {'summary': 'b'}}]
+    ]))
+    pages = [
+        [{'path': '\\A', 'typePath': '\\Concept', 'attributes': {'summary': 'a'}},
+         {'path': '\\B', 'typePath': '\\Concept', 'attributes': {'summary': 'changed'}}],
+        [{'path': '\\A', 'typePath': '\\Concept', 'attributes': {'summary': 'a'}}],
+        [{'path': '\\C', 'typePath': '\\Concept', 'attributes': {}}]
+    ]
+
+    result = list(delta_filter.filter_pages(pages))
+
+    # The page left empty is dropped
+    assert [[obj['path'] for obj in page] for page in result] == [['\\B'], ['\\C']]
+    assert delta_filter.kept == 2
+    assert delta_filter.skipped == 2
+
+
+def test_fingerprint_recorder_records_the_changed_objects_once_uploaded(tmp_path):
+    store = StateStore(str(tmp_path / 'state.db'))
+    state = store.sync('url_source', 'version_source', 'url_target', 'version_target')
+    recorder = FingerprintRecorder(state, 'Glossary')
+    delta_filter = DeltaFilter({fingerprint({'path': '\\A', 'typePath': '\\Concept', 'attributes': {}})})
+    pages = [[{'path': '\\A', 'typePath': '\\Concept', 'attributes': {}}, {'path': '\\B', 'typePath': '\\Concept', 'attributes': {}}],
+             [{'path': '\\C', 'typePath': '\\Concept', 'attributes': {}}]]
+
+    filtered = delta_filter.filter_pages(pages, recorder)
+    first_page = next(filtered)
+    store.flush()
+    # The unchanged object is recorded right away, the changed one once its page is uploaded
+    assert state.fingerprint('Glossary', '\\A') is not None
+    assert state.fingerprint('Glossary', '\\B') is None
+    recorder.uploaded(first_page)
+    store.flush()
+    assert state.fingerprint('Glossary', '\\B') == fingerprint(pages[0][1])
+    # The page never uploaded is not recorded
+    next(filtered)
+    store.flush()
+    assert state.fingerprint('Glossary', '\\C') is None
+    store.close()
@@ -1,6 +1,12 @@
+import gzip
+import io
+import json
+import threading
 import pytest
 import requests
 from toolbox.api.http_client import HttpClient
+from toolbox.api.rate_limiter import RateLimiter
+from toolbox.api.retry import RetryPolicy
 
 
 def test_http_client_with_ssl_verification_enabled():
@@ -77,3 +83,138 @@ def test_http_client_with_valid_ssl_certificate():
     http_client_without_ssl = HttpClient(verify_ssl=False)
     response = http_client_without_ssl.get("https://httpbin.org/get")
     assert response.status_code == 200
+
+
+def test_http_client_keeps_one_pool_per_host():
+    http_client = HttpClient(pool_maxsize=4)
+
+    source_session = http_client.session("https://source.datagalaxy.com/v2/sources")
+    target_session = http_client.session("https://target.datagalaxy.com/v2/sources")
+
+    assert http_client.session("https://source.datagalaxy.com/v2/fields") is source_session
+    assert source_session is not target_session
+    source_adapter = source_session.get_adapter("https://source.datagalaxy.com/v2/sources")
+    target_adapter = target_session.get_adapter("https://target.datagalaxy.com/v2/sources")
+    assert source_adapter is not target_adapter
+    assert source_adapter._pool_maxsize == 4
+
+
+def test_http_client_shares_pools_between_threads():
+    http_client = HttpClient()
+    main_session = http_client.session("https://source.datagalaxy.com/v2/sources")
+    sessions = []
+
+    thread = threading.Thread(target=lambda: sessions.append(http_client.session("https://source.datagalaxy.com/v2/sources")))
+    thread.start()
+    thread.join()
+
+    assert sessions[0] is not main_session
+    assert sessions[0].get_adapter("https://source.datagalaxy.com/") is main_session.get_adapter("https://source.datagalaxy.com/")
+
+
+def make_response(status_code, headers=None):
+    response = requests.Response()
+    response.status_code = status_code
+    response.raw = io.BytesIO(b'{}')
+    if headers:
+        response.headers.update(headers)
+    return response
+
+
+def test_http_client_retries_get_with_retry_after(mocker):
+    request_mock = mocker.patch.object(requests.Session, 'request', autospec=True)
+    request_mock.side_effect = [make_response(503, {'Retry-After': '2'}), make_response(200)]
+    sleep_mock = mocker.patch('toolbox.api.http_client.time.sleep')
+    http_client = HttpClient()
+
+    response = http_client.get("https://api.datagalaxy.com/v2/sources")
+
+    assert response.status_code == 200
+    assert request_mock.call_count == 2
+    sleep_mock.assert_called_once_with(2.0)
+    assert http_client.stats()['retries'] == 1
+
+
+def test_http_client_does_not_retry_non_idempotent_post(mocker):
+    request_mock = mocker.patch.object(requests.Session, 'request', autospec=True)
+    request_mock.return_value = make_response(502)
+    mocker.patch('toolbox.api.http_client.time.sleep')
+    http_client = HttpClient()
+
+    response = http_client.post("https://api.datagalaxy.com/v2/sources/version", json={'name': 'source'})
+
+    assert response.status_code == 502
+    assert request_mock.call_count == 1
+
+
+def test_http_client_retries_idempotent_post_with_same_body(mocker):
+    request_mock = mocker.patch.object(requests.Session, 'request', autospec=True)
+    request_mock.side_effect = [make_response(502), make_response(502), make_response(200)]
+    mocker.patch('toolbox.api.http_client.time.sleep')
+    http_client = HttpClient(retry_policy=RetryPolicy(max_retries=3))
+
+    response = http_client.post("https://api.datagalaxy.com/v2/sources/bulktree/version", json=[{'name': 'a'}], idempotent=True)
+
+    assert response.status_code == 200
+    bodies = [call.kwargs['data'] for call in request_mock.call_args_list]
+    assert bodies == [b'[{"name": "a"}]'] * 3
+
+
+def test_http_client_gives_up_after_max_retries(mocker):
+    request_mock = mocker.patch.object(requests.Session, 'request', autospec=True)
+    request_mock.return_value = make_response(429)
+    mocker.patch('toolbox.api.http_client.time.sleep')
+    http_client = HttpClient(retry_policy=RetryPolicy(max_retries=2))
+
+    response = http_client.get("https://api.datagalaxy.com/v2/sources")
+
+    assert response.status_code == 429
+    assert request_mock.call_count == 3
+
+
+def test_http_client_compresses_large_bodies(mocker):
+    request_mock = mocker.patch.object(requests.Session, 'request', autospec=True)
+    request_mock.return_value = make_response(200)
+    http_client = HttpClient(compression="gzip", compression_threshold=100)
+    body = [{'name': f'object {i}'} for i in range(100)]
+
+    http_client.post("https://api.datagalaxy.com/v2/sources/bulktree/version", json=body)
+
+    kwargs = request_mock.call_args.kwargs
+    assert kwargs['headers']['Content-Encoding'] == 'gzip'
+    assert json.loads(gzip.decompress(kwargs['data'])) == body
+    stats = http_client.stats()
+    assert stats['sent_bytes'] < stats['body_bytes']
+
+
+def test_http_client_does_not_compress_small_bodies(mocker):
+    request_mock = mocker.patch.object(requests.Session, 'request', autospec=True)
+    request_mock.return_value = make_response(200)
+    http_client = HttpClient(compression="deflate", compression_threshold=100)
+
+    http_client.post("https://api.datagalaxy.com/v2/technologies", json={'name': 'tech'})
+
+    kwargs = request_mock.call_args.kwargs
+    assert 'Content-Encoding' not in kwargs['headers']
+    assert kwargs['data'] == b'{"name": "tech"}'
+
+
+def test_http_client_holds_the_inflight_slot_until_a_streamed_response_is_closed(mocker):
+    request_mock = mocker.patch.object(requests.Session, 'request', autospec=True)
+    request_mock.side_effect = lambda *args, **kwargs: make_response(200)
+    http_client = HttpClient(rate_limiter=RateLimiter(max_inflight=1))
+    entered = threading.Event()
+
+    response = http_client.get("https://api.datagalaxy.com/v2/sources", stream=True)
+
+    def other_request():
+        http_client.get("https://api.datagalaxy.com/v2/properties")
+        entered.set()
+
+    thread = threading.Thread(target=other_request)
+    thread.start()
+    # The body of the first response is not read yet
+    assert entered.wait(0.1) is False
+    response.close()
+    thread.join(1)
+    assert entered.is_set()
@@ -0,0 +1,89 @@
+import io
+import logging
+import requests
+from toolbox.api.http_client import HttpClient
+from toolbox.api.http_events import LatencyHistogram, RequestListener, SlowRequestLogger, RequestEvent, templated_route
+
+
+# Mocks
+
+class RecordingListener(RequestListener):
+    def __init__(self):
+        self.started = []
+        self.ended = []
+
+    def on_request_start(self, event):
+        self.started.append(event)
+
+    def on_request_end(self, event):
+        self.ended.append(event)
+
+
+def make_response(status_code, body=b'{"results": []}'):
+    response = requests.Response()
+    response.status_code = status_code
+    response.raw = io.BytesIO(body)
+    return response
+
+
+# Scenarios
+
+def test_templated_route():
+    url = 'https://api.datagalaxy.com/v2/sources/bulktree/0b5d4a3e-8f5c-4a8e-9a77-1c1f0e2d3b4a'
+    assert templated_route(url) == '/v2/sources/bulktree/{id}'
+    url = 'https://api.datagalaxy.com/v2/sources/0b5d4a3e-8f5c-4a8e-9a77-1c1f0e2d3b4a:1c1f0e2d-8f5c-4a8e-9a77-0b5d4a3e3b4a/42/primaryKeys'
+    assert templated_route(url) == '/v2/sources/{id}/{id}/primaryKeys'
+
+
+def test_listeners_get_start_and_end_events_with_retries(mocker):
+    request_mock = mocker.patch.object(requests.Session, 'request', autospec=True)
+    request_mock.side_effect = [make_response(503), make_response(200)]
+    mocker.patch('toolbox.api.http_client.time.sleep')
+    http_client = HttpClient()
+    listener = RecordingListener()
+    http_client.add_listener(listener)
+
+    http_client.post('https://api.datagalaxy.com/v2/properties/bulktree/1234', json=[{'name': 'a'}], idempotent=True)
+
+    assert len(listener.started) == 1
+    event = listener.ended[0]
+    assert event.method == 'POST'
+    assert event.route == '/v2/properties/bulktree/{id}'
+    assert event.status == 200
+    assert event.retries == 1
+    assert event.request_bytes == len(b'[{"name": "a"}]')
+    assert event.response_bytes == len(b'{"results": []}')
+    assert event.latency >= 0
+
+
+def test_streamed_requests_end_when_the_response_is_closed(mocker):
+    request_mock = mocker.patch.object(requests.Session, 'request', autospec=True)
+    request_mock.return_value = make_response(200)
+    http_client = HttpClient()
+    listener = RecordingListener()
+    http_client.add_listener(listener)
+
+    response = http_client.get('https://api.datagalaxy.com/v2/properties', stream=True)
+    assert listener.ended == []
+    response.content
+    response.close()
+
+    assert listener.ended[0].response_bytes == len(b'{"results": []}')
+
+
+def test_latency_histogram_and_slow_requests(caplog):
+    histogram = LatencyHistogram()
+    slow_requests = SlowRequestLogger(threshold=1)
+    for latency in [0.01, 0.2, 3]:
+        event = RequestEvent(method='GET', url='url', route='/v2/properties', request_bytes=0, status=200, latency=latency)
+        histogram.on_request_end(event)
+        slow_requests.on_request_end(event)
+
+    route = histogram.routes['GET /v2/properties']
+    assert route['count'] == 3
+    assert route['max'] == 3
+    assert histogram.percentile('GET /v2/properties', 50) == 0.25
+    assert slow_requests.count == 1
+    with caplog.at_level(logging.INFO):
+        histogram.log_summary()
+    assert 'GET /v2/properties: 3 requests' in caplog.text
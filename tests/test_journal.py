@@ -0,0 +1,65 @@
+import json
+from toolbox.api.journal import Journal, unit_key
+
+
+# Scenarios
+
+def test_unit_key_depends_on_the_url_and_the_payload():
+    assert unit_key('url', {'a': 1, 'b': 2}) == unit_key('url', {'b': 2, 'a': 1})
+    assert unit_key('url', {'a': 1}) != unit_key('other_url', {'a': 1})
+    assert unit_key('url', [1, 2]) != unit_key('url', [2, 1])
+
+
+def test_resume_skips_the_recorded_units(tmp_path):
+    path = str(tmp_path / 'journal.jsonl')
+    sent = []
+    journal = Journal(path)
+    assert journal.run('source', 'key1', lambda: sent.append('key1') or 'new_id') == 'new_id'
+    journal.close()
+    # A line cut when the run was killed
+    with open(path, 'a') as file:
+        file.write('{"kind": "bulktree", "ke')
+
+    resumed = Journal(path, resume=True)
+    assert resumed.run('source', 'key1', lambda: sent.append('key1') or 'other_id') == 'new_id'
+    assert resumed.run('bulktree', 'key2', lambda: sent.append('key2')) is None
+    resumed.close()
+
+    assert sent == ['key1', 'key2']
+    assert resumed.skipped == {'source': 1}
+    assert resumed.recorded == {'bulktree': 1}
+
+
+def test_without_resume_the_journal_starts_empty(tmp_path):
+    path = str(tmp_path / 'journal.jsonl')
+    journal = Journal(path)
+    journal.record('delete', 'key1')
+    journal.close()
+
+    sent = []
+    journal = Journal(path)
+    journal.run('delete', 'key1', lambda: sent.append('key1'))
+    journal.close()
+
+    assert sent == ['key1']
+
+
+def test_resume_after_a_partial_line_keeps_the_next_units(tmp_path):
+    path = str(tmp_path / 'journal.jsonl')
+    journal = Journal(path)
+    journal.record('source', 'key1', 'id1')
+    journal.close()
+    with open(path, 'a') as file:
+        file.write('{"kind": "source", "key": "key2", "va')
+
+    resumed = Journal(path, resume=True)
+    resumed.record('source', 'key3', 'id3')
+    resumed.close()
+
+    sent = []
+    resumed_again = Journal(path, resume=True)
+    assert resumed_again.run('source', 'key3', lambda: sent.append('key3') or 'other_id') == 'id3'
+    resumed_again.close()
+    assert sent == []
+    with open(path) as file:
+        assert [json.loads(line)['key'] for line in file] == ['key1', 'key3']
@@ -0,0 +1,74 @@
+import json
+import pytest
+from toolbox.api.json_stream import ResultsStream
+
+
+def chunked(body: str, size: int):
+    data = body.encode('utf-8')
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+PAGE = {
+    'total': 12345,
+    'results': [
+        {'id': '1', 'name': 'Données', 'attributes': {'tags': ['a', 'b'], 'count': 10, 'ratio': 1.5e3}},
+        {'id': '2', 'name': 'quote " and \\\\ backslash', 'attributes': {'empty': None, 'valid': True}},
+        {'id': '3', 'name': 'emoji 🚀', 'children': []}
+    ],
+    'next_page': 'https://api.datagalaxy.com/v2/sources?cursor=abc'
+}
+
+
+@pytest.mark.parametrize('chunk_size', [1, 2, 7, 64, 100000])
+def test_results_stream_decodes_any_chunking(chunk_size):
+    page = ResultsStream(chunked(json.dumps(PAGE, ensure_ascii=False, indent=1), chunk_size))
+
+    assert list(page) == PAGE['results']
+    assert page.next_page == PAGE['next_page']
+    assert page.fields['total'] == 12345
+
+
+def test_results_stream_with_next_page_before_results():
+    body = '{"next_page": null, "results": []}'
+    page = ResultsStream(chunked(body, 3))
+
+    assert list(page) == []
+    assert page.next_page is None
+
+
+def test_results_stream_yields_objects_before_the_end_of_the_body():
+    def chunks():
+        yield b'{"results": [{"id": "1"}, '
+        raise Exception('the rest of the body has not been received yet')
+
+    page = ResultsStream(chunks())
+
+    assert next(iter(page)) == {'id': '1'}
+
+
+def test_results_stream_next_page_requires_a_complete_page():
+    page = ResultsStream(chunked(json.dumps(PAGE), 10))
+    iterator = iter(page)
+    next(iterator)
+
+    with pytest.raises(Exception):
+        page.next_page
+    # iterating again resumes the same page
+    assert len(list(page)) == 2
+    assert page.next_page == PAGE['next_page']
+
+
+def test_results_stream_rejects_invalid_json():
+    page = ResultsStream(chunked('{"results": [{"id": 1} {"id": 2}]}', 4))
+
+    with pytest.raises(Exception):
+        list(page)
+
+
+@pytest.mark.parametrize('split', range(1, 32))
+def test_results_stream_decodes_numbers_split_between_chunks(split):
+    data = b'{"results": [1.5, -2e3, 7, 0.25E-1], "next_page": null}'
+    page = ResultsStream([data[:split], data[split:]])
+
+    assert list(page) == [1.5, -2e3, 7, 0.25E-1]
+    assert page.next_page is None
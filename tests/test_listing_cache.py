@@ -0,0 +1,105 @@
+import time
+
+from toolbox.api.datagalaxy_api_modules import DataGalaxyApiModules, ModulesOptions
+from toolbox.api.http_client import HttpClient
+from toolbox.api.json_stream import ResultsStream
+from toolbox.api.listing_cache import ListingCache
+
+
+# Mocks
+
+class Clock:
+    # Compared to the modification time of the files
+    def __init__(self):
+        self.now = time.time()
+
+    def __call__(self):
+        return self.now
+
+
+def fetch_pages(fetches):
+    def fetch():
+        fetches.append(1)
+        yield ResultsStream(iter([b'{"results":[{"id":"1"},{"id":"2"}],"next_page":null}']))
+        yield ResultsStream(iter([b'{"results":[{"id":"3"}],"next_page":null}']))
+    return fetch
+
+
+def read(cache, fetches, version_id='version', params=None):
+    pages = cache.pages('url', version_id, 'url/concepts', params or {'versionId': version_id}, fetch_pages(fetches))
+    return [[obj['id'] for obj in page] for page in pages]
+
+
+# Scenarios
+
+def test_listing_is_read_from_the_cache_until_it_expires(tmp_path):
+    clock = Clock()
+    cache = ListingCache(str(tmp_path), ttl=60, clock=clock)
+    fetches = []
+
+    assert read(cache, fetches) == [['1', '2'], ['3']]
+    assert read(cache, fetches) == [['1', '2'], ['3']]
+    assert len(fetches) == 1
+    # Other parameters, other listing
+    read(cache, fetches, params={'versionId': 'version', 'includeLinks': 'true'})
+    assert len(fetches) == 2
+
+    clock.now += 3600
+    read(cache, fetches)
+    assert len(fetches) == 3
+    assert (cache.hits, cache.misses) == (1, 3)
+
+
+def test_listing_of_a_frozen_version_never_expires(tmp_path):
+    clock = Clock()
+    cache = ListingCache(str(tmp_path), ttl=60, frozen_versions=['frozen'], clock=clock)
+    fetches = []
+
+    read(cache, fetches, 'frozen')
+    clock.now += 3600
+    read(cache, fetches, 'frozen')
+
+    assert len(fetches) == 1
+
+
+def test_listing_partially_read_is_not_stored(tmp_path):
+    cache = ListingCache(str(tmp_path))
+    fetches = []
+
+    pages = cache.pages('url', 'version', 'url/concepts', {'versionId': 'version'}, fetch_pages(fetches))
+    next(pages)
+    pages.close()
+    read(cache, fetches)
+
+    assert len(fetches) == 2
+
+
+def test_refresh_bypass_and_invalidate(tmp_path):
+    fetches = []
+    read(ListingCache(str(tmp_path)), fetches)
+    read(ListingCache(str(tmp_path), refresh=True), fetches)
+    read(ListingCache(str(tmp_path), bypass=True), fetches)
+    assert len(fetches) == 3
+
+    cache = ListingCache(str(tmp_path))
+    read(cache, fetches)
+    assert len(fetches) == 3
+    cache.invalidate('url', 'version')
+    read(cache, fetches)
+    assert len(fetches) == 4
+
+
+def test_modules_listings_go_through_the_cache(mocker, tmp_path):
+    fetches = []
+    fetch_pages_mock = mocker.patch.object(DataGalaxyApiModules, '_fetch_pages', autospec=True)
+    fetch_pages_mock.side_effect = lambda self, url, params: fetch_pages(fetches)()
+    module_api = DataGalaxyApiModules(url='url', token='token', workspace={'versionId': 'version'}, module='Glossary',
+                                      http_client=HttpClient(verify_ssl=True), options=ModulesOptions(listing_cache=ListingCache(str(tmp_path))))
+
+    assert module_api.list_objects('workspace') == [[{'id': '1'}, {'id': '2'}], [{'id': '3'}]]
+    assert module_api.list_objects('workspace') == [[{'id': '1'}, {'id': '2'}], [{'id': '3'}]]
+    assert len(fetches) == 1
+    # A write to the version drops its listings
+    module_api._journaled('bulktree', 'url', [], lambda: None)
+    module_api.list_objects('workspace')
+    assert len(fetches) == 2
@@ -89,3 +89,44 @@ def test_run_with_missing_copy_module_args(mocker):
     assert exit_mock.call_count == 1
     # should output the CLI usage to stderr
     assert re.compile('^usage:.*copy-glossary.*').match(mock_stderr.getvalue())
+
+
+def test_run_with_rate_limiting_args(mocker):
+    copy_attributes_mock = mocker.patch('toolbox.__main__.copy_attributes')
+    code = run([
+        '--max-rps', '20',
+        '--max-inflight', '4',
+        'copy-attributes',
+        '--url-source', 'https://source',
+        '--url-target', 'https://target',
+        '--token-source', 'token_source',
+        '--token-target', 'token_target',
+    ])
+
+    assert code == 0
+    http_client = copy_attributes_mock.call_args.args[4]
+    assert http_client.rate_limiter.max_rps == 20
+    assert http_client.rate_limiter.max_inflight == 4
+
+
+def test_run_with_listing_args(mocker):
+    copy_module_mock = mocker.patch('toolbox.__main__.copy_module')
+    glossary_args = [
+        'copy-glossary',
+        '--url-source', 'https://source',
+        '--token-source', 'token_source',
+        '--workspace-source', 'workspace_source_name',
+        '--workspace-target', 'workspace_target_name',
+    ]
+    code = run(['--page-limit', 'fields=1000', '--page-limit', 'sources=200', '--read-ahead', '3'] + glossary_args)
+
+    assert code == 0
+    options = copy_module_mock.call_args.kwargs['options']
+    assert options.page_limits == {'fields': 1000, 'sources': 200}
+    assert options.read_ahead == 3
+
+    # The options of a run are not kept by the next one
+    run(glossary_args)
+    options = copy_module_mock.call_args.kwargs['options']
+    assert options.page_limits == {}
+    assert options.read_ahead == 1
@@ -0,0 +1,74 @@
+import copy
+import json
+from toolbox.api.datagalaxy_api import build_bulktree
+from toolbox.api.normalization import bulktree_pipeline, normalize_dpi
+from tests.test_prune_tree import reference_prune_tree
+
+
+# Reference: the original separate pass removing the technology codes of the children
+
+def reference_remove_technology_code(node):
+    if 'technologyCode' in node:
+        del node['technologyCode']
+
+    if 'children' in node:
+        for child in node['children']:
+            reference_remove_technology_code(child)
+
+
+# Mocks
+
+OBJECTS = [
+    {'path': '\\usage', 'typePath': '\\Application', 'functionalPath': '\\Usage',
+     'attributes': {'technologyCode': 'tech', 'tags': ['red']}},
+    {'path': '\\usage\\screen', 'typePath': '\\Application\\Screen', 'functionalPath': '\\Usage\\Screen',
+     'attributes': {'technologyCode': 'tech', 'serie': {'lastEntry': {'date': '2024-01-01', 'value': 3}}}},
+    {'path': '\\usage\\screen\\report', 'typePath': '\\Application\\Screen\\Report', 'functionalPath': '\\Usage\\Screen\\Report',
+     'attributes': {'technologyCode': 'tech', 'tags': ['red']}},
+    {'path': '\\other', 'typePath': '\\Application', 'functionalPath': '\\Other',
+     'attributes': {'technologyCode': 'tech', 'serie': {'lastEntry': None}}}
+]
+
+
+# Scenarios
+
+def test_pipeline_matches_separate_passes():
+    expected = build_bulktree(copy.deepcopy(OBJECTS))
+    expected = reference_prune_tree(expected, 'red')
+    for tree in expected:
+        for children in tree['children']:
+            reference_remove_technology_code(children)
+
+    pipeline = bulktree_pipeline('red', remove_technology_code=True)
+    result = pipeline.run(build_bulktree(copy.deepcopy(OBJECTS), normalize_timeseries=False))
+
+    assert json.dumps(result) == json.dumps(expected)
+    assert pipeline.counters == {'tags': 1, 'timeseries': 2, 'technology_code': 2}
+
+
+def test_pipeline_keeps_the_root_of_a_single_tree():
+    source = {'name': 'source', 'children': [{'name': 'table', 'children': []}]}
+
+    result = bulktree_pipeline('red').run(source)
+
+    assert result is source
+    assert result['children'] == []
+
+
+def test_pipeline_runs_additional_stages():
+    pipeline = bulktree_pipeline(None)
+    pipeline.add_stage('depth', lambda node, depth: node.update({'depth': depth}) is None)
+
+    result = pipeline.run(build_bulktree(copy.deepcopy(OBJECTS)))
+
+    assert result[0]['depth'] == 0
+    assert result[0]['children'][0]['children'][0]['depth'] == 2
+    assert pipeline.counters['depth'] == 4
+
+
+def test_normalize_dpi():
+    item = {'type': 'Search', 'summary': None, 'inputs': [{'path': '\\a'}, {'path': '\\a'}]}
+
+    normalize_dpi(item)
+
+    assert item == {'type': 'Lookup', 'summary': '', 'inputs': [{'path': '\\a', 'entityPath': '\\a'}] * 2, 'outputs': []}
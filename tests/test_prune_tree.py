@@ -0,0 +1,64 @@
+import copy
+import random
+from toolbox.api.normalization import NormalizationPipeline
+
+
+# Reference: the original recursive pruning, the tag pruning of the bulktrees is done by NormalizationPipeline
+
+def reference_prune_tree(tree, target_tag):
+    def recursive_prune(node):
+        if 'children' in node:
+            node['children'] = [child for child in node['children'] if recursive_prune(child)]
+            return 'tags' in node and target_tag in node['tags'] or any(recursive_prune(child) for child in node['children'])
+        return 'tags' in node and target_tag in node['tags']
+    return [node for node in tree if recursive_prune(node)]
+
+
+def random_tree(generator, depth):
+    node = {'name': f"n{generator.randint(0, 100)}"}
+    if generator.random() < 0.3:
+        node['tags'] = generator.sample(['red', 'blue', 'green'], 2)
+    if depth > 0 and generator.random() < 0.8:
+        node['children'] = [random_tree(generator, depth - 1) for _ in range(generator.randint(0, 3))]
+    return node
+
+
+def prune_tree(tree, target_tag):
+    return NormalizationPipeline(target_tag).run(tree)
+
+
+# Scenarios
+
+def test_prune_tree_matches_reference():
+    generator = random.Random(42)
+    for _ in range(50):
+        trees = [random_tree(generator, 5) for _ in range(3)]
+        assert prune_tree(copy.deepcopy(trees), 'red') == reference_prune_tree(copy.deepcopy(trees), 'red')
+
+
+def test_prune_tree_keeps_the_root_of_a_single_tree():
+    source = {
+        'name': 'source',
+        'children': [
+            {'name': 'table', 'children': [{'name': 'column', 'tags': ['red']}]},
+            {'name': 'other table', 'children': [{'name': 'column'}]}
+        ]
+    }
+
+    pruned = prune_tree(source, 'red')
+
+    assert pruned is source
+    assert pruned['children'] == [{'name': 'table', 'children': [{'name': 'column', 'tags': ['red']}]}]
+
+
+def test_prune_tree_handles_very_deep_trees():
+    root = {'name': 'root', 'children': []}
+    node = root
+    for i in range(50000):
+        child = {'name': f'n{i}', 'children': []}
+        node['children'].append(child)
+        node = child
+    node['tags'] = ['red']
+
+    assert len(prune_tree([root], 'red')) == 1
+    assert prune_tree([root], 'blue') == []
@@ -0,0 +1,54 @@
+import threading
+from toolbox.api.rate_limiter import RateLimiter, TokenBucket
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, delay):
+        self.now += delay
+
+
+def test_token_bucket_allows_burst_then_throttles():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=2, clock=clock, sleep=clock.sleep)
+
+    assert bucket.acquire() == 0
+    assert bucket.acquire() == 0
+    waited = bucket.acquire()
+
+    assert waited == 0.5
+    assert clock.now == 0.5
+
+
+def test_rate_limiter_disabled_by_default():
+    limiter = RateLimiter()
+
+    assert limiter.enabled is False
+    with limiter.slot('https://api.datagalaxy.com', 'Bearer token'):
+        pass
+
+
+def test_rate_limiter_limits_inflight_per_host_and_token():
+    limiter = RateLimiter(max_inflight=1)
+    entered = threading.Event()
+
+    with limiter.slot('https://source.datagalaxy.com', 'Bearer token'):
+        # another host (or another token) has its own limit
+        with limiter.slot('https://target.datagalaxy.com', 'Bearer token'):
+            pass
+
+        def other_request():
+            with limiter.slot('https://source.datagalaxy.com', 'Bearer token'):
+                entered.set()
+
+        thread = threading.Thread(target=other_request)
+        thread.start()
+        assert entered.wait(0.1) is False
+
+    thread.join(1)
+    assert entered.is_set()
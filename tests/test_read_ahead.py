@@ -0,0 +1,93 @@
+import threading
+import pytest
+from toolbox.api.read_ahead import read_ahead
+
+
+# Scenarios
+
+def test_read_ahead_keeps_the_order():
+    assert list(read_ahead(iter(range(100)), depth=3)) == list(range(100))
+
+
+def test_read_ahead_without_depth_iterates_in_the_caller_thread():
+    threads = []
+
+    def items():
+        threads.append(threading.current_thread())
+        yield 1
+
+    assert list(read_ahead(items(), depth=0)) == [1]
+    assert threads == [threading.current_thread()]
+
+
+def test_read_ahead_fetches_the_next_item_in_the_background():
+    fetched = []
+    second_fetched = threading.Event()
+
+    def items():
+        for item in range(3):
+            fetched.append(item)
+            if item == 1:
+                second_fetched.set()
+            yield item
+
+    iterator = read_ahead(items(), depth=1)
+    assert next(iterator) == 0
+    # The caller is still processing the first item
+    assert second_fetched.wait(timeout=5)
+    assert list(iterator) == [1, 2]
+
+
+def test_read_ahead_raises_the_errors_in_order():
+    def items():
+        yield 1
+        raise Exception('Forbidden')
+
+    iterator = read_ahead(items(), depth=2)
+    assert next(iterator) == 1
+    with pytest.raises(Exception, match='Forbidden'):
+        next(iterator)
+
+
+def test_read_ahead_closes_the_items_when_the_caller_stops():
+    closed = threading.Event()
+
+    def items():
+        try:
+            for item in range(1000):
+                yield item
+        finally:
+            closed.set()
+
+    iterator = read_ahead(items(), depth=1)
+    assert next(iterator) == 0
+    iterator.close()
+    assert closed.wait(timeout=5)
+
+
+def test_read_ahead_starts_fetching_before_the_first_item_is_asked():
+    first_fetched = threading.Event()
+
+    def items():
+        first_fetched.set()
+        yield 1
+
+    iterator = read_ahead(items(), depth=1)
+
+    assert first_fetched.wait(timeout=5)
+    assert list(iterator) == [1]
+
+
+def test_read_ahead_stops_when_the_caller_drops_it():
+    closed = threading.Event()
+
+    def items():
+        try:
+            for item in range(1000):
+                yield item
+        finally:
+            closed.set()
+
+    read_ahead(items(), depth=1)
+
+    assert closed.wait(timeout=5)
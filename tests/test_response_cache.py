@@ -0,0 +1,111 @@
+import io
+import threading
+import requests
+from toolbox.api.datagalaxy_api_workspaces import DataGalaxyApiWorkspace
+from toolbox.api.http_client import HttpClient
+from toolbox.api.response_cache import ResponseCache
+
+
+# Mocks
+
+def make_response(body: bytes, status_code=200):
+    response = requests.Response()
+    response.status_code = status_code
+    response.raw = io.BytesIO(body)
+    return response
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+# Scenarios
+
+def test_response_cache_expires_entries():
+    clock = FakeClock()
+    cache = ResponseCache(ttl=10, clock=clock)
+    send_count = []
+
+    def send():
+        send_count.append(1)
+        return make_response(b'[]')
+
+    cache.fetch(('url',), 'url', send)
+    cache.fetch(('url',), 'url', send)
+    clock.now = 11
+    cache.fetch(('url',), 'url', send)
+
+    assert len(send_count) == 2
+    assert cache.hits == 1
+
+
+def test_response_cache_does_not_keep_errors():
+    cache = ResponseCache()
+    responses = [make_response(b'{"error": "boom"}', 500), make_response(b'[]')]
+
+    assert cache.fetch(('url',), 'url', lambda: responses.pop(0)).status_code == 500
+    assert cache.fetch(('url',), 'url', lambda: responses.pop(0)).status_code == 200
+
+
+def test_response_cache_collapses_concurrent_requests():
+    cache = ResponseCache()
+    release = threading.Event()
+    send_count = []
+
+    def send():
+        send_count.append(1)
+        release.wait(1)
+        return make_response(b'[]')
+
+    threads = [threading.Thread(target=cache.fetch, args=(('url',), 'url', send)) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert len(send_count) == 1
+
+
+def test_workspaces_are_listed_once_for_source_and_target(mocker):
+    request_mock = mocker.patch.object(requests.Session, 'request', autospec=True)
+    request_mock.side_effect = lambda *args, **kwargs: make_response(
+        b'{"projects": [{"name": "source", "id": "1"}, {"name": "target", "id": "2"}]}')
+    http_client = HttpClient()
+
+    source = DataGalaxyApiWorkspace('https://api.datagalaxy.com/v2', 'token', http_client).get_workspace('source')
+    source['versionId'] = 'modified'
+    target = DataGalaxyApiWorkspace('https://api.datagalaxy.com/v2', 'token', http_client).get_workspace('target')
+    source_again = DataGalaxyApiWorkspace('https://api.datagalaxy.com/v2', 'token', http_client).get_workspace('source')
+
+    assert request_mock.call_count == 1
+    assert target['id'] == '2'
+    assert 'versionId' not in source_again
+
+
+def test_workspaces_are_indexed_once_per_cached_listing(mocker):
+    request_mock = mocker.patch.object(requests.Session, 'request', autospec=True)
+    request_mock.side_effect = lambda *args, **kwargs: make_response(b'{"projects": [{"name": "source", "id": "1"}]}')
+    json_spy = mocker.spy(requests.Response, 'json')
+    workspaces_api = DataGalaxyApiWorkspace('https://api.datagalaxy.com/v2', 'token', HttpClient())
+
+    for _ in range(3):
+        assert workspaces_api.get_workspace('source')['id'] == '1'
+
+    assert json_spy.call_count == 1
+
+
+def test_writes_invalidate_cached_listings(mocker):
+    request_mock = mocker.patch.object(requests.Session, 'request', autospec=True)
+    request_mock.side_effect = lambda *args, **kwargs: make_response(b'{"technologies": []}')
+    http_client = HttpClient()
+
+    http_client.get('https://api.datagalaxy.com/v2/technologies', cache=True)
+    http_client.post('https://api.datagalaxy.com/v2/technologies', json={'technologyCode': 'code'})
+    http_client.get('https://api.datagalaxy.com/v2/technologies', cache=True)
+
+    assert request_mock.call_count == 3
@@ -0,0 +1,101 @@
+import json
+
+from toolbox.api.datagalaxy_api_modules import DataGalaxyApiModules
+from toolbox.api.datagalaxy_api_workspaces import DataGalaxyApiWorkspace
+from toolbox.api.http_client import HttpClient
+from toolbox.api.snapshot import SnapshotReader, SnapshotWriter
+from toolbox.commands.snapshot import export_workspace, import_workspace, read_sources
+
+import pytest
+
+
+# Mocks
+
+OBJECTS = {
+    'Glossary': [[{'id': 'term', 'path': '\\Term', 'typePath': '\\Concept', 'attributes': {},
+                   'links': {'IsUsedBy': [{'path': '\\Usage', 'typePath': '\\Usage'}]}}]],
+    'Dictionary': [[{'id': 'source', 'path': '\\Source', 'typePath': '\\Relational', 'attributes': {}, 'links': {}}]],
+    'DataProcessing': [[{'id': 'dp', 'type': 'DataProcessing', 'path': '\\DP', 'typePath': '\\DataProcessing', 'attributes': {}, 'links': {}}]],
+    'Uses': [[{'id': 'usage', 'path': '\\Usage', 'typePath': '\\Usage', 'attributes': {}, 'links': {}}]]
+}
+
+
+def mock_iter_pages(self, workspace_name, include_links=False):
+    return iter(json.loads(json.dumps(OBJECTS[self.module])))
+
+
+def mock_iter_children_pages(self, workspace_name, parent_id, object_type, include_links=False):
+    if object_type == 'structures':
+        return iter([[{'id': 'table', 'path': '\\Source\\Table', 'typePath': '\\Relational\\Table', 'attributes': {}, 'links': {}}]])
+    return iter([])
+
+
+def mock_list_keys(self, workspace_name, source_id, mode):
+    if mode == 'primary':
+        return [{'technicalName': 'pk', 'table': {'id': 'table'}, 'columns': [{'technicalName': 'id', 'pkOrder': 1}]}]
+    return []
+
+
+# Scenarios
+
+def test_export_then_import_workspace(mocker, tmp_path):
+    # GIVEN
+    workspace_mock = mocker.patch.object(DataGalaxyApiWorkspace, 'get_workspace', autospec=True)
+    workspace_mock.return_value = {'name': 'workspace', 'defaultVersionId': 'versionId', 'isVersioningEnabled': False}
+    mocker.patch.object(DataGalaxyApiModules, 'iter_pages', autospec=True).side_effect = mock_iter_pages
+    mocker.patch.object(DataGalaxyApiModules, 'iter_children_pages', autospec=True).side_effect = mock_iter_children_pages
+    mocker.patch.object(DataGalaxyApiModules, 'list_children_objects', autospec=True).return_value = []
+    mocker.patch.object(DataGalaxyApiModules, 'list_keys', autospec=True).side_effect = mock_list_keys
+    mocker.patch.object(DataGalaxyApiModules, 'index_object_items', autospec=True).return_value = {'dp': [{'id': 'item'}]}
+    uploaded = {}
+    bulk_upsert_tree_mock = mocker.patch.object(DataGalaxyApiModules, 'bulk_upsert_tree', autospec=True)
+    bulk_upsert_tree_mock.side_effect = lambda self, workspace_name, objects, tag_value, on_uploaded=None: uploaded.setdefault(self.module, list(objects))
+    mocker.patch.object(DataGalaxyApiModules, 'create_source', autospec=True).return_value = 'new_source'
+    source_tree_mock = mocker.patch.object(DataGalaxyApiModules, 'bulk_upsert_source_tree', autospec=True)
+    source_tree_mock.side_effect = lambda self, workspace_name, source, objects, tag_value, on_uploaded=None: uploaded.setdefault('Sources', list(objects))
+    create_keys_mock = mocker.patch.object(DataGalaxyApiModules, 'create_keys', autospec=True)
+    links_mock = mocker.patch.object(DataGalaxyApiModules, 'bulk_create_links', autospec=True)
+    links_mock.side_effect = lambda self, workspace_name, links: uploaded.setdefault('Links', list(links))
+    http_client = HttpClient(verify_ssl=True)
+
+    # THEN
+    assert export_workspace('url', 'token', 'workspace', None, str(tmp_path), http_client) == 0
+    assert import_workspace('url', 'token', 'workspace_target', None, str(tmp_path), None, http_client) == 0
+
+    # ASSERT / VERIFY
+    manifest = SnapshotReader(str(tmp_path)).manifest
+    assert manifest['versionId'] == 'versionId'
+    assert {name: section['objects'] for name, section in manifest['sections'].items()} == \
+        {'Glossary': 1, 'Dictionary': 3, 'DataProcessing': 1, 'Uses': 1, 'Links': 1}
+    assert uploaded['Glossary'] == OBJECTS['Glossary']
+    assert uploaded['DataProcessing'][0][0]['dataProcessingItems'] == [{'id': 'item'}]
+    assert [obj['id'] for page in uploaded['Sources'] for obj in page] == ['table']
+    assert create_keys_mock.call_args.kwargs['keys'] == [{'tablePath': '\\Table', 'columnName': 'id', 'pkName': 'pk', 'pkOrder': 1}]
+    assert uploaded['Links'] == [[{'fromPath': '\\Term', 'fromType': '\\Concept', 'linkType': 'IsUsedBy', 'toPath': '\\Usage', 'toType': '\\Usage'}]]
+
+
+def test_read_sources_streams_the_children_of_each_source(tmp_path):
+    writer = SnapshotWriter(str(tmp_path), {})
+    section = writer.section('Dictionary')
+    for source_id in ['s1', 's2']:
+        section.write('source', {'id': source_id})
+        section.write('primary_keys', [source_id])
+        section.write('containers', [{'id': f'{source_id}-c'}])
+        section.write('fields', [{'id': f'{source_id}-f1'}])
+        section.write('fields', [{'id': f'{source_id}-f2'}])
+    writer.close()
+
+    result = []
+    for source, children in read_sources(SnapshotReader(str(tmp_path)).records('Dictionary')):
+        # The fields of the first source are left unread
+        pages = children['containers'] if source['id'] == 's1' else children['fields']
+        result.append((source['id'], children['primary_keys'], children['foreign_keys'], [obj['id'] for page in pages for obj in page]))
+
+    assert result == [('s1', ['s1'], [], ['s1-c']), ('s2', ['s2'], [], ['s2-f1', 's2-f2'])]
+
+
+def test_incomplete_snapshot_cannot_be_read(tmp_path):
+    SnapshotWriter(str(tmp_path), {}).section('Glossary').write('objects', [])
+
+    with pytest.raises(Exception, match='incomplete'):
+        SnapshotReader(str(tmp_path))
@@ -0,0 +1,43 @@
+from toolbox.api.state_store import StateStore, content_hash
+
+
+# Scenarios
+
+def test_state_is_kept_per_source_and_target(tmp_path):
+    store = StateStore(str(tmp_path / 'state.db'))
+    sync = store.sync('url_source', 'version_source', 'url_target', 'version_target')
+    other = store.sync('url_source', 'version_source', 'url_target', 'other_version')
+
+    sync.record_fingerprints('Glossary', [('\\A', b'a'), ('\\B', b'b')])
+    sync.record_id('source_id', 'target_id')
+    sync.finish('Glossary')
+
+    assert sync.last_sync('Glossary') is not None
+    assert sync.fingerprints('Glossary') == {b'a', b'b'}
+    assert sync.fingerprint('Glossary', '\\B') == b'b'
+    assert sync.target_id('source_id') == 'target_id'
+    assert other.last_sync('Glossary') is None
+    assert other.fingerprints('Glossary') == set()
+    assert other.target_id('source_id') is None
+    store.close()
+
+
+def test_state_is_read_by_the_next_run(tmp_path):
+    path = str(tmp_path / 'state.db')
+    store = StateStore(path, batch_size=2)
+    sync = store.sync('url_source', 'version_source', 'url_target', 'version_target')
+    sync.record_fingerprints('Links', [('1', b'1'), ('2', b'2'), ('3', b'3')])
+    # The rows are flushed once a batch is full
+    assert len(store.query('SELECT * FROM objects', ())) == 3
+    sync.record_fingerprints('Links', [('3', b'changed'), ('4', b'4')])
+    store.close()
+
+    store = StateStore(path)
+    sync = store.sync('url_source', 'version_source', 'url_target', 'version_target')
+    assert sync.fingerprints('Links') == {b'1', b'2', b'changed', b'4'}
+    store.close()
+
+
+def test_content_hash_ignores_the_order_of_the_keys():
+    assert content_hash({'a': 1, 'b': [1, 2]}) == content_hash({'b': [1, 2], 'a': 1})
+    assert content_hash({'a': 1}) != content_hash({'a': 2})
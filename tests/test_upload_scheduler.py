@@ -0,0 +1,72 @@
+import threading
+import time
+from toolbox.api.upload_scheduler import UploadScheduler
+
+
+# Scenarios
+
+def test_uploads_of_the_same_subtree_run_in_order():
+    done = []
+
+    def upload(name, delay):
+        def run():
+            time.sleep(delay)
+            done.append(name)
+        return run
+
+    scheduler = UploadScheduler(max_workers=4)
+    scheduler.submit('first', {'a'}, upload('first', 0.05))
+    scheduler.submit('second', {'a', 'b'}, upload('second', 0))
+    scheduler.submit('third', {'b'}, upload('third', 0))
+
+    assert scheduler.wait() == []
+    assert done == ['first', 'second', 'third']
+
+
+def test_uploads_of_different_subtrees_run_concurrently():
+    barrier = threading.Barrier(3, timeout=5)
+
+    scheduler = UploadScheduler(max_workers=3)
+    for key in ['a', 'b', 'c']:
+        # Each upload waits for the 2 others, they have to be in flight at the same time
+        scheduler.submit(key, {key}, barrier.wait)
+
+    assert scheduler.wait() == []
+
+
+def test_uploads_depending_on_a_failed_upload_are_not_sent():
+    sent = []
+
+    def fail():
+        raise Exception('Bad request')
+
+    scheduler = UploadScheduler(max_workers=2)
+    scheduler.submit('first', {'a'}, fail)
+    scheduler.submit('second', {'a'}, lambda: sent.append('second'))
+    scheduler.submit('other', {'b'}, lambda: sent.append('other'))
+
+    failures = scheduler.wait()
+    assert [name for name, _ in failures] == ['first', 'second']
+    assert str(failures[0][1]) == 'Bad request'
+    assert sent == ['other']
+
+
+def test_slots_limit_the_concurrent_uploads():
+    lock = threading.Lock()
+    inflight = [0, 0]
+
+    def upload():
+        with lock:
+            inflight[0] += 1
+            inflight[1] = max(inflight[1], inflight[0])
+        time.sleep(0.01)
+        with lock:
+            inflight[0] -= 1
+
+    slots = threading.BoundedSemaphore(2)
+    scheduler = UploadScheduler(max_workers=8, slots=slots)
+    for index in range(20):
+        scheduler.submit(str(index), {index}, upload)
+
+    assert scheduler.wait() == []
+    assert inflight[1] <= 2
@@ -1,8 +1,17 @@
 import argparse
 import logging
 import sys
+from typing import Optional
 
-from toolbox.api.http_client import HttpClient
+from toolbox.api.cassette import CassetteRecorder, CassettePlayer
+from toolbox.api.datagalaxy_api_modules import ModulesOptions
+from toolbox.api.http_client import HttpClient, COMPRESSIONS
+from toolbox.api.http_events import LatencyHistogram, SlowRequestLogger
+from toolbox.api.journal import Journal
+from toolbox.api.listing_cache import ListingCache
+from toolbox.api.state_store import StateStore
+from toolbox.api.rate_limiter import RateLimiter
+from toolbox.api.retry import RetryPolicy
 from toolbox.commands.copy_attributes import copy_attributes_parse, copy_attributes
 from toolbox.commands.copy_technologies import copy_technologies_parse, copy_technologies
 from toolbox.commands.copy_screens import copy_screens_parse, copy_screens
@@ -10,6 +19,7 @@ from toolbox.commands.delete_attributes import delete_attributes_parse, delete_a
 from toolbox.commands.copy_module import copy_module, copy_glossary_parse, copy_dictionary_parse, copy_dataprocessings_parse, copy_usages_parse
 from toolbox.commands.copy_links import copy_links, copy_links_parse
 from toolbox.commands.delete_module import delete_module, delete_glossary_parse, delete_dictionary_parse, delete_dataprocessings_parse, delete_usages_parse
+from toolbox.commands.snapshot import export_workspace, export_workspace_parse, import_workspace, import_workspace_parse
 
 
 def run(args):
@@ -25,6 +35,63 @@ def run(args):
                         action="store_true")
     parser.add_argument("--no-verify-ssl", help="disable SSL certificate verification for HTTPS requests",
                         action="store_true")
+    parser.add_argument("--pool-size", help="maximum number of kept-alive connections per host (default: 10)",
+                        type=int, default=10)
+    parser.add_argument("--max-retries", help="maximum number of retries of a failed API call (default: 5)",
+                        type=int, default=5)
+    parser.add_argument("--max-rps", help="maximum number of API requests per second, per host and token (default: unlimited)",
+                        type=float)
+    parser.add_argument("--max-inflight", help="maximum number of concurrent API requests, per host and token (default: unlimited)",
+                        type=int)
+    parser.add_argument("--compress", help="compress the request bodies sent to the API",
+                        choices=COMPRESSIONS)
+    parser.add_argument("--compress-threshold", help="minimum size in bytes of a compressed request body (default: 1024)",
+                        type=int, default=1024)
+    parser.add_argument("--compress-level", help="compression level, from 1 (fastest) to 9 (smallest) (default: 6)",
+                        type=int, default=6, choices=range(1, 10), metavar="{1-9}")
+    parser.add_argument("--metadata-cache-ttl", help="seconds during which workspaces, versions, attributes, technologies "
+                        "and screens listings are reused, 0 to disable (default: 300)",
+                        type=float, default=300)
+    parser.add_argument("--http-stats", help="log a latency histogram of the API calls per route at the end of the run",
+                        action="store_true")
+    parser.add_argument("--slow-request-threshold", help="log the API calls slower than this number of seconds",
+                        type=float)
+    parser.add_argument("--record", help="record every API call to this cassette file (tokens are not recorded)",
+                        type=str)
+    parser.add_argument("--replay", help="serve the API calls from this cassette file instead of calling the API",
+                        type=str)
+    parser.add_argument("--replay-latency-scale", help="delay replayed responses by their recorded latency multiplied "
+                        "by this factor (default: no delay)",
+                        type=float)
+    parser.add_argument("--page-limit", help="number of objects per page of an API listing, as ENDPOINT=LIMIT "
+                        "(e.g. fields=1000), can be repeated (default: 5000)",
+                        type=page_limit, action="append", default=[], metavar="ENDPOINT=LIMIT")
+    parser.add_argument("--read-ahead", help="number of pages of an API listing fetched in the background "
+                        "while the current one is processed, 0 to disable (default: 1)",
+                        type=int, default=1)
+    parser.add_argument("--upload-workers", help="maximum number of bulk uploads sent at the same time to a target workspace, "
+                        "the uploads touching the same top-level objects being always sent one after the other (default: 1)",
+                        type=int, default=1)
+    parser.add_argument("--journal", help="record the completed writes (sources, bulk uploads, keys, links, deletes) "
+                        "to this journal file, to be able to resume the run",
+                        type=str)
+    parser.add_argument("--resume", help="skip the writes recorded in the journal by a previous run (requires --journal)",
+                        action="store_true")
+    parser.add_argument("--state", help="SQLite file keeping the fingerprints of the copied objects, keys and links and the ids of "
+                        "the copied sources, so that the next runs skip what the target already holds",
+                        type=str)
+    parser.add_argument("--listing-cache", help="directory of an on-disk cache of the listings of the modules, "
+                        "reused by the runs sending the same listing requests to the same workspace versions",
+                        type=str)
+    parser.add_argument("--listing-cache-ttl", help="number of seconds after which a cached listing expires (default: 3600)",
+                        type=float, default=3600)
+    parser.add_argument("--listing-cache-frozen", help="id of a published or frozen version, whose cached listings never expire, "
+                        "can be repeated",
+                        type=str, action="append", default=[], metavar="VERSION_ID")
+    parser.add_argument("--listing-cache-refresh", help="fetch every listing from the API again and store it in the cache",
+                        action="store_true")
+    parser.add_argument("--listing-cache-bypass", help="neither read nor write the cache (writes still drop the stale listings)",
+                        action="store_true")
     subparsers = parser.add_subparsers(help='sub-command help', dest='subparsers_name')
     # Clientspace
     copy_attributes_parse(subparsers)
@@ -42,18 +109,80 @@ def run(args):
     delete_dictionary_parse(subparsers)
     delete_dataprocessings_parse(subparsers)
     delete_usages_parse(subparsers)
+    # Snapshots
+    export_workspace_parse(subparsers)
+    import_workspace_parse(subparsers)
 
     # parse some argument lists
     result = parser.parse_args(args)
+    if result.resume and not result.journal:
+        parser.error("--resume requires --journal")
     if result.verbose:
         logging.getLogger().setLevel(logging.DEBUG)
         logging.info("Verbose output")
 
+    # Listings and writes of every module
+    options = ModulesOptions(
+        page_limits=dict(result.page_limit),
+        read_ahead=result.read_ahead,
+        upload_workers=result.upload_workers,
+        journal=Journal(result.journal, resume=result.resume) if result.journal else None,
+        state=StateStore(result.state) if result.state else None,
+        listing_cache=ListingCache(
+            result.listing_cache,
+            ttl=result.listing_cache_ttl,
+            frozen_versions=result.listing_cache_frozen,
+            refresh=result.listing_cache_refresh,
+            bypass=result.listing_cache_bypass
+        ) if result.listing_cache else None
+    )
+
     # Create HTTP client with SSL verification setting
     verify_ssl = not result.no_verify_ssl
-    http_client = HttpClient(verify_ssl=verify_ssl)
+    http_client = HttpClient(
+        verify_ssl=verify_ssl,
+        pool_maxsize=result.pool_size,
+        retry_policy=RetryPolicy(max_retries=result.max_retries),
+        rate_limiter=RateLimiter(max_rps=result.max_rps, max_inflight=result.max_inflight),
+        compression=result.compress,
+        compression_threshold=result.compress_threshold,
+        compression_level=result.compress_level,
+        cache_ttl=result.metadata_cache_ttl,
+        recorder=CassetteRecorder(result.record) if result.record else None,
+        player=CassettePlayer(result.replay, result.replay_latency_scale) if result.replay else None
+    )
+    if result.http_stats:
+        http_client.add_listener(LatencyHistogram())
+    if result.slow_request_threshold is not None:
+        http_client.add_listener(SlowRequestLogger(result.slow_request_threshold))
+
+    try:
+        code = run_command(result, http_client, options)
+    finally:
+        http_client.log_summary()
+        http_client.close()
+        options.close()
+
+    if code is None:
+        parser.print_help(sys.stderr)
+        return 1
+    return code
+
+
+def page_limit(value: str) -> tuple:
+    endpoint, _, limit = value.partition('=')
+    if not endpoint or not limit.isdigit() or int(limit) < 1:
+        raise argparse.ArgumentTypeError(f"invalid page limit {value!r}, expected ENDPOINT=LIMIT")
+    return endpoint, int(limit)
 
-    # Config
+
+def run_command(result, http_client: HttpClient, options: Optional[ModulesOptions] = None):
+    """
+    Run the sub-command selected on the command line.
+
+    :param: the parsed arguments, the HTTP client shared by all API calls and the options of the module APIs
+    :return: an exit code, or None if no sub-command matched
+    """
 
     if result.subparsers_name == 'copy-attributes':
         logging.info(">>> copy_attributes")
@@ -117,7 +246,9 @@ def run(args):
             result.workspace_target,
             result.version_target,
             result.tag_value,
-            http_client
+            http_client,
+            delta=result.delta,
+            options=options
         )
         logging.info("<<< copy_glossary")
         return 0
@@ -135,7 +266,11 @@ def run(args):
             result.workspace_target,
             result.version_target,
             result.tag_value,
-            http_client
+            http_client,
+            result.engine,
+            result.workers,
+            delta=result.delta,
+            options=options
         )
         logging.info("<<< copy_dictionary")
         return 0
@@ -153,7 +288,11 @@ def run(args):
             result.workspace_target,
             result.version_target,
             result.tag_value,
-            http_client
+            http_client,
+            result.engine,
+            result.workers,
+            result.dpi_index_budget,
+            options=options
         )
         logging.info("<<< copy_dataprocessings")
         return 0
@@ -171,7 +310,9 @@ def run(args):
             result.workspace_target,
             result.version_target,
             result.tag_value,
-            http_client
+            http_client,
+            delta=result.delta,
+            options=options
         )
         logging.info("<<< copy_usages")
         return 0
@@ -187,7 +328,8 @@ def run(args):
             result.version_source,
             result.workspace_target,
             result.version_target,
-            http_client
+            http_client,
+            options=options
         )
         logging.info("<<< copy_links")
         return 0
@@ -201,7 +343,8 @@ def run(args):
             result.token,
             result.workspace,
             result.version,
-            http_client
+            http_client,
+            options=options
         )
         logging.info("<<< delete_glossary")
         return 0
@@ -214,7 +357,8 @@ def run(args):
             result.token,
             result.workspace,
             result.version,
-            http_client
+            http_client,
+            options=options
         )
         logging.info("<<< delete_dictionary")
         return 0
@@ -227,7 +371,8 @@ def run(args):
             result.token,
             result.workspace,
             result.version,
-            http_client
+            http_client,
+            options=options
         )
         logging.info("<<< delete_dataprocessings")
         return 0
@@ -240,13 +385,43 @@ def run(args):
             result.token,
             result.workspace,
             result.version,
-            http_client
+            http_client,
+            options=options
         )
         logging.info("<<< delete_usages")
         return 0
 
-    parser.print_help(sys.stderr)
-    return 1
+    if result.subparsers_name == 'export-workspace':
+        logging.info(">>> export_workspace")
+        code = export_workspace(
+            result.url,
+            result.token,
+            result.workspace,
+            result.version,
+            result.snapshot,
+            http_client,
+            result.dpi_index_budget,
+            options=options
+        )
+        logging.info("<<< export_workspace")
+        return code
+
+    if result.subparsers_name == 'import-workspace':
+        logging.info(">>> import_workspace")
+        code = import_workspace(
+            result.url,
+            result.token,
+            result.workspace,
+            result.version,
+            result.snapshot,
+            result.tag_value,
+            http_client,
+            options=options
+        )
+        logging.info("<<< import_workspace")
+        return code
+
+    return None
 
 
 if __name__ == '__main__':
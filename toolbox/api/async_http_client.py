@@ -0,0 +1,77 @@
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict, Any, Callable
+
+import requests
+
+from .http_client import HttpClient
+
+
+class AsyncHttpClient:
+    """
+    Asyncio transport on top of HttpClient.
+
+    Blocking calls are offloaded to a dedicated thread pool, so they keep using the pooled sessions,
+    the retries and the rate limiter of the wrapped HttpClient. At most `max_concurrency` calls run at the same time,
+    any number of coroutines can be waiting for their turn.
+    """
+
+    def __init__(self, http_client: HttpClient, max_concurrency: Optional[int] = None):
+        self.http_client = http_client
+        self.max_concurrency = max_concurrency if max_concurrency is not None else http_client.pool_maxsize
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    async def run(self, function: Callable, *args, **kwargs) -> Any:
+        # The semaphore is created lazily so that it belongs to the running event loop
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix='toolbox-async')
+        async with self._semaphore:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, functools.partial(function, *args, **kwargs))
+
+    async def get(
+            self, url: str,
+            headers: Optional[Dict[str, str]] = None,
+            params: Optional[Dict[str, Any]] = None) -> requests.Response:
+        return await self.run(self.http_client.get, url, headers=headers, params=params)
+
+    async def post(
+            self,
+            url: str,
+            headers: Optional[Dict[str, str]] = None,
+            json: Optional[Any] = None,
+            params: Optional[Dict[str, Any]] = None,
+            idempotent: Optional[bool] = None) -> requests.Response:
+        return await self.run(self.http_client.post, url, headers=headers, json=json, params=params, idempotent=idempotent)
+
+    async def put(
+            self, url: str,
+            headers: Optional[Dict[str, str]] = None,
+            json: Optional[Any] = None,
+            params: Optional[Dict[str, Any]] = None) -> requests.Response:
+        return await self.run(self.http_client.put, url, headers=headers, json=json, params=params)
+
+    async def delete(
+            self, url: str,
+            headers: Optional[Dict[str, str]] = None,
+            json: Optional[Any] = None,
+            params: Optional[Dict[str, Any]] = None) -> requests.Response:
+        return await self.run(self.http_client.delete, url, headers=headers, json=json, params=params)
+
+    async def patch(
+            self, url: str,
+            headers: Optional[Dict[str, str]] = None,
+            json: Optional[Any] = None,
+            params: Optional[Dict[str, Any]] = None,
+            idempotent: Optional[bool] = None) -> requests.Response:
+        return await self.run(self.http_client.patch, url, headers=headers, json=json, params=params, idempotent=idempotent)
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        self._semaphore = None
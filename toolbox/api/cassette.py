@@ -0,0 +1,124 @@
+import base64
+import gzip
+import hashlib
+import io
+import json
+import threading
+import time
+import zlib
+from collections import deque
+from datetime import timedelta
+from typing import Optional, Dict, Any
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+# Never written to a cassette
+REDACTED_HEADERS = ['Authorization', 'Set-Cookie', 'Cookie']
+REDACTED = 'REDACTED'
+
+
+def request_key(method: str, url: str, params: Optional[Dict[str, Any]], headers: Dict[str, str], data: Optional[bytes]) -> str:
+    # A request is identified by its method, URL, parameters and (uncompressed) body
+    if data is not None:
+        encoding = headers.get('Content-Encoding')
+        if encoding == 'gzip':
+            data = gzip.decompress(data)
+        elif encoding == 'deflate':
+            data = zlib.decompress(data)
+    body_digest = hashlib.sha256(data).hexdigest() if data is not None else None
+    return json.dumps([method, url, redact_params(params), body_digest], sort_keys=True)
+
+
+def redact_params(params: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    if params is None:
+        return None
+    return {key: REDACTED if 'token' in key.lower() else value for key, value in params.items()}
+
+
+class CassetteRecorder:
+    """
+    Writes every request and its response to a gzipped JSON Lines cassette.
+    Tokens are never written: the authentication headers and the token parameters are dropped.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = gzip.open(path, 'wt', encoding='utf-8')
+        self._lock = threading.Lock()
+        self.count = 0
+
+    def record(self, method: str, url: str, params: Optional[Dict[str, Any]], headers: Dict[str, str], data: Optional[bytes],
+               response: requests.Response, latency: float):
+        # Reading the content also works for streamed responses: they are then served from memory
+        content = response.content
+        try:
+            body = {'body': content.decode('utf-8')}
+        except UnicodeDecodeError:
+            body = {'body_base64': base64.b64encode(content).decode('ascii')}
+        entry = {
+            'key': request_key(method, url, params, headers, data),
+            'method': method,
+            'url': url,
+            'status': response.status_code,
+            'reason': response.reason,
+            'headers': {key: value for key, value in response.headers.items()
+                        if key not in REDACTED_HEADERS and key.lower() not in ['content-encoding', 'content-length', 'transfer-encoding']},
+            'elapsed': response.elapsed.total_seconds(),
+            'latency': latency,
+            **body
+        }
+        line = json.dumps(entry, separators=(',', ':'))
+        with self._lock:
+            self._file.write(line + '\n')
+            self.count += 1
+
+    def close(self):
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+
+
+class CassettePlayer:
+    """
+    Serves the responses of a cassette instead of calling the API.
+
+    Identical requests get their recorded responses in the recorded order (the last one is served again
+    once they have all been played). With a `latency_scale`, each response is delayed by its recorded latency
+    multiplied by the scale (1 to replay the recorded latencies), otherwise responses are immediate.
+    """
+
+    def __init__(self, path: str, latency_scale: Optional[float] = None, sleep=time.sleep):
+        self.path = path
+        self.latency_scale = latency_scale
+        self._sleep = sleep
+        self._entries: Dict[str, deque] = {}
+        self._lock = threading.Lock()
+        with gzip.open(path, 'rt', encoding='utf-8') as file:
+            for line in file:
+                entry = json.loads(line)
+                self._entries.setdefault(entry['key'], deque()).append(entry)
+
+    def play(self, method: str, url: str, params: Optional[Dict[str, Any]], headers: Dict[str, str], data: Optional[bytes]) -> requests.Response:
+        key = request_key(method, url, params, headers, data)
+        with self._lock:
+            entries = self._entries.get(key)
+            if not entries:
+                raise Exception(f'No response recorded in cassette {self.path} for {method} {url} with params {params}')
+            entry = entries.popleft() if len(entries) > 1 else entries[0]
+
+        if self.latency_scale:
+            self._sleep(entry['latency'] * self.latency_scale)
+
+        if 'body' in entry:
+            content = entry['body'].encode('utf-8')
+        else:
+            content = base64.b64decode(entry['body_base64'])
+        response = requests.Response()
+        response.status_code = entry['status']
+        response.reason = entry['reason']
+        response.headers = CaseInsensitiveDict(entry['headers'])
+        response.url = url
+        response.raw = io.BytesIO(content)
+        response.elapsed = timedelta(seconds=entry['elapsed'] * (self.latency_scale or 0))
+        return response
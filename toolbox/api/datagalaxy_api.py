@@ -1,4 +1,5 @@
 from dataclasses import dataclass
+from typing import Iterable
 
 import logging
 from .http_client import HttpClient
@@ -19,11 +20,14 @@ class DataGalaxyApi:
 PATH_SEPARATOR = "\\"
 
 
-def handle_timeserie(property: dict) -> dict:
+def handle_timeserie(property: dict) -> bool:
     # Temporary solution: only copy the latest value of the TimeSerie
+    # Returns True if a TimeSerie was found
+    found = False
     for key, value in property.items():
         if isinstance(value, dict):
             if 'lastEntry' in value:
+                found = True
                 if value['lastEntry'] is None:
                     property[key] = ""
                 else:
@@ -31,44 +35,15 @@ def handle_timeserie(property: dict) -> dict:
                     last_entry = value['lastEntry']
                     if 'date' in last_entry and 'value' in last_entry:
                         property[key] = f"{last_entry['date']}::{last_entry['value']}"
+    return found
 
 
-def remove_technology_code(node):
-    if 'technologyCode' in node:
-        del node['technologyCode']
-
-    if 'children' in node:
-        for child in node['children']:
-            remove_technology_code(child)
-
-
-def build_bulktree(objects):
+def build_bulktree(objects, normalize_timeseries=True):
+    # With normalize_timeseries=False, the TimeSeries are left as is (see normalization.py)
     root = []  # Root level for all unique trees
-
-    def find_or_create_child(children, path_segment, type_segment, functional_path_segment, attributes, dpis):
-        # Look for a child with the same path and type
-        for child in children:
-            if child['technicalName'] == path_segment and child['type'] == type_segment:
-                # If found, update the child with additional attributes directly if they don't already exist
-                for key, value in attributes.items():
-                    child.setdefault(key, value)
-                    handle_timeserie(child)
-                return child
-
-        # If not found, create a new node and add it to children
-        new_child = {
-            'name': functional_path_segment,
-            'technicalName': path_segment,
-            'type': type_segment,
-            **attributes,  # Flatten all attribute key-values into this node
-            'children': []
-        }
-        # specific for dataProcessingItems
-        if dpis is not None:
-            new_child['dataProcessingItems'] = dpis
-        handle_timeserie(new_child)
-        children.append(new_child)
-        return new_child
+    # Index of the nodes already created: (id of the parent node, technicalName, type) -> node
+    # The parent of the root nodes is None
+    nodes = {}
 
     for obj in objects:
         path_segments = obj['path'][1:].split(PATH_SEPARATOR)
@@ -76,16 +51,38 @@ def build_bulktree(objects):
         functional_path_segments = obj['functionalPath'][1:].split(PATH_SEPARATOR)
         attributes = obj.get('attributes')
         dpis = obj.get('dataProcessingItems')
+        last_level = len(path_segments) - 1
 
         current_level = root  # Start from the root level
+        parent_id = None
 
         for i, (path_segment, type_segment, functional_path_segment) in enumerate(zip(path_segments, type_segments, functional_path_segments)):
-            # Pass attributes only at the right level (the last)
-            attributes_to_send = attributes if i == (len(path_segments) - 1) else {}
-            # Pass dpis (if exists) only at the right level (the last)
-            dpis_to_send = dpis if i == (len(path_segments) - 1) else None
-            next_node = find_or_create_child(current_level, path_segment, type_segment, functional_path_segment, attributes_to_send, dpis_to_send)
-            current_level = next_node['children']  # Move to the next level of children
+            key = (parent_id, path_segment, type_segment)
+            node = nodes.get(key)
+            if node is None:
+                # Pass attributes and dpis (if exists) only at the right level (the last)
+                node = {
+                    'name': functional_path_segment,
+                    'technicalName': path_segment,
+                    'type': type_segment,
+                    **(attributes if i == last_level else {}),  # Flatten all attribute key-values into this node
+                    'children': []
+                }
+                # specific for dataProcessingItems
+                if i == last_level and dpis is not None:
+                    node['dataProcessingItems'] = dpis
+                if normalize_timeseries:
+                    handle_timeserie(node)
+                current_level.append(node)
+                nodes[key] = node
+            elif i == last_level and attributes:
+                # If found, update the node with additional attributes directly if they don't already exist
+                for attribute_key, value in attributes.items():
+                    node.setdefault(attribute_key, value)
+                if normalize_timeseries:
+                    handle_timeserie(node)
+            current_level = node['children']  # Move to the next level of children
+            parent_id = id(node)
 
     return root
 
@@ -99,8 +96,37 @@ def find_root_objects(objects: list) -> list:
     return root_objects
 
 
-def create_batches(input_arrays, max_size=5000):
-    batches = []  # This will hold the list of arrays
+def index_paths(pages: Iterable[list]) -> dict:
+    # id -> path of the objects of a listing (pages of objects)
+    return {obj['id']: obj['path'] for page in pages for obj in page}
+
+
+def group_by_root(objects: Iterable[dict], roots: list) -> dict:
+    # Objects grouped by the id of their root object, found with the first segment of their path
+    # Objects below an unknown root are ignored
+    root_ids = {root['path'][1:].split(PATH_SEPARATOR)[0]: root['id'] for root in roots}
+    groups = {root['id']: [] for root in roots}
+    for obj in objects:
+        root_id = root_ids.get(obj['path'][1:].split(PATH_SEPARATOR, 1)[0])
+        if root_id is not None:
+            groups[root_id].append(obj)
+    return groups
+
+
+def group_by_parent(objects: Iterable[dict], parents: list) -> dict:
+    # Objects grouped by the id of their parent, given by their parentId or else by the path of their parent
+    # Objects whose parent is not in `parents` are ignored
+    parent_ids = {parent['path']: parent['id'] for parent in parents}
+    groups = {parent['id']: [] for parent in parents}
+    for obj in objects:
+        parent_id = obj.get('parentId') or parent_ids.get(obj['path'].rsplit(PATH_SEPARATOR, 1)[0])
+        if parent_id in groups:
+            groups[parent_id].append(obj)
+    return groups
+
+
+def iter_batches(input_arrays, max_size=5000):
+    # Batches of at most `max_size` objects, built as the input arrays (pages) are read
     current_batch = []  # Temporary array to build chunks
 
     for arr in input_arrays:
@@ -108,28 +134,10 @@ def create_batches(input_arrays, max_size=5000):
             if len(current_batch) < max_size:
                 current_batch.append(obj)
             else:
-                # When the current array reaches max size, save it and start a new one
-                batches.append(current_batch)
+                # When the current array reaches max size, yield it and start a new one
+                yield current_batch
                 current_batch = [obj]
 
-    # Add the remaining objects in `current_batch` if it's not empty
+    # Yield the remaining objects in `current_batch` if it's not empty
     if current_batch:
-        batches.append(current_batch)
-
-    return batches
-
-
-def prune_tree(tree, target_tag):
-    # Function to recursively prune the tree
-    def recursive_prune(node):
-        if 'children' in node:
-            # Recursively prune children
-            node['children'] = [child for child in node['children'] if recursive_prune(child)]
-            # Keep this node if it has the target tag or any of its children have the tag
-            return 'tags' in node and target_tag in node['tags'] or any(recursive_prune(child) for child in node['children'])
-        # Keep leaf nodes only if they have the target tag
-        return 'tags' in node and target_tag in node['tags']
-
-    # Prune the tree recursively
-    pruned_tree = [node for node in tree if recursive_prune(node)]
-    return pruned_tree
+        yield current_batch
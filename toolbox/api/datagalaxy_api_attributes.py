@@ -26,7 +26,7 @@ class DataGalaxyApiAttributes:
     def list(self, data_type: AttributeDataType, only_custom=True) -> list:
         params = {'dataType': data_type.value.lower()}
         headers = {'Authorization': f"Bearer {self.token}"}
-        request = self.http_client.get(f"{self.url}/attributes", params=params, headers=headers)
+        request = self.http_client.get(f"{self.url}/attributes", params=params, headers=headers, cache=True)
         code = request.status_code
         body_json = request.json()
 
@@ -1,11 +1,61 @@
 import logging
-from toolbox.api.datagalaxy_api import build_bulktree, prune_tree, remove_technology_code, create_batches
+import threading
+from toolbox.api.datagalaxy_api import build_bulktree, group_by_parent, group_by_root, iter_batches
+from toolbox.api.normalization import NormalizationPipeline, bulktree_pipeline
 from .http_client import HttpClient
-from typing import Optional
+from .journal import Journal, unit_key
+from .json_stream import ResultsStream, iter_response_chunks
+from .listing_cache import ListingCache
+from .read_ahead import read_ahead
+from .state_store import StateStore
+from .upload_scheduler import UploadScheduler
+from typing import Callable, Iterable, Iterator, Optional, Tuple
+
+# Number of objects per page of the listings
+DEFAULT_PAGE_LIMIT = 5000
+
+CHILDREN_OBJECT_TYPES = ["containers", "structures", "fields"]
+
+# From this number of sources, the children are listed once for the whole version instead of once per source
+BULK_CHILDREN_MIN_SOURCES = 50
+# Above this size of the listings (in bytes), the children are listed per source anyway
+BULK_CHILDREN_MAX_BYTES = 256 * 1024 * 1024
+
+
+class ModulesOptions:
+    """
+    Settings and shared resources of the module APIs of a run, built from the command line and given to every
+    DataGalaxyApiModules of the run.
+
+    `page_limits` is the page size per endpoint ("properties", "sources", "fields", "dataProcessingItem"...) when it
+    differs from DEFAULT_PAGE_LIMIT, `read_ahead` the number of pages fetched in the background ahead of the caller and
+    `upload_workers` the maximum number of bulktree uploads sent at the same time to the workspace of a module API.
+    The journal records the completed writes to resume an interrupted run, the state the previous syncs (fingerprints,
+    source ids) and the listing cache keeps the listings on disk, see `close`.
+    """
+
+    def __init__(self, page_limits: Optional[dict] = None, read_ahead: int = 1, upload_workers: int = 1,
+                 journal: Optional[Journal] = None, state: Optional[StateStore] = None, listing_cache: Optional[ListingCache] = None):
+        self.page_limits = dict(page_limits or {})
+        self.read_ahead = read_ahead
+        self.upload_workers = upload_workers
+        self.journal = journal
+        self.state = state
+        self.listing_cache = listing_cache
+
+    def close(self):
+        if self.journal is not None:
+            self.journal.log_summary()
+            self.journal.close()
+        if self.state is not None:
+            self.state.close()
+        if self.listing_cache is not None:
+            self.listing_cache.log_summary()
 
 
 class DataGalaxyApiModules:
-    def __init__(self, url: str, token: str, workspace: dict, module: str, http_client: HttpClient):
+    def __init__(self, url: str, token: str, workspace: dict, module: str, http_client: HttpClient,
+                 options: Optional[ModulesOptions] = None):
         if module not in ["Glossary", "Dictionary", "DataProcessing", "Uses", "Links"]:
             raise Exception('The specified module does not exist.')
         self.module = module
@@ -24,37 +74,40 @@ class DataGalaxyApiModules:
         self.token = token
         self.workspace = workspace
         self.http_client = http_client
+        if options is None:
+            options = ModulesOptions()
+        self.page_limits = options.page_limits
+        self.read_ahead = options.read_ahead
+        self.upload_workers = options.upload_workers
+        self.journal = options.journal
+        self.listing_cache = options.listing_cache
+        # Additional rewrites (name, rewrite(node, depth) -> bool) applied to the bulktrees before their upload
+        self.normalization_stages = []
+        # Children listed in bulk, by (object type, include links) then by source id, see prefetch_children_objects
+        self._children_by_source = {}
+        self._upload_slots = None
+        self._lock = threading.Lock()
 
     def list_objects(self, workspace_name: str, include_links=False) -> list:
-        version_id = self.workspace['versionId']
-        params = {'versionId': version_id, 'limit': '5000'}
-        if include_links is True:
-            params['includeLinks'] = 'true'
-        else:
-            params['includeAttributes'] = 'true'
-        headers = {'Authorization': f"Bearer {self.token}"}
-        response = self.http_client.get(f"{self.url}/{self.route}", params=params, headers=headers)
-        code = response.status_code
-        body_json = response.json()
-        if code != 200:
-            raise Exception(body_json['error'])
-        logging.info(
-            f'list_objects - {len(body_json["results"])} objects found on '
-            f'workspace {workspace_name} in module {self.module}')
-        result_pages = [body_json['results']]
-        next_page = body_json["next_page"]
-        while next_page is not None:
-            logging.info('Fetching another page from the API...')
-            headers = {'Authorization': f"Bearer {self.token}"}
-            response = self.http_client.get(next_page, headers=headers)
-            body_json = response.json()
+        result_pages = []
+        for page in self.iter_pages(workspace_name, include_links):
+            if len(result_pages) > 0:
+                logging.info('Fetching another page from the API...')
+            results = list(page)
             logging.info(
-                f'list_objects - {len(body_json["results"])} objects found on '
+                f'list_objects - {len(results)} objects found on '
                 f'workspace {workspace_name} in module {self.module}')
-            next_page = body_json["next_page"]
-            result_pages.append(body_json['results'])
+            result_pages.append(results)
         return result_pages
 
+    def iter_pages(self, workspace_name: str, include_links=False) -> Iterator[list]:
+        # The next pages are fetched while the caller is processing the current one
+        return self._iter_pages(self.route, self._list_params(self.route, include_links))
+
+    def iter_objects(self, workspace_name: str, include_links=False) -> Iterator[dict]:
+        for page in self.iter_pages(workspace_name, include_links):
+            yield from page
+
     # This is a specific request for dataProcessing items
     def list_object_items(self, workspace_name: str, parent_id: str) -> list:
         if self.module != "DataProcessing":
@@ -62,55 +115,144 @@ class DataGalaxyApiModules:
 
         version_id = self.workspace['versionId']
         params = {'versionId': version_id, 'parentId': parent_id, 'includeAttributes': 'true'}
-        headers = {'Authorization': f"Bearer {self.token}"}
-        response = self.http_client.get(f"{self.url}/dataProcessingItem", params=params, headers=headers)
-        code = response.status_code
-        body_json = response.json()
-        if code != 200:
-            raise Exception(body_json['error'])
+        if 'dataProcessingItem' in self.page_limits:
+            params['limit'] = str(self.page_limits['dataProcessingItem'])
         result = []
-        result = result + body_json['results']
-        next_page = body_json["next_page"]
-        while next_page is not None:
-            headers = {'Authorization': f"Bearer {self.token}"}
-            response = self.http_client.get(next_page, headers=headers)
-            body_json = response.json()
-            next_page = body_json["next_page"]
-            result = result + body_json['results']
+        for page in self._iter_pages("dataProcessingItem", params):
+            result.extend(page)
         return result
 
+    # This is a specific request for dataProcessing items
+    def index_object_items(self, workspace_name: str, parents: list, max_bytes: int) -> Optional[dict]:
+        # All the items of the version in a few pages instead of one call per parent, grouped by parent id
+        # Returns None as soon as the listing exceeds `max_bytes`, the items are then to be listed per parent
+        if self.module != "DataProcessing":
+            raise Exception(f'This method is not available for the module {self.module}')
+
+        listing = self._list_within_budget("dataProcessingItem", self._list_params("dataProcessingItem", include_links=False), max_bytes)
+        if listing is None:
+            logging.warning(
+                f'index_object_items - items of workspace {workspace_name} larger than {max_bytes} bytes, '
+                f'listing them per parent')
+            return None
+        items, total_bytes = listing
+        index = group_by_parent(items, parents)
+        logging.info(
+            f'index_object_items - {len(items)} items found on workspace {workspace_name} '
+            f'for {len(parents)} parents ({total_bytes} bytes)')
+        return index
+
+    # This is a specific request for Dictionary
+    def prefetch_children_objects(self, workspace_name: str, sources: list, include_links=False, min_sources: int = BULK_CHILDREN_MIN_SOURCES,
+                                  max_bytes: int = BULK_CHILDREN_MAX_BYTES) -> bool:
+        # With many sources (mostly small ones), listing every type of children once for the whole version
+        # costs a few pages instead of 3 calls per source. list_children_objects then serves them from memory,
+        # unless they are larger than `max_bytes`: they are then listed per source
+        if len(sources) < min_sources:
+            logging.info(f'prefetch_children_objects - {len(sources)} sources, listing the children of each source')
+            return False
+        remaining_bytes = max_bytes
+        for object_type in CHILDREN_OBJECT_TYPES:
+            listing = self._list_within_budget(object_type, self._list_params(object_type, include_links), remaining_bytes)
+            if listing is None:
+                for listed_type in CHILDREN_OBJECT_TYPES:
+                    self._children_by_source.pop((listed_type, include_links), None)
+                logging.warning(
+                    f'prefetch_children_objects - children of workspace {workspace_name} larger than {max_bytes} bytes, '
+                    f'listing the children of each source')
+                return False
+            objects, listing_bytes = listing
+            remaining_bytes -= listing_bytes
+            groups = group_by_root(objects, sources)
+            self._children_by_source[(object_type, include_links)] = groups
+            logging.info(
+                f'prefetch_children_objects - {sum(len(group) for group in groups.values())} objects found on '
+                f'workspace: {workspace_name} of type: {object_type} for {len(sources)} sources')
+        return True
+
     # This is a specific request for Dictionary
     def list_children_objects(self, workspace_name: str, parent_id: str, object_type: str, include_links=False) -> list:
-        if object_type not in ["containers", "structures", "fields"]:
+        result_pages = []
+        for page in self.iter_children_pages(workspace_name, parent_id, object_type, include_links):
+            if len(result_pages) > 0:
+                logging.info('Fetching another page from the API...')
+            results = list(page)
+            logging.info(
+                f'list_children_objects - {len(results)} objects found on '
+                f'workspace: {workspace_name} of type: {object_type} in module {self.module}')
+            result_pages.append(results)
+        return result_pages
+
+    # This is a specific request for Dictionary
+    def iter_children_pages(self, workspace_name: str, parent_id: Optional[str], object_type: str, include_links=False) -> Iterator[list]:
+        # Without parent_id, the children of every source of the version
+        if object_type not in CHILDREN_OBJECT_TYPES:
             raise Exception('The specified object type does not exist.')
 
-        version_id = self.workspace['versionId']
+        prefetched = self._children_by_source.get((object_type, include_links))
+        if prefetched is not None and parent_id in prefetched:
+            # Served once, the memory is released as the sources are processed
+            return iter([prefetched.pop(parent_id)])
+
+        params = self._list_params(object_type, include_links)
+        if parent_id is not None:
+            params['parentId'] = parent_id
+        return self._iter_pages(object_type, params)
+
+    def page_limit(self, endpoint: str) -> int:
+        return self.page_limits.get(endpoint, DEFAULT_PAGE_LIMIT)
+
+    def _list_params(self, endpoint: str, include_links: bool) -> dict:
+        params = {'versionId': self.workspace['versionId'], 'limit': str(self.page_limit(endpoint))}
         if include_links is True:
-            params = {'versionId': version_id, 'limit': '5000', 'includeLinks': 'true', 'parentId': parent_id}
+            params['includeLinks'] = 'true'
         else:
-            params = {'versionId': version_id, 'limit': '5000', 'includeAttributes': 'true', 'parentId': parent_id}
-        headers = {'Authorization': f"Bearer {self.token}"}
-        response = self.http_client.get(f"{self.url}/{object_type}", params=params, headers=headers)
-        code = response.status_code
-        body_json = response.json()
-        if code != 200:
-            raise Exception(body_json['error'])
-        logging.info(
-            f'list_children_objects - {len(body_json["results"])} objects found on '
-            f'workspace: {workspace_name} of type: {object_type} in module {self.module}')
-        result_pages = [body_json['results']]
-        next_page = body_json["next_page"]
-        while next_page is not None:
-            logging.info('Fetching another page from the API...')
+            params['includeAttributes'] = 'true'
+        return params
+
+    def _iter_pages(self, endpoint: str, params: dict) -> Iterator[list]:
+        # Each page is read in the background thread, the caller gets whole pages
+        pages = (list(page) for page in self._stream_pages(f"{self.url}/{endpoint}", params))
+        return read_ahead(pages, self.read_ahead)
+
+    def _list_within_budget(self, endpoint: str, params: dict, max_bytes: int) -> Optional[Tuple[list, int]]:
+        # All the objects of a listing and its size in bytes, or None as soon as it exceeds `max_bytes`
+        pages = read_ahead(((list(page), page.bytes_read) for page in self._stream_pages(f"{self.url}/{endpoint}", params)), self.read_ahead)
+        objects = []
+        total_bytes = 0
+        for page, page_bytes in pages:
+            total_bytes += page_bytes
+            if total_bytes > max_bytes:
+                pages.close()
+                return None
+            objects.extend(page)
+        return objects, total_bytes
+
+    def _stream_pages(self, url: str, params: Optional[dict]) -> Iterator[ResultsStream]:
+        if self.listing_cache is not None:
+            return self.listing_cache.pages(self.url, params['versionId'], url, params, lambda: self._fetch_pages(url, params))
+        return self._fetch_pages(url, params)
+
+    def _fetch_pages(self, url: str, params: Optional[dict]) -> Iterator[ResultsStream]:
+        # Follow the next_page links, each page is decoded while it is downloaded
+        while url is not None:
             headers = {'Authorization': f"Bearer {self.token}"}
-            response = self.http_client.get(next_page, headers=headers)
-            body_json = response.json()
-            logging.info(
-                f'list_children_objects - {len(body_json["results"])} objects found on '
-                f'workspace: {workspace_name} of type: {object_type} in module {self.module}')
-            next_page = body_json["next_page"]
-            result_pages.append(body_json['results'])
-        return result_pages
+            response = self.http_client.get(url, params=params, headers=headers, stream=True)
+            if response.status_code != 200:
+                # The streamed response is closed, so that its connection goes back to the pool
+                try:
+                    body_json = response.json()
+                finally:
+                    response.close()
+                raise Exception(body_json['error'])
+            page = ResultsStream(iter_response_chunks(response))
+            yield page
+            if not page.complete:
+                # the caller did not read the whole page, read the rest of it to find the next one
+                for _ in page:
+                    pass
+            url = page.next_page
+            params = None
 
     # This is a specific request for Dictionary
     def list_keys(self, workspace_name: str, source_id: str, mode: str) -> list:
@@ -135,116 +277,188 @@ class DataGalaxyApiModules:
             raise Exception("Mode not found")
 
         version_id = self.workspace['versionId']
-        headers = {'Authorization': f"Bearer {self.token}"}
-        response = self.http_client.put(f"{self.url}/{self.route}/{version_id}/{source_id}/{mode}Keys", json=keys, headers=headers)
-        code = response.status_code
-        body_json = response.json()
-        if 200 <= code < 300:
-            logging.info(f'create_key - {mode} keys - {body_json}')
-        if 400 <= code < 500:
-            raise Exception(body_json['error'])
+        url = f"{self.url}/{self.route}/{version_id}/{source_id}/{mode}Keys"
+
+        def send():
+            headers = {'Authorization': f"Bearer {self.token}"}
+            response = self.http_client.put(url, json=keys, headers=headers)
+            code = response.status_code
+            body_json = response.json()
+            if 200 <= code < 300:
+                logging.info(f'create_key - {mode} keys - {body_json}')
+            if 400 <= code < 500:
+                raise Exception(body_json['error'])
 
+        self._journaled(f'{mode}_keys', url, keys, send)
         return 0
 
     # This is a specific request for Dictionary
     def create_source(self, workspace_name: str, source: dict) -> str:
         version_id = self.workspace['versionId']
-        headers = {'Authorization': f"Bearer {self.token}"}
-        response = self.http_client.post(f"{self.url}/{self.route}/{version_id}", json=source, headers=headers)
-        code = response.status_code
-        body_json = response.json()
-        if code != 201:
-            raise Exception(body_json['error'])
-
-        source_id = body_json['id']
-        logging.info(f'create_source - Created source {source["name"]} with id {source_id}')
-
-        return source_id
-
-    def bulk_upsert_tree(self, workspace_name: str, objects: list, tag_value: Optional[str]) -> int:
-        # Objects can be in pages, so one POST request per page
-        for page in objects:
-            # Existing entities are updated and non-existing ones are created.
-            bulktree = build_bulktree(page)
+        url = f"{self.url}/{self.route}/{version_id}"
 
-            if tag_value is not None:
-                bulktree = prune_tree(bulktree, tag_value)
-
-            # If a parent usage has a technology, it is necessary to delete the "technologyCode" property in every children
-            # Otherwise the API returns an error. Only the parent can hold the "technologyCode" property
-            for tree in bulktree:
-                if 'children' in tree:
-                    for children in tree['children']:
-                        remove_technology_code(children)
-
-            version_id = self.workspace['versionId']
+        def send():
             headers = {'Authorization': f"Bearer {self.token}"}
-            response = self.http_client.post(f"{self.url}/{self.route}/bulktree/{version_id}", json=bulktree, headers=headers)
+            response = self.http_client.post(url, json=source, headers=headers)
             code = response.status_code
             body_json = response.json()
-            if 200 <= code < 300:
-                logging.info(f'bulk_upsert_tree - {body_json}')
-            if 400 <= code < 500:
+            if code != 201:
                 raise Exception(body_json['error'])
 
+            source_id = body_json['id']
+            logging.info(f'create_source - Created source {source["name"]} with id {source_id}')
+            return source_id
+
+        # On resume, a source created by the previous run gives back its id
+        return self._journaled('source', url, source, send)
+
+    def bulktree_pipeline(self, tag_value: Optional[str], remove_technology_code: bool) -> NormalizationPipeline:
+        pipeline = bulktree_pipeline(tag_value, remove_technology_code=remove_technology_code, dpis=self.module == "DataProcessing")
+        for name, rewrite in self.normalization_stages:
+            pipeline.add_stage(name, rewrite)
+        return pipeline
+
+    def bulk_upsert_tree(self, workspace_name: str, objects: Iterable[list], tag_value: Optional[str],
+                         on_uploaded: Optional[Callable[[list], None]] = None) -> int:
+        # If a parent usage has a technology, it is necessary to delete the "technologyCode" property in every children
+        # Otherwise the API returns an error. Only the parent can hold the "technologyCode" property
+        # on_uploaded is called with the objects of each page once it is uploaded
+        pipeline = self.bulktree_pipeline(tag_value, remove_technology_code=True)
+        scheduler = self.upload_scheduler()
+        # Objects can be in pages (possibly still being fetched), so one POST request per page
+        # The pages touching different top-level objects are sent concurrently
+        try:
+            for index, page in enumerate(objects):
+                # Existing entities are updated and non-existing ones are created.
+                bulktree = pipeline.run(build_bulktree(page, normalize_timeseries=False))
+                keys = {(node['technicalName'], node['type']) for node in bulktree}
+                scheduler.submit(f'page {index + 1}', keys, self._upload(bulktree, 'bulk_upsert_tree', page, on_uploaded))
+        except Exception:
+            # Let the uploads in flight finish
+            scheduler.wait()
+            raise
+
+        self._wait_uploads(scheduler, 'bulk_upsert_tree')
+        pipeline.log_counters('bulk_upsert_tree')
         return 200
 
     # This is a specific request for Dictionary
-    def bulk_upsert_source_tree(self, workspace_name: str, source: dict, objects: list, tag_value: Optional[str]) -> int:
-        batches = create_batches(objects)
+    def bulk_upsert_source_tree(self, workspace_name: str, source: dict, objects: Iterable[list], tag_value: Optional[str],
+                                on_uploaded: Optional[Callable[[list], None]] = None) -> int:
+        # The objects can be pages still being fetched, the batches are built as they arrive
+        # on_uploaded is called with the objects of each batch once it is uploaded
+        batches = iter_batches(objects)
+        pipeline = self.bulktree_pipeline(tag_value, remove_technology_code=False)
+        scheduler = self.upload_scheduler()
+
+        # One bulktree call per batch, the batches touching different children of the source are sent concurrently
+        try:
+            for index, batch in enumerate(batches):
+                bulktree = build_bulktree([source] + batch, normalize_timeseries=False)
+                if len(bulktree) > 1:
+                    raise Exception(f"Problem while creating the bulktree for source {source['name']}")
+                bulktree = pipeline.run(bulktree[0])
+                root_key = (bulktree['technicalName'], bulktree['type'])
+                keys = {root_key + (child['technicalName'], child['type']) for child in bulktree.get('children', [])} or {root_key}
+                scheduler.submit(f"batch {index + 1} of source {source['name']}", keys,
+                                 self._upload(bulktree, 'bulk_upsert_source_tree', batch, on_uploaded))
+        except Exception:
+            # Let the uploads in flight finish
+            scheduler.wait()
+            raise
+
+        self._wait_uploads(scheduler, 'bulk_upsert_source_tree')
+        pipeline.log_counters('bulk_upsert_source_tree')
+        return 200
+
+    def upload_scheduler(self) -> UploadScheduler:
+        # The uploads of all the schedulers of this instance share its upload_workers slots
+        with self._lock:
+            if self._upload_slots is None:
+                self._upload_slots = threading.BoundedSemaphore(self.upload_workers)
+        return UploadScheduler(self.upload_workers, slots=self._upload_slots)
 
-        # One bulktree call per batch
-        for batch in batches:
-            bulktree = build_bulktree([source] + batch)
-            if len(bulktree) > 1:
-                raise Exception(f"Problem while creating the bulktree for source {source['name']}")
-            bulktree = bulktree[0]
+    def _upload(self, bulktree, caller: str, objects: list, on_uploaded: Optional[Callable[[list], None]]) -> Callable:
+        def upload():
+            result = self._post_bulktree(caller, bulktree)
+            if on_uploaded is not None:
+                on_uploaded(objects)
+            return result
+        return upload
 
-            if tag_value is not None:
-                bulktree = prune_tree(bulktree, tag_value)
+    def _post_bulktree(self, caller: str, bulktree) -> dict:
+        version_id = self.workspace['versionId']
+        url = f"{self.url}/{self.route}/bulktree/{version_id}"
 
-            version_id = self.workspace['versionId']
+        def send():
             headers = {'Authorization': f"Bearer {self.token}"}
-            response = self.http_client.post(f"{self.url}/{self.route}/bulktree/{version_id}", json=bulktree, headers=headers)
+            # Bulktree is an upsert, sending the same page twice is harmless
+            response = self.http_client.post(url, json=bulktree, headers=headers, idempotent=True)
             code = response.status_code
             body_json = response.json()
             if 200 <= code < 300:
-                logging.info(f'bulk_upsert_tree - {body_json}')
+                logging.info(f'{caller} - {body_json}')
             if 400 <= code < 500:
                 raise Exception(body_json['error'])
+            return body_json
 
-        return 200
+        return self._journaled('bulktree', url, bulktree, send)
+
+    def _journaled(self, kind: str, url: str, payload, send: Callable):
+        # With a journal, a unit of work (a write and its payload) completed by a previous run is not sent again
+        if self.listing_cache is not None:
+            # The cached listings of the version are stale once it is written to
+            self.listing_cache.invalidate(self.url, self.workspace['versionId'])
+        if self.journal is None:
+            return send()
+        return self.journal.run(kind, unit_key(url, payload), send)
+
+    def _wait_uploads(self, scheduler: UploadScheduler, caller: str):
+        failures = scheduler.wait()
+        for name, error in failures:
+            logging.error(f'{caller} - {name} failed: {error}')
+        if len(failures) > 0:
+            raise Exception(f'{caller} - {len(failures)} of {len(scheduler.uploads)} uploads failed, first error: {failures[0][1]}')
 
     def delete_objects(self, workspace_name: str, ids: list) -> int:
         if len(ids) < 1:
             logging.warning(f'Nothing to delete on workspace "{workspace_name}" in module {self.module}, aborting.')
             return 0
         version_id = self.workspace['versionId']
-        headers = {'Authorization': f"Bearer {self.token}"}
-        response = self.http_client.delete(
-                                   f"{self.url}/{self.route}/bulk/{version_id}",
-                                   json=ids,
-                                   headers=headers)
-        code = response.status_code
-        body_json = response.json()
-        if code != 200:
-            raise Exception(body_json['error'])
-        logging.info(
-            f'delete_objects - {body_json["totalDeleted"]} objects were deleted on workspace "{workspace_name}" in module {self.module}')
-        return 0
+        url = f"{self.url}/{self.route}/bulk/{version_id}"
 
-    def bulk_create_links(self, workspace_name: str, links: list) -> int:
-        # Objects can be in pages, so one POST request per page
-        for page in links:
-            version_id = self.workspace['versionId']
+        def send():
             headers = {'Authorization': f"Bearer {self.token}"}
-            response = self.http_client.post(
-                                     f"{self.url}/{self.route}/bulktree/{version_id}",
-                                     json=page,
-                                     headers=headers)
+            response = self.http_client.delete(
+                                       url,
+                                       json=ids,
+                                       headers=headers)
             code = response.status_code
             body_json = response.json()
-            if code != 201:
+            if code != 200:
                 raise Exception(body_json['error'])
-            logging.info(f"bulk_create_links - {body_json}")
+            logging.info(
+                f'delete_objects - {body_json["totalDeleted"]} objects were deleted on workspace "{workspace_name}" in module {self.module}')
+
+        self._journaled('delete', url, ids, send)
+        return 0
+
+    def bulk_create_links(self, workspace_name: str, links: list) -> int:
+        # Objects can be in pages, so one POST request per page
+        version_id = self.workspace['versionId']
+        url = f"{self.url}/{self.route}/bulktree/{version_id}"
+        for page in links:
+            def send():
+                headers = {'Authorization': f"Bearer {self.token}"}
+                response = self.http_client.post(
+                                         url,
+                                         json=page,
+                                         headers=headers)
+                code = response.status_code
+                body_json = response.json()
+                if code != 201:
+                    raise Exception(body_json['error'])
+                logging.info(f"bulk_create_links - {body_json}")
+
+            self._journaled('links', url, page, send)
         return 201
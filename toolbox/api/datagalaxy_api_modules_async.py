@@ -0,0 +1,41 @@
+from typing import Optional
+
+from .async_http_client import AsyncHttpClient
+from .datagalaxy_api_modules import DataGalaxyApiModules, ModulesOptions
+
+
+class AsyncDataGalaxyApiModules:
+    """
+    Async counterparts of the hot DataGalaxyApiModules methods.
+
+    Every call runs the synchronous implementation on the AsyncHttpClient thread pool,
+    so the two APIs always send the same requests and return the same results.
+    """
+
+    def __init__(self, url: str, token: str, workspace: dict, module: str, http_client: AsyncHttpClient,
+                 options: Optional[ModulesOptions] = None):
+        self.modules_api = DataGalaxyApiModules(
+            url=url,
+            token=token,
+            workspace=workspace,
+            module=module,
+            http_client=http_client.http_client,
+            options=options
+        )
+        self.module = module
+        self.http_client = http_client
+
+    async def list_objects(self, workspace_name: str, include_links=False) -> list:
+        return await self.http_client.run(self.modules_api.list_objects, workspace_name, include_links=include_links)
+
+    async def list_object_items(self, workspace_name: str, parent_id: str) -> list:
+        return await self.http_client.run(self.modules_api.list_object_items, workspace_name=workspace_name, parent_id=parent_id)
+
+    async def list_children_objects(self, workspace_name: str, parent_id: str, object_type: str, include_links=False) -> list:
+        return await self.http_client.run(self.modules_api.list_children_objects, workspace_name, parent_id, object_type, include_links=include_links)
+
+    async def list_keys(self, workspace_name: str, source_id: str, mode: str) -> list:
+        return await self.http_client.run(self.modules_api.list_keys, workspace_name, source_id, mode)
+
+    async def bulk_upsert_tree(self, workspace_name: str, objects: list, tag_value: Optional[str]) -> int:
+        return await self.http_client.run(self.modules_api.bulk_upsert_tree, workspace_name=workspace_name, objects=objects, tag_value=tag_value)
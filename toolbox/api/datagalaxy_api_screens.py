@@ -12,10 +12,10 @@ class DataGalaxyApiScreen:
     def list_screens(self) -> list:
         headers = {'Authorization': f"Bearer {self.token}"}
         if self.workspace is None:
-            response = self.http_client.get(f"{self.url}/attributes/screens", headers=headers)
+            response = self.http_client.get(f"{self.url}/attributes/screens", headers=headers, cache=True)
         else:
             params = {'versionId': self.workspace['versionId']}
-            response = self.http_client.get(f"{self.url}/attributes/screens", headers=headers, params=params)
+            response = self.http_client.get(f"{self.url}/attributes/screens", headers=headers, params=params, cache=True)
         code = response.status_code
         body_json = response.json()
         if code != 200:
@@ -10,7 +10,7 @@ class DataGalaxyApiTechnology:
 
     def list_technologies(self) -> list:
         headers = {'Authorization': f"Bearer {self.token}"}
-        response = self.http_client.get(f"{self.url}/technologies", headers=headers)
+        response = self.http_client.get(f"{self.url}/technologies", headers=headers, cache=True)
         code = response.status_code
         body_json = response.json()
         if code != 200:
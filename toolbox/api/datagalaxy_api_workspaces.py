@@ -1,4 +1,5 @@
 import logging
+import requests
 from .http_client import HttpClient
 
 
@@ -9,54 +10,57 @@ class DataGalaxyApiWorkspace:
         self.http_client = http_client
 
     def list_workspaces(self):
-        headers = {'Authorization': f"Bearer {self.token}"}
-        response = self.http_client.get(f"{self.url}/workspaces", headers=headers)
-        code = response.status_code
-        body_json = response.json()
-        if code == 200:
-            workspaces = []
-            for workspace in body_json["projects"]:
-                workspaces.append(workspace)
-            return workspaces
-
-        if 400 <= code < 500:
-            raise Exception(body_json['error'])
-
-        raise Exception(f'Unexpected error, code: {code}')
+        return list(self._get_workspaces().json()["projects"])
 
     def get_workspace(self, name: str) -> dict:
-        workspaces = []
-        for workspace in self.list_workspaces():
-            workspaces.append(workspace['name'])
-            if workspace['name'] == name:
-                return workspace
+        workspaces = index_by_name(self._get_workspaces(), "projects", 'name')
+        if name in workspaces:
+            # A copy, the callers can modify it
+            return dict(workspaces[name])
 
-        logging.error(f'get_workspace - Workspace {name} does not exist, workspaces found: {workspaces}')
+        logging.error(f'get_workspace - Workspace {name} does not exist, workspaces found: {list(workspaces)}')
         return None
 
     def list_versions(self, id_workspace: str) -> dict:
+        return list(self._get_versions(id_workspace).json()["results"])
+
+    def get_version(self, id_workspace: str, name: str) -> dict:
+        versions = index_by_name(self._get_versions(id_workspace), "results", 'versionName')
+        if name in versions:
+            return dict(versions[name])
+
+        logging.error(f'get_version - Version {name} does not exist, versions found: {list(versions)}')
+        return None
+
+    def _get_workspaces(self) -> requests.Response:
+        headers = {'Authorization': f"Bearer {self.token}"}
+        return check_response(self.http_client.get(f"{self.url}/workspaces", headers=headers, cache=True))
+
+    def _get_versions(self, id_workspace: str) -> requests.Response:
         headers = {'Authorization': f"Bearer {self.token}"}
         params = {'limit': '5000'}
-        response = self.http_client.get(f"{self.url}/workspaces/{id_workspace}/versions", headers=headers, params=params)
-        code = response.status_code
-        body_json = response.json()
-        if code == 200:
-            versions = []
-            for version in body_json["results"]:
-                versions.append(version)
-            return versions
+        return check_response(self.http_client.get(f"{self.url}/workspaces/{id_workspace}/versions", headers=headers, params=params, cache=True))
 
-        if 400 <= code < 500:
-            raise Exception(body_json['error'])
 
-        raise Exception(f'Unexpected error, code: {code}')
+def check_response(response: requests.Response) -> requests.Response:
+    code = response.status_code
+    if code == 200:
+        return response
 
-    def get_version(self, id_workspace: str, name: str) -> dict:
-        versions = []
-        for version in self.list_versions(id_workspace):
-            versions.append(version['versionName'])
-            if version['versionName'] == name:
-                return version
+    if 400 <= code < 500:
+        raise Exception(response.json()['error'])
 
-        logging.error(f'get_version - Version {name} does not exist, versions found: {versions}')
-        return None
+    raise Exception(f'Unexpected error, code: {code}')
+
+
+def index_by_name(response: requests.Response, results_key: str, key: str) -> dict:
+    # Built once per response: a cached listing keeps its index until it expires
+    # When several items have the same name, the first one wins
+    indexes = response.__dict__.setdefault('indexes_by_name', {})
+    index = indexes.get((results_key, key))
+    if index is None:
+        index = {}
+        for item in response.json()[results_key]:
+            index.setdefault(item[key], item)
+        indexes[(results_key, key)] = index
+    return index
@@ -0,0 +1,99 @@
+import copy
+import hashlib
+import json
+import logging
+import threading
+from typing import Iterable, Iterator, List, Optional, Set, Tuple
+
+from toolbox.api.datagalaxy_api import PATH_SEPARATOR, handle_timeserie
+from toolbox.api.state_store import SyncState
+
+
+def fingerprint(obj: dict, remove_technology_code: bool = True) -> bytes:
+    # Hash of the canonical JSON of the path, functional path (the names written), type and normalized attributes of an object
+    attributes = copy.deepcopy(obj.get('attributes') or {})
+    # The same normalization as the bulktrees (see normalization.py), so that a copied object matches its source.
+    # Only bulk_upsert_tree removes the technologyCode of the children, the source trees keep it
+    handle_timeserie(attributes)
+    if remove_technology_code and obj['path'][1:].count(PATH_SEPARATOR) > 0:
+        attributes.pop('technologyCode', None)
+    content = json.dumps([obj['path'], obj.get('functionalPath'), obj['typePath'], attributes], sort_keys=True, separators=(',', ':'))
+    return hashlib.blake2b(content.encode('utf-8'), digest_size=16).digest()
+
+
+class DeltaFilter:
+    """
+    Fingerprints of the objects of a target module, to upload only the source objects that are new or changed.
+
+    The bulktrees built from the remaining objects still hold the path of their ancestors (name and type only),
+    which is all the bulktree endpoint needs to place them. Only the fingerprints are kept in memory.
+    """
+
+    def __init__(self, fingerprints: Optional[Set[bytes]] = None, remove_technology_code: bool = True):
+        self.fingerprints = fingerprints if fingerprints is not None else set()
+        # False for the children of the sources, see fingerprint
+        self.remove_technology_code = remove_technology_code
+        self.kept = 0
+        self.skipped = 0
+        self._lock = threading.Lock()
+
+    def add_target_pages(self, pages: Iterable[list]):
+        for page in pages:
+            for obj in page:
+                self.fingerprints.add(fingerprint(obj, self.remove_technology_code))
+
+    def filter_pages(self, pages: Iterable[list], recorder: Optional['FingerprintRecorder'] = None) -> Iterator[list]:
+        # Pages left empty are dropped. The fingerprint of every object is given to the recorder
+        for page in pages:
+            changed_objects = []
+            unchanged = []
+            for obj in page:
+                obj_fingerprint = fingerprint(obj, self.remove_technology_code)
+                if self._count(obj_fingerprint not in self.fingerprints):
+                    changed_objects.append(obj)
+                    if recorder is not None:
+                        recorder.add(obj, obj_fingerprint)
+                else:
+                    unchanged.append((obj['path'], obj_fingerprint))
+            if recorder is not None and len(unchanged) > 0:
+                recorder.record(unchanged)
+            if len(changed_objects) > 0:
+                yield changed_objects
+
+    def _count(self, changed: bool) -> bool:
+        with self._lock:
+            if changed:
+                self.kept += 1
+            else:
+                self.skipped += 1
+        return changed
+
+    def log_summary(self, caller: str):
+        logging.info(f'{caller} - delta: {self.kept} new or changed objects uploaded, {self.skipped} identical objects skipped')
+
+
+class FingerprintRecorder:
+    """
+    Records the fingerprints of the objects of a module in the state of a sync: the unchanged objects right away,
+    the others once their page (or batch) is uploaded, see `uploaded`. Only the fingerprints of the objects
+    being uploaded are kept in memory.
+    """
+
+    def __init__(self, state: SyncState, kind: str):
+        self.state = state
+        self.kind = kind
+        self._pending = {}
+        self._lock = threading.Lock()
+
+    def add(self, obj: dict, obj_fingerprint: bytes):
+        # The objects are alive until they are uploaded, so their id identifies them
+        with self._lock:
+            self._pending[id(obj)] = (obj['path'], obj_fingerprint)
+
+    def record(self, fingerprints: List[Tuple[str, bytes]]):
+        self.state.record_fingerprints(self.kind, fingerprints)
+
+    def uploaded(self, objects: list):
+        with self._lock:
+            fingerprints = [self._pending.pop(id(obj)) for obj in objects]
+        self.record(fingerprints)
@@ -1,50 +1,364 @@
+import gzip
+import json as jsonlib
+import logging
+import threading
+import time
+import zlib
 import requests
-from typing import Optional, Dict, Any
+from requests.adapters import HTTPAdapter
+from typing import Callable, Optional, Dict, Any, List
+from urllib.parse import urlsplit
 from urllib3.exceptions import InsecureRequestWarning
 
+from .cassette import CassetteRecorder, CassettePlayer
+from .http_events import RequestEvent, RequestListener, templated_route
+from .rate_limiter import RateLimiter
+from .response_cache import ResponseCache
+from .retry import RetryPolicy, IDEMPOTENT_METHODS
+
+COMPRESSIONS = ["gzip", "deflate"]
+
+
+def compress_body(data: bytes, compression: str, level: int) -> bytes:
+    if compression == "gzip":
+        return gzip.compress(data, compresslevel=level, mtime=0)
+    if compression == "deflate":
+        return zlib.compress(data, level)
+    raise Exception(f'Unsupported compression: {compression}')
+
 
 class HttpClient:
     """
     Centralized HTTP client that wraps requests and manages SSL verification.
+
+    Connections are kept alive in one pool per host (so the source and the target environments
+    never compete for the same connections). The pools are shared between threads, each thread
+    getting its own lightweight session on top of them.
+
+    Transient failures (429, 502, 503, 504 and connection errors) are retried following the retry policy.
+    Only idempotent requests are retried, unless the caller flags a request as idempotent.
+
+    An optional rate limiter caps the requests per second and the requests in flight for each host and token.
+
+    Request bodies bigger than the compression threshold can be sent compressed (Content-Encoding gzip or deflate).
+
+    GET requests flagged with `cache=True` (workspaces, versions, attributes, technologies, screens) are memoized
+    for `cache_ttl` seconds, keyed by URL, token and parameters.
+
+    Listeners registered with `add_listener` are called when a request starts and ends (see http_events).
+
+    With a cassette recorder, every exchange with the API is written to a cassette; with a cassette player,
+    responses are served from a cassette and the API is never called.
     """
 
-    def __init__(self, verify_ssl: bool = True):
+    def __init__(
+            self,
+            verify_ssl: bool = True,
+            pool_connections: int = 10,
+            pool_maxsize: int = 10,
+            retry_policy: Optional[RetryPolicy] = None,
+            rate_limiter: Optional[RateLimiter] = None,
+            compression: Optional[str] = None,
+            compression_threshold: int = 1024,
+            compression_level: int = 6,
+            cache_ttl: float = 300,
+            recorder: Optional[CassetteRecorder] = None,
+            player: Optional[CassettePlayer] = None):
+        if compression is not None and compression not in COMPRESSIONS:
+            raise Exception(f'Unsupported compression: {compression}')
         self.verify_ssl = verify_ssl
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.retry_policy = retry_policy if retry_policy is not None else RetryPolicy()
+        self.rate_limiter = rate_limiter if rate_limiter is not None else RateLimiter()
+        self.compression = compression
+        self.compression_threshold = compression_threshold
+        self.compression_level = compression_level
+        self.response_cache = ResponseCache(ttl=cache_ttl)
+        self.recorder = recorder
+        self.player = player
         if not verify_ssl:
             # Suppress the warnings from urllib3
             requests.packages.urllib3.disable_warnings(category=InsecureRequestWarning)
+        self._adapters: Dict[str, HTTPAdapter] = {}
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._request_count = 0
+        self._retry_count = 0
+        self._backoff_time = 0.0
+        self._body_bytes = 0
+        self._sent_bytes = 0
+        self._listeners: List[RequestListener] = []
+
+    def _host_key(self, url: str) -> str:
+        parts = urlsplit(url)
+        return f"{parts.scheme}://{parts.netloc}"
+
+    def _adapter(self, host: str) -> HTTPAdapter:
+        with self._lock:
+            adapter = self._adapters.get(host)
+            if adapter is None:
+                adapter = HTTPAdapter(pool_connections=self.pool_connections, pool_maxsize=self.pool_maxsize)
+                self._adapters[host] = adapter
+            return adapter
+
+    def session(self, url: str) -> requests.Session:
+        # requests.Session is not thread-safe, but the urllib3 pools behind the adapters are:
+        # every thread gets its own session, mounted on the adapter shared for the host.
+        host = self._host_key(url)
+        sessions = getattr(self._local, 'sessions', None)
+        if sessions is None:
+            sessions = {}
+            self._local.sessions = sessions
+        session = sessions.get(host)
+        if session is None:
+            session = requests.Session()
+            session.mount(f"{host}/", self._adapter(host))
+            sessions[host] = session
+        return session
+
+    def request(
+            self,
+            method: str,
+            url: str,
+            headers: Optional[Dict[str, str]] = None,
+            json: Optional[Any] = None,
+            params: Optional[Dict[str, Any]] = None,
+            idempotent: Optional[bool] = None,
+            stream: bool = False,
+            cache: bool = False) -> requests.Response:
+        if idempotent is None:
+            idempotent = method in IDEMPOTENT_METHODS
+        headers = dict(headers) if headers else {}
+        data = None
+        if json is not None:
+            # Serialize the body once, it is sent as is on every attempt
+            data = jsonlib.dumps(json, allow_nan=False).encode('utf-8')
+            headers['Content-Type'] = 'application/json'
+            body_size = len(data)
+            if self.compression is not None and body_size >= self.compression_threshold:
+                data = compress_body(data, self.compression, self.compression_level)
+                headers['Content-Encoding'] = self.compression
+            with self._lock:
+                self._body_bytes += body_size
+                self._sent_bytes += len(data)
+
+        if method == "GET" and cache:
+            key = (url, headers.get('Authorization'), tuple(sorted((params or {}).items())))
+            return self.response_cache.fetch(key, url, lambda: self._send(method, url, headers, data, params, idempotent, stream))
+        response = self._send(method, url, headers, data, params, idempotent, stream)
+        if method != "GET":
+            self.response_cache.invalidate(url)
+        return response
+
+    def _send(
+            self,
+            method: str,
+            url: str,
+            headers: Dict[str, str],
+            data: Optional[bytes],
+            params: Optional[Dict[str, Any]],
+            idempotent: bool,
+            stream: bool) -> requests.Response:
+        host = self._host_key(url)
+        token = headers.get('Authorization')
+        event = RequestEvent(method=method, url=url, route=templated_route(url), request_bytes=len(data) if data else 0)
+        for listener in self._listeners:
+            listener.on_request_start(event)
+        start = time.monotonic()
+        attempt = 0
+        while True:
+            with self._lock:
+                self._request_count += 1
+            release = self.rate_limiter.acquire(host, token)
+            try:
+                response = self._transport(method, url, headers, data, params, stream)
+            except requests.exceptions.RequestException as exception:
+                release()
+                if attempt >= self.retry_policy.max_retries or not self.retry_policy.should_retry_exception(exception, idempotent):
+                    event.error = str(exception)
+                    self._end_event(event, start, None)
+                    raise
+                logging.warning(f'http_client - {method} {url} failed ({exception}), retrying')
+                self._wait(self.retry_policy.backoff(attempt))
+                attempt += 1
+                event.retries = attempt
+                continue
+            except BaseException:
+                release()
+                raise
+
+            if stream:
+                # The body of a streamed response is downloaded later: the slot is held until the response is closed
+                self._release_on_close(response, release)
+            else:
+                release()
+            if attempt >= self.retry_policy.max_retries or not self.retry_policy.should_retry_status(response.status_code, idempotent):
+                if self._listeners:
+                    self._track_response(event, start, response, stream)
+                return response
+            logging.warning(f'http_client - {method} {url} returned {response.status_code}, retrying')
+            delay = self.retry_policy.backoff(attempt, response)
+            # Release the connection before sleeping
+            response.close()
+            self._wait(delay)
+            attempt += 1
+            event.retries = attempt
+
+    def _transport(
+            self,
+            method: str,
+            url: str,
+            headers: Dict[str, str],
+            data: Optional[bytes],
+            params: Optional[Dict[str, Any]],
+            stream: bool) -> requests.Response:
+        if self.player is not None:
+            return self.player.play(method, url, params, headers, data)
+        start = time.monotonic()
+        response = self.session(url).request(method, url, headers=headers, data=data, params=params, verify=self.verify_ssl, stream=stream)
+        if self.recorder is not None:
+            self.recorder.record(method, url, params, headers, data, response, time.monotonic() - start)
+        return response
+
+    @staticmethod
+    def _release_on_close(response: requests.Response, release: Callable[[], None]):
+        close = response.close
+
+        def close_and_release():
+            try:
+                close()
+            finally:
+                release()
+        response.close = close_and_release
+
+    def _track_response(self, event: RequestEvent, start: float, response: requests.Response, stream: bool):
+        event.status = response.status_code
+        event.ttfb = response.elapsed.total_seconds()
+        if not stream:
+            self._end_event(event, start, len(response.content))
+            return
+        # The body of a streamed response is read later: the request ends when the response is closed
+        close = response.close
+        ended = []
+
+        def close_and_end():
+            close()
+            if not ended:
+                ended.append(True)
+                tell = getattr(response.raw, 'tell', None)
+                self._end_event(event, start, tell() if tell is not None else None)
+        response.close = close_and_end
+
+    def _end_event(self, event: RequestEvent, start: float, response_bytes: Optional[int]):
+        event.latency = time.monotonic() - start
+        event.response_bytes = response_bytes
+        for listener in self._listeners:
+            listener.on_request_end(event)
+
+    def add_listener(self, listener: RequestListener):
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener: RequestListener):
+        self._listeners.remove(listener)
+
+    def _wait(self, delay: float):
+        with self._lock:
+            self._retry_count += 1
+            self._backoff_time += delay
+        time.sleep(delay)
 
     def get(
             self, url: str,
             headers: Optional[Dict[str, str]] = None,
-            params: Optional[Dict[str, Any]] = None) -> requests.Response:
-        return requests.get(url, headers=headers, params=params, verify=self.verify_ssl)
+            params: Optional[Dict[str, Any]] = None,
+            stream: bool = False,
+            cache: bool = False) -> requests.Response:
+        return self.request("GET", url, headers=headers, params=params, stream=stream, cache=cache)
 
     def post(
             self,
             url: str,
             headers: Optional[Dict[str, str]] = None,
             json: Optional[Dict[str, Any]] = None,
-            params: Optional[Dict[str, Any]] = None) -> requests.Response:
-        return requests.post(url, headers=headers, json=json, params=params, verify=self.verify_ssl)
+            params: Optional[Dict[str, Any]] = None,
+            idempotent: Optional[bool] = None) -> requests.Response:
+        return self.request("POST", url, headers=headers, json=json, params=params, idempotent=idempotent)
 
     def put(
             self, url: str,
             headers: Optional[Dict[str, str]] = None,
             json: Optional[Dict[str, Any]] = None,
             params: Optional[Dict[str, Any]] = None) -> requests.Response:
-        return requests.put(url, headers=headers, json=json, params=params, verify=self.verify_ssl)
+        return self.request("PUT", url, headers=headers, json=json, params=params)
 
     def delete(
             self, url: str,
             headers: Optional[Dict[str, str]] = None,
             json: Optional[Dict[str, Any]] = None,
             params: Optional[Dict[str, Any]] = None) -> requests.Response:
-        return requests.delete(url, headers=headers, json=json, params=params, verify=self.verify_ssl)
+        return self.request("DELETE", url, headers=headers, json=json, params=params)
 
     def patch(
             self, url: str,
             headers: Optional[Dict[str, str]] = None,
             json: Optional[Dict[str, Any]] = None,
-            params: Optional[Dict[str, Any]] = None) -> requests.Response:
-        return requests.patch(url, headers=headers, json=json, params=params, verify=self.verify_ssl)
+            params: Optional[Dict[str, Any]] = None,
+            idempotent: Optional[bool] = None) -> requests.Response:
+        return self.request("PATCH", url, headers=headers, json=json, params=params, idempotent=idempotent)
+
+    def stats(self) -> dict:
+        with self._lock:
+            requests_count = self._request_count
+            retry_count = self._retry_count
+            backoff_time = self._backoff_time
+            body_bytes = self._body_bytes
+            sent_bytes = self._sent_bytes
+            adapters = list(self._adapters.values())
+        connections = 0
+        for adapter in adapters:
+            pools = adapter.poolmanager.pools
+            for key in pools.keys():
+                pool = pools.get(key)
+                if pool is not None:
+                    connections += pool.num_connections
+        return {
+            'requests': requests_count,
+            'connections': connections,
+            'reused': max(requests_count - connections, 0),
+            'retries': retry_count,
+            'backoff_time': backoff_time,
+            'throttled_time': self.rate_limiter.throttled_time,
+            'body_bytes': body_bytes,
+            'sent_bytes': sent_bytes,
+            'cache_hits': self.response_cache.hits
+        }
+
+    def log_summary(self):
+        stats = self.stats()
+        if stats['requests'] == 0:
+            return
+        logging.info(
+            f"http_client - {stats['requests']} requests sent over {stats['connections']} connections "
+            f"({stats['reused']} connection reuses)")
+        if stats['cache_hits'] > 0:
+            logging.info(f"http_client - {stats['cache_hits']} requests served by the metadata cache")
+        if self.compression is not None and stats['body_bytes'] > 0:
+            logging.info(
+                f"http_client - request bodies: {stats['body_bytes']} bytes before compression, "
+                f"{stats['sent_bytes']} bytes sent ({self.compression})")
+        if stats['throttled_time'] > 0:
+            logging.info(f"http_client - {stats['throttled_time']:.1f}s spent waiting for the rate limiter")
+        if stats['retries'] > 0:
+            logging.info(f"http_client - {stats['retries']} requests retried, {stats['backoff_time']:.1f}s spent in backoff")
+        for listener in self._listeners:
+            listener.log_summary()
+
+    def close(self):
+        with self._lock:
+            adapters = list(self._adapters.values())
+            self._adapters = {}
+        for adapter in adapters:
+            adapter.close()
+        if self.recorder is not None:
+            self.recorder.close()
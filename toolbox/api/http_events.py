@@ -0,0 +1,116 @@
+import logging
+import re
+import threading
+from dataclasses import dataclass
+from typing import Optional, Dict, List
+from urllib.parse import urlsplit
+
+# Path segments that are ids: UUIDs (possibly compound, "uuid:uuid") or numbers
+ID_SEGMENT = re.compile(r'^[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}(:.*)?$|^\d+$')
+
+# Upper bounds (in seconds) of the latency histogram buckets
+LATENCY_BUCKETS = [0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, float('inf')]
+
+
+def templated_route(url: str) -> str:
+    # "https://api.datagalaxy.com/v2/sources/bulktree/<uuid>" -> "/v2/sources/bulktree/{id}"
+    segments = urlsplit(url).path.split('/')
+    return '/'.join('{id}' if ID_SEGMENT.match(segment) else segment for segment in segments)
+
+
+@dataclass
+class RequestEvent:
+    method: str
+    url: str
+    route: str
+    request_bytes: int
+    status: Optional[int] = None
+    response_bytes: Optional[int] = None
+    # Seconds between sending the request and receiving the response headers (last attempt)
+    ttfb: Optional[float] = None
+    # Seconds between the start of the first attempt and the end of the response body
+    latency: Optional[float] = None
+    retries: int = 0
+    error: Optional[str] = None
+
+
+class RequestListener:
+    """
+    Base class of the HttpClient listeners, every method is optional.
+    """
+
+    def on_request_start(self, event: RequestEvent):
+        pass
+
+    def on_request_end(self, event: RequestEvent):
+        pass
+
+    def log_summary(self):
+        pass
+
+
+class LatencyHistogram(RequestListener):
+    """
+    Latency histogram per method and templated route.
+    """
+
+    def __init__(self, buckets: List[float] = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.routes: Dict[str, dict] = {}
+        self._lock = threading.Lock()
+
+    def on_request_end(self, event: RequestEvent):
+        if event.latency is None:
+            return
+        key = f"{event.method} {event.route}"
+        with self._lock:
+            route = self.routes.get(key)
+            if route is None:
+                route = {'count': 0, 'total': 0.0, 'max': 0.0, 'bytes': 0, 'retries': 0, 'buckets': [0] * len(self.buckets)}
+                self.routes[key] = route
+            route['count'] += 1
+            route['total'] += event.latency
+            route['max'] = max(route['max'], event.latency)
+            route['bytes'] += event.request_bytes + (event.response_bytes or 0)
+            route['retries'] += event.retries
+            for index, bound in enumerate(self.buckets):
+                if event.latency <= bound:
+                    route['buckets'][index] += 1
+                    break
+
+    def percentile(self, key: str, percentile: float) -> float:
+        # Upper bound of the bucket holding the given percentile
+        route = self.routes[key]
+        threshold = route['count'] * percentile / 100
+        seen = 0
+        for bound, count in zip(self.buckets, route['buckets']):
+            seen += count
+            if seen >= threshold:
+                return bound
+        return self.buckets[-1]
+
+    def log_summary(self):
+        for key, route in sorted(self.routes.items(), key=lambda item: -item[1]['total']):
+            logging.info(
+                f"http_stats - {key}: {route['count']} requests, {route['total']:.1f}s total, "
+                f"avg {route['total'] / route['count']:.3f}s, p50 <= {self.percentile(key, 50)}s, "
+                f"p95 <= {self.percentile(key, 95)}s, max {route['max']:.3f}s, "
+                f"{route['bytes']} bytes, {route['retries']} retries")
+
+
+class SlowRequestLogger(RequestListener):
+    """
+    Logs a warning for every request slower than `threshold` seconds.
+    """
+
+    def __init__(self, threshold: float):
+        self.threshold = threshold
+        self.count = 0
+
+    def on_request_end(self, event: RequestEvent):
+        if event.latency is not None and event.latency >= self.threshold:
+            self.count += 1
+            logging.warning(
+                f"slow_request - {event.method} {event.route} took {event.latency:.3f}s "
+                f"(ttfb {event.ttfb if event.ttfb is not None else 0:.3f}s, status {event.status}, "
+                f"{event.request_bytes} bytes sent, {event.response_bytes} bytes received, {event.retries} retries)")
@@ -0,0 +1,74 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+from typing import Any, Callable, Dict, Optional
+
+
+def unit_key(url: str, payload: Any) -> str:
+    # A unit of work is identified by its route and the hash of its content
+    content = json.dumps([url, payload], sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+
+class Journal:
+    """
+    Local journal of the completed units of work of a run (sources created, bulktree batches, key sets
+    and link batches uploaded, deletes issued), one JSON line per unit.
+
+    With `resume`, the units recorded by a previous run are skipped (a created source gives back its recorded id),
+    otherwise the journal starts empty. A line only partially written when a run was killed is ignored and removed.
+    """
+
+    def __init__(self, path: str, resume: bool = False):
+        self.path = path
+        self.resume = resume
+        self.skipped: Dict[str, int] = {}
+        self.recorded: Dict[str, int] = {}
+        self._units: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+        if resume and os.path.exists(path):
+            with open(path, 'rb+') as file:
+                # End of the last complete line
+                end = 0
+                for line in file:
+                    if not line.endswith(b'\n'):
+                        break
+                    end += len(line)
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+                    self._units[entry['key']] = entry.get('value')
+                # The next units are written after the last complete line, not glued to a partial one
+                file.truncate(end)
+            logging.info(f'journal - {len(self._units)} completed units found in {path}')
+        self._file = open(path, 'a' if resume else 'w', encoding='utf-8')
+
+    def run(self, kind: str, key: str, send: Callable[[], Any]) -> Any:
+        # Runs `send` unless the unit is already completed, returns its (recorded) value
+        with self._lock:
+            if key in self._units:
+                self.skipped[kind] = self.skipped.get(kind, 0) + 1
+                return self._units[key]
+        value = send()
+        self.record(kind, key, value)
+        return value
+
+    def record(self, kind: str, key: str, value: Optional[Any] = None):
+        line = json.dumps({'kind': kind, 'key': key, 'value': value}, separators=(',', ':'))
+        with self._lock:
+            self._units[key] = value
+            self.recorded[kind] = self.recorded.get(kind, 0) + 1
+            # Written at once, so that a killed run loses at most the unit in progress
+            self._file.write(line + '\n')
+            self._file.flush()
+
+    def log_summary(self):
+        logging.info(f'journal - skipped {self.skipped}, recorded {self.recorded} in {self.path}')
+
+    def close(self):
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
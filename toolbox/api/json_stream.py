@@ -0,0 +1,137 @@
+import codecs
+import json
+from typing import Iterable, Iterator
+
+import requests
+
+# Size of the chunks read from the network
+STREAM_CHUNK_SIZE = 64 * 1024
+
+WHITESPACES = ' \t\n\r'
+NUMBER_CHARS = '0123456789+-.eE'
+
+
+class ResultsStream:
+    """
+    Incremental decoder for a page of results: {"results": [...], "next_page": ..., ...}
+
+    Each element of `results` is yielded as soon as it has been received and parsed,
+    the other top-level fields (such as `next_page`) are available in `fields` once the page has been read.
+    Only the element being parsed (and the current chunk) are kept in memory, never the whole body.
+    """
+
+    def __init__(self, chunks: Iterable[bytes], results_key: str = 'results'):
+        self.results_key = results_key
+        self.fields = {}
+        self.complete = False
+        # Size of the body received so far
+        self.bytes_read = 0
+        self._chunks = iter(chunks)
+        self._text_decoder = codecs.getincrementaldecoder('utf-8')()
+        self._decoder = json.JSONDecoder()
+        self._buffer = ''
+        self._pos = 0
+        self._eof = False
+        self._iterator = None
+
+    @property
+    def next_page(self):
+        if not self.complete:
+            raise Exception('next_page is only known once all the results of the page have been read')
+        return self.fields.get('next_page')
+
+    def __iter__(self) -> Iterator:
+        # The page is read only once: iterating again resumes where the previous iteration stopped
+        if self._iterator is None:
+            self._iterator = self._parse()
+        return self._iterator
+
+    def _parse(self) -> Iterator:
+        self._expect('{')
+        if self._peek() == '}':
+            self._pos += 1
+            self.complete = True
+            return
+        while True:
+            key = self._value()
+            self._expect(':')
+            if key == self.results_key and self._peek() == '[':
+                self._pos += 1
+                if self._peek() == ']':
+                    self._pos += 1
+                else:
+                    while True:
+                        yield self._value()
+                        if self._separator(']'):
+                            break
+            else:
+                self.fields[key] = self._value()
+            if self._separator('}'):
+                break
+        self.complete = True
+
+    def _fill(self) -> bool:
+        # Append the next chunk to the buffer, returns False at the end of the body
+        if self._eof:
+            return False
+        # Drop the text that has already been parsed
+        self._buffer = self._buffer[self._pos:]
+        self._pos = 0
+        for chunk in self._chunks:
+            self.bytes_read += len(chunk)
+            text = self._text_decoder.decode(chunk)
+            if text:
+                self._buffer += text
+                return True
+        self._buffer += self._text_decoder.decode(b'', final=True)
+        self._eof = True
+        return False
+
+    def _peek(self) -> str:
+        # Skip the whitespaces and return the next character ('' at the end of the body)
+        while True:
+            while self._pos < len(self._buffer) and self._buffer[self._pos] in WHITESPACES:
+                self._pos += 1
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if not self._fill():
+                return ''
+
+    def _expect(self, char: str):
+        found = self._peek()
+        if found != char:
+            raise Exception(f'Invalid JSON response: expected {char!r} but found {found!r}')
+        self._pos += 1
+
+    def _separator(self, closing: str) -> bool:
+        # Consume a ',' (returns False) or the closing character (returns True)
+        found = self._peek()
+        if found not in [',', closing]:
+            raise Exception(f'Invalid JSON response: expected "," or {closing!r} but found {found!r}')
+        self._pos += 1
+        return found == closing
+
+    def _value(self):
+        self._peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError:
+                # The value is probably incomplete, wait for the next chunk
+                if not self._fill():
+                    raise
+                continue
+            # A number followed only by characters of a number (e.g. "1." or "1e") may continue in the next chunk
+            if isinstance(value, (int, float)) and not isinstance(value, bool) \
+                    and all(char in NUMBER_CHARS for char in self._buffer[end:]) and self._fill():
+                continue
+            self._pos = end
+            return value
+
+
+def iter_response_chunks(response: requests.Response, chunk_size: int = STREAM_CHUNK_SIZE) -> Iterator[bytes]:
+    # The connection goes back to the pool once the body has been read (or the stream dropped)
+    try:
+        yield from response.iter_content(chunk_size=chunk_size)
+    finally:
+        response.close()
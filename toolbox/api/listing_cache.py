@@ -0,0 +1,102 @@
+import gzip
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+from typing import Callable, Iterable, Iterator
+
+
+def _digest(*parts) -> str:
+    content = json.dumps(parts, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+
+class CachedPage(list):
+    # A page of a listing read from the cache, with the size of its JSON like a ResultsStream
+    def __init__(self, objects: list, bytes_read: int):
+        super().__init__(objects)
+        self.bytes_read = bytes_read
+
+
+class ListingCache:
+    """
+    On-disk cache of the paginated listings of the modules, one gzipped JSON Lines file (a page per line)
+    per listing, keyed by URL, versionId, route and parameters.
+
+    Entries expire after `ttl` seconds, except the ones of the `frozen_versions` (published versions that
+    cannot change anymore). With `refresh`, the entries are not read but written again, with `bypass` they are
+    neither read nor written. A listing is only stored once it was read to the end, and every write to a version
+    drops the entries of this version (even with `bypass`).
+    """
+
+    def __init__(self, directory: str, ttl: float = 3600, frozen_versions: Iterable[str] = (), refresh: bool = False,
+                 bypass: bool = False, clock=time.time):
+        self.directory = directory
+        self.ttl = ttl
+        self.frozen_versions = set(frozen_versions)
+        self.refresh = refresh
+        self.bypass = bypass
+        self.hits = 0
+        self.misses = 0
+        self._clock = clock
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def pages(self, base_url: str, version_id: str, url: str, params: dict, fetch: Callable[[], Iterator]) -> Iterator[list]:
+        if self.bypass:
+            yield from fetch()
+            return
+        version_directory = os.path.join(self.directory, _digest(base_url, version_id))
+        path = os.path.join(version_directory, f'{_digest(url, params)}.jsonl.gz')
+        if not self.refresh and self._fresh(path, version_id):
+            with self._lock:
+                self.hits += 1
+            logging.debug(f'listing_cache - {url} read from {path}')
+            yield from self._read(path)
+            return
+
+        with self._lock:
+            self.misses += 1
+        os.makedirs(version_directory, exist_ok=True)
+        descriptor, temporary_path = tempfile.mkstemp(dir=version_directory, suffix='.tmp')
+        complete = False
+        try:
+            with gzip.open(os.fdopen(descriptor, 'wb'), 'wt', encoding='utf-8') as file:
+                for page in fetch():
+                    objects = list(page)
+                    file.write(json.dumps(objects, separators=(',', ':')) + '\n')
+                    yield CachedPage(objects, page.bytes_read)
+            complete = True
+        finally:
+            # A listing interrupted (or only partially read by the caller) is not stored, neither is one
+            # whose version was written to meanwhile (its directory is gone)
+            try:
+                if complete:
+                    os.replace(temporary_path, path)
+                else:
+                    os.remove(temporary_path)
+            except FileNotFoundError:
+                pass
+
+    def invalidate(self, base_url: str, version_id: str):
+        shutil.rmtree(os.path.join(self.directory, _digest(base_url, version_id)), ignore_errors=True)
+
+    def log_summary(self):
+        logging.info(f'listing_cache - {self.hits} listings read from {self.directory}, {self.misses} fetched from the API')
+
+    def _fresh(self, path: str, version_id: str) -> bool:
+        try:
+            modified = os.path.getmtime(path)
+        except OSError:
+            return False
+        return version_id in self.frozen_versions or modified + self.ttl > self._clock()
+
+    @staticmethod
+    def _read(path: str) -> Iterator[list]:
+        with gzip.open(path, 'rt', encoding='utf-8') as file:
+            for line in file:
+                yield CachedPage(json.loads(line), len(line))
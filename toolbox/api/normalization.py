@@ -0,0 +1,123 @@
+import logging
+from typing import Callable, Optional
+
+from toolbox.api.datagalaxy_api import handle_timeserie
+
+
+class NormalizationPipeline:
+    """
+    Payload normalization of bulktrees before their upload, in a single iterative traversal.
+
+    Each stage is a rewrite `(node, depth) -> bool` applied to every node before its children
+    (the depth of the roots is 0), returning True when it touched the node.
+    When a tag value is given, the nodes without the tag and without a tagged descendant are pruned
+    after their children have been visited (a single tree given as a dict always keeps its root).
+    `counters` holds the number of nodes touched by each stage, and the number of subtrees pruned ("tags").
+    """
+
+    def __init__(self, tag_value: Optional[str] = None):
+        self.tag_value = tag_value
+        self.stages = []
+        self.counters = {}
+        if tag_value is not None:
+            self.counters['tags'] = 0
+
+    def add_stage(self, name: str, rewrite: Callable[[dict, int], bool]):
+        self.stages.append((name, rewrite))
+        self.counters.setdefault(name, 0)
+
+    def run(self, tree):
+        single_tree = isinstance(tree, dict)
+        roots = [tree] if single_tree else tree
+        kept = set()  # ids of the nodes to keep
+        stack = [(node, 0, False) for node in reversed(roots)]
+        while stack:
+            node, depth, children_done = stack.pop()
+            if not children_done:
+                for name, rewrite in self.stages:
+                    if rewrite(node, depth):
+                        self.counters[name] += 1
+                if 'children' in node:
+                    # Visit the children, then come back to this node
+                    stack.append((node, depth, True))
+                    stack.extend((child, depth + 1, False) for child in reversed(node['children']))
+                    continue
+            if self.tag_value is None:
+                continue
+            if children_done:
+                children = [child for child in node['children'] if id(child) in kept]
+                self.counters['tags'] += len(node['children']) - len(children)
+                node['children'] = children
+                if len(children) > 0:
+                    kept.add(id(node))
+                    continue
+            if 'tags' in node and self.tag_value in node['tags']:
+                kept.add(id(node))
+
+        if single_tree or self.tag_value is None:
+            return tree
+        pruned_tree = [node for node in roots if id(node) in kept]
+        self.counters['tags'] += len(roots) - len(pruned_tree)
+        return pruned_tree
+
+    def log_counters(self, caller: str):
+        counters = ', '.join(f'{name}: {count}' for name, count in self.counters.items())
+        logging.info(f'{caller} - nodes normalized ({counters})')
+
+
+def normalize_timeseries(node: dict, depth: int) -> bool:
+    return handle_timeserie(node)
+
+
+def remove_children_technology_code(node: dict, depth: int) -> bool:
+    # If a parent has a technology, it is necessary to delete the "technologyCode" property in every children
+    # Otherwise the API returns an error. Only the root can hold the "technologyCode" property
+    if depth > 0 and 'technologyCode' in node:
+        del node['technologyCode']
+        return True
+    return False
+
+
+def normalize_dpis(node: dict, depth: int) -> bool:
+    items = node.get('dataProcessingItems')
+    if not items:
+        return False
+    for item in items:
+        normalize_dpi(item)
+    return True
+
+
+def normalize_dpi(item: dict):
+    # some objects have no summary, and some have a summary but set to "None" which raises an error in the API somehow
+    if "summary" in item and item['summary'] is None:
+        item['summary'] = ""
+    # for inputs and outputs, property 'path' must be named 'entityPath'
+    if 'inputs' in item:
+        for input in item['inputs']:
+            input['entityPath'] = input['path']
+    else:
+        item['inputs'] = []
+    if 'outputs' in item:
+        for output in item['outputs']:
+            output['entityPath'] = output['path']
+    else:
+        item['outputs'] = []
+    # Mapping some DPI types
+    if item['type'] == "Search":
+        item['type'] = "Lookup"
+    if item['type'] == "ConstantVariable":
+        # item['type'] = "Variable" (temporary)
+        item['type'] = "Undefined"
+    if item['type'] == "Calculation":
+        # item['type'] = "AnalyticalCalculation" (temporary)
+        item['type'] = "Undefined"
+
+
+def bulktree_pipeline(tag_value: Optional[str], remove_technology_code: bool = False, dpis: bool = False) -> NormalizationPipeline:
+    pipeline = NormalizationPipeline(tag_value)
+    pipeline.add_stage('timeseries', normalize_timeseries)
+    if remove_technology_code:
+        pipeline.add_stage('technology_code', remove_children_technology_code)
+    if dpis:
+        pipeline.add_stage('dpis', normalize_dpis)
+    return pipeline
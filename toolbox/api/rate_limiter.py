@@ -0,0 +1,102 @@
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Optional, Dict, Tuple
+
+
+class TokenBucket:
+    """
+    Token bucket allowing `rate` acquisitions per second, with bursts of up to `capacity`.
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None, clock=time.monotonic, sleep=time.sleep):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(rate, 1.0)
+        self.tokens = self.capacity
+        self._clock = clock
+        self._sleep = sleep
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        # Returns the time spent waiting for a token
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = self._clock()
+                self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return waited
+                delay = (1 - self.tokens) / self.rate
+            self._sleep(delay)
+            waited += delay
+
+
+class RateLimiter:
+    """
+    Client-side rate governor: limits the requests per second and the requests in flight
+    for each (host, token) pair, so that every API wrapper sharing the HttpClient is throttled together.
+    """
+
+    def __init__(self, max_rps: Optional[float] = None, max_inflight: Optional[int] = None):
+        self.max_rps = max_rps
+        self.max_inflight = max_inflight
+        self._buckets: Dict[Tuple[str, Optional[str]], TokenBucket] = {}
+        self._semaphores: Dict[Tuple[str, Optional[str]], threading.BoundedSemaphore] = {}
+        self._lock = threading.Lock()
+        self.throttled_time = 0.0
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.max_rps) or bool(self.max_inflight)
+
+    def _limits(self, key: Tuple[str, Optional[str]]):
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None and self.max_rps:
+                bucket = TokenBucket(self.max_rps)
+                self._buckets[key] = bucket
+            semaphore = self._semaphores.get(key)
+            if semaphore is None and self.max_inflight:
+                semaphore = threading.BoundedSemaphore(self.max_inflight)
+                self._semaphores[key] = semaphore
+            return bucket, semaphore
+
+    @contextmanager
+    def slot(self, host: str, token: Optional[str]):
+        release = self.acquire(host, token)
+        try:
+            yield
+        finally:
+            release()
+
+    def acquire(self, host: str, token: Optional[str]) -> Callable[[], None]:
+        # Waits for a slot, returns the function releasing it (a streamed response holds its slot until it is closed)
+        if not self.enabled:
+            return lambda: None
+        bucket, semaphore = self._limits((host, token))
+        released = []
+
+        def release():
+            # Called once, whatever the number of calls
+            with self._lock:
+                if released:
+                    return
+                released.append(True)
+            if semaphore is not None:
+                semaphore.release()
+
+        if semaphore is not None:
+            semaphore.acquire()
+        try:
+            if bucket is not None:
+                waited = bucket.acquire()
+                if waited > 0:
+                    with self._lock:
+                        self.throttled_time += waited
+        except BaseException:
+            release()
+            raise
+        return release
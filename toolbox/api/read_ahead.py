@@ -0,0 +1,84 @@
+import queue
+import threading
+from typing import Iterable, Iterator
+
+# Marks the end of the items (or an error) in the buffer
+_END = object()
+
+
+def read_ahead(items: Iterable, depth: int = 1) -> Iterator:
+    """
+    Iterates over `items` in a background thread, up to `depth` items ahead of the caller.
+
+    The next items (pages of an API listing) are fetched while the caller is processing the current one.
+    The thread starts at once, so that several listings created together are fetched at the same time,
+    even before the caller asks for their first item.
+    An exception raised by `items` is raised again to the caller, in order.
+    With a depth lower than 1, the items are simply iterated in the caller's thread.
+    """
+    if depth < 1:
+        return _inline(items)
+    return ReadAhead(items, depth)
+
+
+def _inline(items: Iterable) -> Iterator:
+    yield from items
+
+
+class ReadAhead:
+    # Iterator over the items put in the buffer by the background thread, see read_ahead.
+    # The thread does not hold a reference to this object, which stops the thread once dropped by the caller
+
+    def __init__(self, items: Iterable, depth: int):
+        self._buffer = queue.Queue(maxsize=depth)
+        self._stopped = threading.Event()
+        self._done = False
+        thread = threading.Thread(target=_produce, args=(iter(items), self._buffer, self._stopped), name='read-ahead', daemon=True)
+        thread.start()
+
+    def __iter__(self) -> Iterator:
+        return self
+
+    def __next__(self):
+        if self._done:
+            raise StopIteration
+        item, error = self._buffer.get()
+        if item is _END:
+            self.close()
+            if error is not None:
+                raise error
+            raise StopIteration
+        return item
+
+    def close(self):
+        self._done = True
+        self._stopped.set()
+
+    def __del__(self):
+        self._stopped.set()
+
+
+def _put(buffer: queue.Queue, stopped: threading.Event, entry) -> bool:
+    # Wait for some room in the buffer, unless the caller stopped iterating
+    while not stopped.is_set():
+        try:
+            buffer.put(entry, timeout=0.1)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def _produce(iterator: Iterator, buffer: queue.Queue, stopped: threading.Event):
+    try:
+        for item in iterator:
+            if not _put(buffer, stopped, (item, None)):
+                return
+        _put(buffer, stopped, (_END, None))
+    except Exception as error:
+        _put(buffer, stopped, (_END, error))
+    finally:
+        # Releases the resources of the iterator (e.g. a response still being read) when the caller stopped early
+        close = getattr(iterator, 'close', None)
+        if close is not None:
+            close()
@@ -0,0 +1,64 @@
+import threading
+import time
+from typing import Callable, Dict, Tuple
+
+import requests
+
+
+class ResponseCache:
+    """
+    In-memory cache of GET responses, shared by every API wrapper using the same HttpClient.
+
+    Entries expire after `ttl` seconds. Identical requests sent at the same time are collapsed:
+    the first one goes to the API, the others wait for its response.
+    Only successful responses are cached.
+    """
+
+    def __init__(self, ttl: float = 300, clock=time.monotonic):
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._clock = clock
+        self._entries: Dict[Tuple, Tuple[float, str, requests.Response]] = {}
+        self._inflight: Dict[Tuple, threading.Event] = {}
+        self._lock = threading.Lock()
+
+    def fetch(self, key: Tuple, url: str, send: Callable[[], requests.Response]) -> requests.Response:
+        while True:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None and entry[0] > self._clock():
+                    self.hits += 1
+                    return entry[2]
+                event = self._inflight.get(key)
+                leader = event is None
+                if leader:
+                    event = threading.Event()
+                    self._inflight[key] = event
+            if not leader:
+                # Same request already in flight: wait for it, then look at the cache again
+                event.wait()
+                continue
+            try:
+                response = send()
+                # Read the body now, the response may be used by several threads
+                response.content
+                with self._lock:
+                    self.misses += 1
+                    if response.status_code == 200 and self.ttl > 0:
+                        self._entries[key] = (self._clock() + self.ttl, url, response)
+                return response
+            finally:
+                with self._lock:
+                    del self._inflight[key]
+                event.set()
+
+    def invalidate(self, url: str):
+        # A write on a route makes the cached listings of this route (and of its sub-routes) stale
+        with self._lock:
+            for key in [key for key, entry in self._entries.items() if url.startswith(entry[1]) or entry[1].startswith(url)]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries = {}
@@ -0,0 +1,59 @@
+import random
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Optional
+
+import requests
+
+
+# Methods that can be sent twice without side effects
+IDEMPOTENT_METHODS = ["GET", "HEAD", "OPTIONS", "PUT", "DELETE"]
+
+
+@dataclass
+class RetryPolicy:
+    max_retries: int = 5
+    backoff_factor: float = 0.5
+    max_backoff: float = 30.0
+    max_retry_after: float = 120.0
+    retry_statuses: tuple = (429, 502, 503, 504)
+
+    def should_retry_status(self, status_code: int, idempotent: bool) -> bool:
+        if status_code not in self.retry_statuses:
+            return False
+        # A 429 means the request was rejected before being processed, it is safe to send it again
+        return idempotent or status_code == 429
+
+    def should_retry_exception(self, exception: Exception, idempotent: bool) -> bool:
+        if not idempotent:
+            return False
+        # SSLError is a ConnectionError, but retrying will not fix a certificate problem
+        if isinstance(exception, requests.exceptions.SSLError):
+            return False
+        return isinstance(exception, (requests.exceptions.ConnectionError, requests.exceptions.Timeout))
+
+    def backoff(self, attempt: int, response: Optional[requests.Response] = None) -> float:
+        if response is not None:
+            retry_after = parse_retry_after(response.headers.get('Retry-After'))
+            if retry_after is not None:
+                return min(retry_after, self.max_retry_after)
+        # Exponential backoff with "full jitter"
+        return random.uniform(0, min(self.max_backoff, self.backoff_factor * (2 ** attempt)))
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    # Retry-After is either a number of seconds or an HTTP date
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        date = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if date.tzinfo is None:
+        date = date.replace(tzinfo=timezone.utc)
+    return max((date - datetime.now(timezone.utc)).total_seconds(), 0.0)
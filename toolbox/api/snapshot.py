@@ -0,0 +1,83 @@
+import gzip
+import json
+import os
+import time
+from typing import Any, Iterator, Tuple
+
+SNAPSHOT_FORMAT = 1
+MANIFEST_FILE = 'manifest.json'
+
+
+class SnapshotSection:
+    # One gzipped JSON Lines file, a [type, data] record per line
+    def __init__(self, path: str):
+        self.path = path
+        self.records = 0
+        self.objects = 0
+        self._file = gzip.open(path, 'wt', encoding='utf-8')
+
+    def write(self, record_type: str, data: Any):
+        self._file.write(json.dumps([record_type, data], separators=(',', ':')) + '\n')
+        self.records += 1
+        self.objects += len(data) if isinstance(data, list) else 1
+
+    def close(self):
+        self._file.close()
+
+
+class SnapshotWriter:
+    """
+    Writes a snapshot of a workspace version to a directory: a gzipped JSON Lines file per section (module or links),
+    written as the objects are listed, then a manifest. A snapshot without manifest is incomplete and cannot be read.
+    """
+
+    def __init__(self, directory: str, metadata: dict):
+        self.directory = directory
+        self.metadata = metadata
+        self.sections = {}
+        os.makedirs(directory, exist_ok=True)
+        manifest_path = os.path.join(directory, MANIFEST_FILE)
+        if os.path.exists(manifest_path):
+            # The previous snapshot is overwritten
+            os.remove(manifest_path)
+
+    def section(self, name: str) -> SnapshotSection:
+        section = SnapshotSection(os.path.join(self.directory, f'{name}.jsonl.gz'))
+        self.sections[name] = section
+        return section
+
+    def close(self):
+        for section in self.sections.values():
+            section.close()
+        manifest = {
+            'format': SNAPSHOT_FORMAT,
+            **self.metadata,
+            'exportedAt': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+            'sections': {name: {'file': os.path.basename(section.path), 'records': section.records, 'objects': section.objects}
+                         for name, section in self.sections.items()}
+        }
+        with open(os.path.join(self.directory, MANIFEST_FILE), 'w', encoding='utf-8') as file:
+            json.dump(manifest, file, indent=2)
+
+
+class SnapshotReader:
+    """
+    Reads a snapshot written by SnapshotWriter, the records of a section being read one line at a time.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        manifest_path = os.path.join(directory, MANIFEST_FILE)
+        if not os.path.exists(manifest_path):
+            raise Exception(f'No manifest in {directory}, the snapshot does not exist or is incomplete')
+        with open(manifest_path, 'r', encoding='utf-8') as file:
+            self.manifest = json.load(file)
+        if self.manifest.get('format') != SNAPSHOT_FORMAT:
+            raise Exception(f'Unsupported snapshot format {self.manifest.get("format")} in {directory}')
+        self.sections = self.manifest['sections']
+
+    def records(self, name: str) -> Iterator[Tuple[str, Any]]:
+        with gzip.open(os.path.join(self.directory, self.sections[name]['file']), 'rt', encoding='utf-8') as file:
+            for line in file:
+                record_type, data = json.loads(line)
+                yield record_type, data
@@ -0,0 +1,152 @@
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from typing import Any, Iterable, Optional, Set, Tuple
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS scopes (
+    id INTEGER PRIMARY KEY,
+    source_url TEXT NOT NULL,
+    source_version_id TEXT NOT NULL,
+    target_url TEXT NOT NULL,
+    target_version_id TEXT NOT NULL,
+    tag_value TEXT NOT NULL,
+    UNIQUE (source_url, source_version_id, target_url, target_version_id, tag_value)
+);
+CREATE TABLE IF NOT EXISTS objects (
+    scope_id INTEGER NOT NULL,
+    kind TEXT NOT NULL,
+    path TEXT NOT NULL,
+    fingerprint BLOB NOT NULL,
+    PRIMARY KEY (scope_id, kind, path)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS ids (
+    scope_id INTEGER NOT NULL,
+    source_id TEXT NOT NULL,
+    target_id TEXT NOT NULL,
+    PRIMARY KEY (scope_id, source_id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS syncs (
+    scope_id INTEGER NOT NULL,
+    kind TEXT NOT NULL,
+    synced_at REAL NOT NULL,
+    PRIMARY KEY (scope_id, kind)
+) WITHOUT ROWID;
+"""
+
+
+def content_hash(value: Any) -> bytes:
+    content = json.dumps(value, sort_keys=True, separators=(',', ':'))
+    return hashlib.blake2b(content.encode('utf-8'), digest_size=16).digest()
+
+
+class StateStore:
+    """
+    Local SQLite file remembering what previous runs wrote to a target: the fingerprints of the objects
+    (and of the keys and links), the id given by the target to each source and the time of the last complete sync.
+
+    The state is kept per source and target (URL and versionId) and tag filter, see `sync`. The writes are buffered and
+    flushed `batch_size` rows at a time, each flush in a single transaction.
+    """
+
+    def __init__(self, path: str, batch_size: int = 1000):
+        self.path = path
+        self.batch_size = batch_size
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute('PRAGMA journal_mode=WAL')
+        self._connection.execute('PRAGMA synchronous=NORMAL')
+        self._connection.executescript(SCHEMA)
+        self._lock = threading.RLock()
+        self._objects = []
+        self._ids = []
+
+    def sync(self, source_url: str, source_version_id: str, target_url: str, target_version_id: str,
+             tag_value: Optional[str] = None) -> 'SyncState':
+        # The objects recorded by a run filtered on a tag are not all in the target, so each tag filter has its own state
+        key = (source_url, source_version_id, target_url, target_version_id, tag_value or '')
+        with self._lock, self._connection:
+            self._connection.execute(
+                'INSERT OR IGNORE INTO scopes (source_url, source_version_id, target_url, target_version_id, tag_value) VALUES (?, ?, ?, ?, ?)', key)
+            scope_id = self._connection.execute(
+                'SELECT id FROM scopes WHERE source_url = ? AND source_version_id = ? AND target_url = ? AND target_version_id = ? '
+                'AND tag_value = ?', key).fetchone()[0]
+        return SyncState(self, scope_id)
+
+    def add_objects(self, rows: Iterable[Tuple[int, str, str, bytes]]):
+        with self._lock:
+            self._objects.extend(rows)
+            if len(self._objects) >= self.batch_size:
+                self.flush()
+
+    def add_id(self, row: Tuple[int, str, str]):
+        with self._lock:
+            self._ids.append(row)
+            if len(self._ids) >= self.batch_size:
+                self.flush()
+
+    def flush(self):
+        with self._lock, self._connection:
+            if len(self._objects) > 0:
+                self._connection.executemany(
+                    'INSERT OR REPLACE INTO objects (scope_id, kind, path, fingerprint) VALUES (?, ?, ?, ?)', self._objects)
+                self._objects = []
+            if len(self._ids) > 0:
+                self._connection.executemany('INSERT OR REPLACE INTO ids (scope_id, source_id, target_id) VALUES (?, ?, ?)', self._ids)
+                self._ids = []
+
+    def query(self, sql: str, params: tuple) -> list:
+        # The pending writes are not read back: they are flushed by `execute` and `close`
+        with self._lock:
+            return self._connection.execute(sql, params).fetchall()
+
+    def execute(self, sql: str, params: tuple):
+        with self._lock:
+            self.flush()
+            with self._connection:
+                self._connection.execute(sql, params)
+
+    def close(self):
+        with self._lock:
+            self.flush()
+            self._connection.close()
+
+
+class SyncState:
+    """
+    State of the syncs from one source version to one target version, `kind` being the module name,
+    "Keys" or "Links".
+    """
+
+    def __init__(self, store: StateStore, scope_id: int):
+        self.store = store
+        self.scope_id = scope_id
+
+    def last_sync(self, kind: str) -> Optional[float]:
+        rows = self.store.query('SELECT synced_at FROM syncs WHERE scope_id = ? AND kind = ?', (self.scope_id, kind))
+        return rows[0][0] if len(rows) > 0 else None
+
+    def fingerprints(self, kind: str) -> Set[bytes]:
+        rows = self.store.query('SELECT fingerprint FROM objects WHERE scope_id = ? AND kind = ?', (self.scope_id, kind))
+        return {row[0] for row in rows}
+
+    def fingerprint(self, kind: str, path: str) -> Optional[bytes]:
+        rows = self.store.query('SELECT fingerprint FROM objects WHERE scope_id = ? AND kind = ? AND path = ?', (self.scope_id, kind, path))
+        return rows[0][0] if len(rows) > 0 else None
+
+    def record_fingerprints(self, kind: str, fingerprints: Iterable[Tuple[str, bytes]]):
+        self.store.add_objects((self.scope_id, kind, path, fingerprint) for path, fingerprint in fingerprints)
+
+    def target_id(self, source_id: str) -> Optional[str]:
+        rows = self.store.query('SELECT target_id FROM ids WHERE scope_id = ? AND source_id = ?', (self.scope_id, source_id))
+        return rows[0][0] if len(rows) > 0 else None
+
+    def record_id(self, source_id: str, target_id: str):
+        self.store.add_id((self.scope_id, source_id, target_id))
+
+    def finish(self, kind: str):
+        # Called once every write of a sync succeeded: only then are the fingerprints used instead of listing the target
+        self.store.execute('INSERT OR REPLACE INTO syncs (scope_id, kind, synced_at) VALUES (?, ?, ?)', (self.scope_id, kind, time.time()))
+        logging.info(f'state - {kind} sync recorded in {self.store.path}')
@@ -0,0 +1,73 @@
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Callable, Hashable, Iterable, List, Optional, Tuple
+
+
+class UploadScheduler:
+    """
+    Runs uploads (bulktree batches) concurrently, except the ones touching the same subtree.
+
+    Each upload is submitted with the keys of the subtrees it touches: it starts once the uploads previously
+    submitted with any of these keys are done, so their ancestors exist. If one of them failed, it is not sent
+    and fails too. `slots`, shared by the schedulers of a target workspace, limits the number of concurrent uploads
+    to this workspace. At most `max_pending` uploads are waiting or in flight, `submit` blocks beyond.
+    """
+
+    def __init__(self, max_workers: int, slots: Optional[threading.BoundedSemaphore] = None, max_pending: Optional[int] = None):
+        self.uploads: List[Tuple[str, Future]] = []
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='toolbox-upload')
+        self._slots = slots
+        self._pending = threading.BoundedSemaphore(max_pending if max_pending is not None else 2 * max_workers)
+        self._last = {}
+        self._lock = threading.Lock()
+
+    def submit(self, name: str, keys: Iterable[Hashable], upload: Callable) -> Future:
+        self._pending.acquire()
+        future = Future()
+        with self._lock:
+            dependencies = {id(last): last for last in (self._last.get(key) for key in keys) if last is not None}
+            for key in keys:
+                self._last[key] = future
+            remaining = [len(dependencies)]
+        self.uploads.append((name, future))
+
+        def on_dependency_done(_):
+            with self._lock:
+                remaining[0] -= 1
+                ready = remaining[0] == 0
+            if ready:
+                self._start(name, future, list(dependencies.values()), upload)
+
+        if len(dependencies) == 0:
+            self._start(name, future, [], upload)
+        for dependency in dependencies.values():
+            dependency.add_done_callback(on_dependency_done)
+        return future
+
+    def _start(self, name: str, future: Future, dependencies: List[Future], upload: Callable):
+        failed = [dependency for dependency in dependencies if dependency.exception() is not None]
+        if len(failed) > 0:
+            self._pending.release()
+            future.set_exception(Exception(f'{name} not sent, an upload of the same subtree failed'))
+            return
+        self._executor.submit(self._run, future, upload)
+
+    def _run(self, future: Future, upload: Callable):
+        try:
+            if self._slots is not None:
+                with self._slots:
+                    result = upload()
+            else:
+                result = upload()
+        except Exception as error:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+        finally:
+            self._pending.release()
+
+    def wait(self) -> List[Tuple[str, BaseException]]:
+        # Waits for every upload, returns the failed ones with their error
+        wait([future for _, future in self.uploads])
+        self._executor.shutdown()
+        return [(name, future.exception()) for name, future in self.uploads if future.exception() is not None]
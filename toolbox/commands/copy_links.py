@@ -1,8 +1,10 @@
+import itertools
 import logging
-from typing import Optional
+from typing import Iterator, Optional
 
-from toolbox.api.datagalaxy_api_modules import DataGalaxyApiModules
+from toolbox.api.datagalaxy_api_modules import CHILDREN_OBJECT_TYPES, DataGalaxyApiModules, ModulesOptions
 from toolbox.api.http_client import HttpClient
+from toolbox.api.state_store import content_hash
 from toolbox.commands.utils import config_workspace
 
 
@@ -14,7 +16,8 @@ def copy_links(url_source: str,
                version_source_name: Optional[str],
                workspace_target_name: str,
                version_target_name: Optional[str],
-               http_client: HttpClient) -> int:
+               http_client: HttpClient,
+               options: Optional[ModulesOptions] = None) -> int:
     if token_target is None:
         token_target = token_source
 
@@ -45,71 +48,72 @@ def copy_links(url_source: str,
     if not target_workspace:
         return 1
 
-    # Fetch all objects from source workspace
-    source_glossary_api = DataGalaxyApiModules(
-        url=url_source,
-        token=token_source,
-        workspace=source_workspace,
-        module="Glossary",
-        http_client=http_client
-    )
-    source_dictionary_api = DataGalaxyApiModules(
-        url=url_source,
-        token=token_source,
-        workspace=source_workspace,
-        module="Dictionary",
-        http_client=http_client
-    )
-    source_dataprocessings_api = DataGalaxyApiModules(
-        url=url_source,
-        token=token_source,
-        workspace=source_workspace,
-        module="DataProcessing",
-        http_client=http_client
-    )
-    source_usages_api = DataGalaxyApiModules(
-        url=url_source,
-        token=token_source,
-        workspace=source_workspace,
-        module="Uses",
-        http_client=http_client
-    )
-
-    # Find all links in source workspace
-    source_glossary = source_glossary_api.list_objects(workspace_source_name, include_links=True)
-    source_dataprocessings = source_dataprocessings_api.list_objects(workspace_source_name, include_links=True)
-    source_usages = source_usages_api.list_objects(workspace_source_name, include_links=True)
-    source_dictionary = source_dictionary_api.list_objects(workspace_source_name, include_links=True)
-    source_dictionary_children = []
-    for page in source_dictionary:
-        for source in page:
-            source_id = source['id']
-            containers = source_dictionary_api.list_children_objects(workspace_source_name, source_id, "containers", include_links=True)
-            structures = source_dictionary_api.list_children_objects(workspace_source_name, source_id, "structures", include_links=True)
-            fields = source_dictionary_api.list_children_objects(workspace_source_name, source_id, "fields", include_links=True)
-            source_dictionary_children += containers
-            source_dictionary_children += structures
-            source_dictionary_children += fields
-    # Collecting all links
-    link_batches = create_batches_of_links(source_glossary + source_dictionary + source_dataprocessings + source_usages + source_dictionary_children)
+    # Collecting all links, the links of a page are parsed while the next one is fetched
+    link_batches = create_batches_of_links(iter_link_pages(url_source, token_source, source_workspace, workspace_source_name, http_client, options))
     count_links = 0
     for batch in link_batches:
         count_links += len(batch)
     logging.info(f'copy-links - {count_links} links found')
 
+    # With a state file, the links created by the last complete sync are not sent again
+    state = None
+    if options is not None and options.state is not None:
+        state = options.state.sync(url_source, source_workspace['versionId'], url_target, target_workspace['versionId'])
+        link_hashes = [[content_hash(link) for link in batch] for batch in link_batches]
+        if state.last_sync('Links') is not None:
+            created_links = state.fingerprints('Links')
+            link_batches = [[link for link, link_hash in zip(batch, hashes) if link_hash not in created_links]
+                            for batch, hashes in zip(link_batches, link_hashes)]
+            link_batches = [batch for batch in link_batches if len(batch) > 0]
+            logging.info(f'copy-links - {count_links - sum(len(batch) for batch in link_batches)} links already created by the last sync')
+
     target_links_api = DataGalaxyApiModules(
         url=url_target,
         token=token_target,
         workspace=target_workspace,
         module="Links",
-        http_client=http_client
+        http_client=http_client,
+        options=options
     )
 
     # Creating links in target workspace
     target_links_api.bulk_create_links(workspace_name=workspace_target_name, links=link_batches)
+    if state is not None:
+        state.record_fingerprints('Links', ((link_hash.hex(), link_hash) for hashes in link_hashes for link_hash in hashes))
+        state.finish('Links')
     return 0
 
 
+def iter_link_pages(url: str, token: str, workspace: dict, workspace_name: str, http_client: HttpClient,
+                    options: Optional[ModulesOptions] = None) -> Iterator[list]:
+    # The pages of the objects of every module of a workspace, with their links
+    glossary_api = DataGalaxyApiModules(url=url, token=token, workspace=workspace, module="Glossary", http_client=http_client, options=options)
+    dictionary_api = DataGalaxyApiModules(url=url, token=token, workspace=workspace, module="Dictionary", http_client=http_client, options=options)
+    dataprocessings_api = DataGalaxyApiModules(url=url, token=token, workspace=workspace, module="DataProcessing", http_client=http_client, options=options)
+    usages_api = DataGalaxyApiModules(url=url, token=token, workspace=workspace, module="Uses", http_client=http_client, options=options)
+    sources = []
+
+    def dictionary_pages():
+        for page in dictionary_api.iter_pages(workspace_name, include_links=True):
+            sources.extend(page)
+            yield page
+
+    def dictionary_children_pages():
+        # The sources are known once their pages have been read
+        dictionary_api.prefetch_children_objects(workspace_name, sources, include_links=True)
+        for source in sources:
+            for object_type in CHILDREN_OBJECT_TYPES:
+                yield from dictionary_api.list_children_objects(workspace_name, source['id'], object_type, include_links=True)
+
+    return itertools.chain(
+        glossary_api.iter_pages(workspace_name, include_links=True),
+        dictionary_pages(),
+        dataprocessings_api.iter_pages(workspace_name, include_links=True),
+        usages_api.iter_pages(workspace_name, include_links=True),
+        dictionary_children_pages()
+    )
+
+
 def create_batches_of_links(input_arrays, max_size=5000):
     batches = []  # This will hold the list of arrays
     current_batch = []  # Temporary array to build chunks
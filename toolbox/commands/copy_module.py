@@ -1,9 +1,19 @@
-from typing import Optional
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Iterable, Iterator, Optional
+import asyncio
+import itertools
 import logging
 
-from toolbox.api.datagalaxy_api_modules import DataGalaxyApiModules
+from toolbox.api.async_http_client import AsyncHttpClient
+from toolbox.api.datagalaxy_api import index_paths
+from toolbox.api.datagalaxy_api_modules import CHILDREN_OBJECT_TYPES, DataGalaxyApiModules, ModulesOptions
+from toolbox.api.datagalaxy_api_modules_async import AsyncDataGalaxyApiModules
+from toolbox.api.delta import DeltaFilter, FingerprintRecorder, fingerprint
 from toolbox.api.http_client import HttpClient
-from toolbox.commands.utils import config_workspace
+from toolbox.api.state_store import SyncState, content_hash
+from toolbox.commands.utils import Progress, config_workspace
+
+ENGINES = ["sync", "async"]
 
 
 def copy_module(module: str,
@@ -16,7 +26,12 @@ def copy_module(module: str,
                 workspace_target_name: str,
                 version_target_name: Optional[str],
                 tag_value: Optional[str],
-                http_client: HttpClient) -> int:
+                http_client: HttpClient,
+                engine: str = "sync",
+                workers: int = 1,
+                dpi_index_budget: int = 256,
+                delta: bool = False,
+                options: Optional[ModulesOptions] = None) -> int:
     # Tokens
     if token_target is None:
         token_target = token_source
@@ -55,7 +70,8 @@ def copy_module(module: str,
         token=token_source,
         workspace=source_workspace,
         module=module,
-        http_client=http_client
+        http_client=http_client,
+        options=options
     )
 
     # Target module
@@ -64,179 +80,397 @@ def copy_module(module: str,
         token=token_target,
         workspace=target_workspace,
         module=module,
-        http_client=http_client
+        http_client=http_client,
+        options=options
     )
 
-    # Fetch objects from source workspace
-    source_objects = source_module_api.list_objects(workspace_source_name)
-    if source_objects == [[]]:
+    if delta and module == "DataProcessing":
+        raise Exception(f'The delta mode is not available for the module {module}')
+
+    # Fetch objects from source workspace, the next pages are fetched while the current one is copied
+    pages = source_module_api.iter_pages(workspace_source_name)
+    first_page = next(pages, [])
+    if len(first_page) < 1:
         logging.warning(f'copy-module - No object in source workspace {workspace_source_name}, aborting.')
         return 1
+    source_objects = itertools.chain([first_page], pages)
+
+    # With a state file, the fingerprints recorded by the last complete sync replace the listing of the target
+    state = None
+    if options is not None and options.state is not None and module != "DataProcessing":
+        state = options.state.sync(url_source, source_workspace['versionId'], url_target, target_workspace['versionId'], tag_value)
+
+    # With the delta mode, only the objects missing or different in the target workspace are uploaded
+    delta_filter = None
+    # The children of the sources keep their technologyCode, see bulk_upsert_source_tree
+    remove_technology_code = module != "Dictionary"
+    if state is not None and state.last_sync(module) is not None:
+        delta_filter = DeltaFilter(state.fingerprints(module), remove_technology_code)
+        logging.info(f'copy-module - delta: {len(delta_filter.fingerprints)} objects recorded by the last sync to {workspace_target_name}')
+    elif delta:
+        delta_filter = DeltaFilter(remove_technology_code=remove_technology_code)
+        if module == "Dictionary":
+            for object_type in CHILDREN_OBJECT_TYPES:
+                delta_filter.add_target_pages(target_module_api.iter_children_pages(workspace_target_name, None, object_type))
+        else:
+            delta_filter.add_target_pages(target_module_api.iter_pages(workspace_target_name))
+        logging.info(f'copy-module - delta: {len(delta_filter.fingerprints)} objects found in target workspace {workspace_target_name}')
+    elif state is not None:
+        # First sync: every object is uploaded and recorded
+        delta_filter = DeltaFilter(remove_technology_code=remove_technology_code)
 
     # Specific for Dictionary
     if module == "Dictionary":
-        for page in source_objects:
-            for source in page:
-                # fetch children objects for each source
-                source_id = source['id']
-                source_path = source['path']
-                # Children objects
-                containers = source_module_api.list_children_objects(workspace_source_name, source_id, "containers")
-                structures = source_module_api.list_children_objects(workspace_source_name, source_id, "structures")
-                fields = source_module_api.list_children_objects(workspace_source_name, source_id, "fields")
-
-                primary_keys = source_module_api.list_keys(workspace_source_name, source_id, "primary")
-                foreign_keys = source_module_api.list_keys(workspace_source_name, source_id, "foreign")
-                pks = []
-                fks = []
-                # PK
-                for primary_key in primary_keys:
-                    pk_name = primary_key['technicalName']
-                    table_id = primary_key["table"]["id"]
-                    table_path = ""
-                    for page in structures:
-                        for table in page:
-                            if table["id"] == table_id:
-                                table_path = table["path"]
-                    for column in primary_key["columns"]:
-                        column_name = column["technicalName"]
-                        pk_order = column["pkOrder"]
-                        pk = {
-                            'tablePath': table_path.replace(source_path, "", 1),
-                            'columnName': column_name,
-                            'pkName': pk_name,
-                            'pkOrder': pk_order
-                        }
-                        pks.append(pk)
-                # FK
-                for foreign_key in foreign_keys:
-                    fk_technical_name = foreign_key['technicalName']
-                    fk_display_name = foreign_key['displayName']
-                    if len(foreign_key['columns']) < 1:
-                        logging.warn(f"FK {fk_technical_name} is a functional relationship, ignoring")
-                        continue
-                    pk_technical_name = foreign_key['primaryKey']['technicalName']
-                    pk_table_id = foreign_key['parents']['structure']['id']
-                    pk_table_path = ""
-                    for page in structures:
-                        for table in page:
-                            if table["id"] == pk_table_id:
-                                pk_table_path = table["path"]
-                    fk_table_id = foreign_key['children']['structure']['id']
-                    fk_table_path = ""
-                    for page in structures:
-                        for table in page:
-                            if table["id"] == fk_table_id:
-                                fk_table_path = table["path"]
-                    parent_columns = foreign_key['parents']['columns']
-                    if len(parent_columns) > 1:
-                        # print("More than 1 column")
-                        continue
-                    for parent_column in parent_columns:
-                        pk_column_name = parent_column['technicalName']
-
-                    children_columns = foreign_key['children']['columns']
-                    if len(children_columns) > 1:
-                        # print("More than 1 column, ignoring this one")
-                        continue
-                    for children_column in children_columns:
-                        fk_column_name = children_column['technicalName']
-                    fk = {
-                        'fkTechnicalName': fk_technical_name,
-                        'pkTechnicalName': pk_technical_name,
-                        'pkTablePath': pk_table_path.replace(source_path, "", 1),
-                        'pkColumnName': pk_column_name,
-                        'fkTablePath': fk_table_path.replace(source_path, "", 1),
-                        'fkColumnName': fk_column_name,
-                        'fkDisplayName': fk_display_name
-                    }
-                    fks.append(fk)
-
-                # create new source to fetch its id
-                new_source_id = target_module_api.create_source(
-                    workspace_name=workspace_target_name,
-                    source=source
-                )
-
-                # bulk upsert source tree
-                target_module_api.bulk_upsert_source_tree(
-                    workspace_name=workspace_target_name,
-                    source=source,
-                    objects=containers + structures + fields,
-                    tag_value=tag_value
-                )
-
-                # create PKs and FKs if they exist
-                if len(pks) > 0:
-                    target_module_api.create_keys(
-                        workspace_name=workspace_target_name,
-                        source_id=new_source_id,
-                        keys=pks,
-                        mode="primary")
-                if len(fks) > 0:
-                    target_module_api.create_keys(
-                        workspace_name=workspace_target_name,
-                        source_id=new_source_id,
-                        keys=fks,
-                        mode="foreign")
+        # The number of sources decides how their children are listed
+        sources = [source for page in source_objects for source in page]
+        source_objects = [sources]
+        if engine == "async":
+            async_client = AsyncHttpClient(http_client)
+            try:
+                async_source_module_api = AsyncDataGalaxyApiModules(
+                    url=url_source, token=token_source, workspace=source_workspace, module=module, http_client=async_client, options=options)
+                async_source_module_api.modules_api.prefetch_children_objects(workspace_source_name, sources)
+                asyncio.run(copy_sources_async(
+                    source_objects,
+                    async_source_module_api,
+                    target_module_api,
+                    async_client,
+                    workspace_source_name,
+                    workspace_target_name,
+                    tag_value,
+                    delta_filter,
+                    state
+                ))
+            finally:
+                async_client.close()
+        else:
+            source_module_api.prefetch_children_objects(workspace_source_name, sources)
+            copy_sources(
+                source_objects,
+                source_module_api,
+                target_module_api,
+                workspace_source_name,
+                workspace_target_name,
+                tag_value,
+                workers,
+                delta_filter,
+                state
+            )
     else:
         # Specific for DPs
         if module == "DataProcessing":
-            handle_dpis(source_objects, source_module_api, workspace_source_name)
+            # The items are listed for the whole version when they fit in the budget, otherwise (sync engine)
+            # they are fetched one page of DPs at a time, while the previous page is uploaded
+            dp_pages = list(source_objects)
+            if index_dpis(dp_pages, source_module_api, workspace_source_name, dpi_index_budget * 1024 * 1024):
+                logging.info('copy-module - DataProcessingItems attached from the version listing')
+                source_objects = consume_pages(dp_pages)
+            elif engine == "async":
+                async_client = AsyncHttpClient(http_client)
+                try:
+                    asyncio.run(handle_dpis_async(
+                        dp_pages,
+                        AsyncDataGalaxyApiModules(url=url_source, token=token_source, workspace=source_workspace, module=module, http_client=async_client,
+                                                  options=options),
+                        workspace_source_name
+                    ))
+                finally:
+                    async_client.close()
+                source_objects = consume_pages(dp_pages)
+            else:
+                source_objects = stream_dpis(dp_pages, source_module_api, workspace_source_name, workers)
+
+        # The fingerprints of a page are recorded once it is uploaded
+        recorder = FingerprintRecorder(state, module) if state is not None else None
+        if delta_filter is not None:
+            source_objects = delta_filter.filter_pages(source_objects, recorder)
 
         # Create objects on target workspace
         target_module_api.bulk_upsert_tree(
             workspace_name=workspace_target_name,
             objects=source_objects,
-            tag_value=tag_value
+            tag_value=tag_value,
+            on_uploaded=recorder.uploaded if recorder is not None else None
         )
 
+    if delta_filter is not None:
+        delta_filter.log_summary('copy-module')
+    if state is not None:
+        state.finish(module)
     return 0
 
 
+# This is specific for the Dictionary module
+def fetch_source_children(source: dict, module_api, workspace_name: str, executor: Optional[ThreadPoolExecutor] = None, stream: bool = False) -> dict:
+    # The reads are independent, with an executor they are sent concurrently
+    # With stream=True, the children are streams of pages, fetched while they are uploaded
+    source_id = source['id']
+    list_children = module_api.iter_children_pages if stream else module_api.list_children_objects
+    reads = {
+        'primary_keys': (module_api.list_keys, workspace_name, source_id, "primary"),
+        'foreign_keys': (module_api.list_keys, workspace_name, source_id, "foreign")
+    }
+    children = {}
+    for object_type in CHILDREN_OBJECT_TYPES:
+        if stream:
+            children[object_type] = list_children(workspace_name, source_id, object_type)
+        else:
+            reads[object_type] = (list_children, workspace_name, source_id, object_type)
+    if executor is None:
+        return {**children, **{key: read[0](*read[1:]) for key, read in reads.items()}}
+    futures = {key: executor.submit(*read) for key, read in reads.items()}
+    return {**children, **{key: future.result() for key, future in futures.items()}}
+
+
+def copy_sources(source_objects: Iterable[list], source_module_api, target_module_api, workspace_source_name: str,
+                 workspace_target_name: str, tag_value: Optional[str], workers: int, delta_filter: Optional[DeltaFilter] = None,
+                 state: Optional[SyncState] = None):
+    # Up to `workers` sources are copied at the same time. The keys of a source are read concurrently,
+    # its children are streamed: a batch is uploaded while the next pages are fetched, so the memory used
+    # depends on the size of the batches and not on the size of the sources.
+    # Writes keep their order for a given source: source, tree, PKs then FKs
+    def copy_source(source):
+        children = fetch_source_children(source, source_module_api, workspace_source_name, reads_executor, stream=True)
+        upload_source(source, children, target_module_api, workspace_target_name, tag_value, delta_filter, state)
+
+    with ThreadPoolExecutor(max_workers=workers * 2, thread_name_prefix='toolbox-read') as reads_executor, \
+            ThreadPoolExecutor(max_workers=workers, thread_name_prefix='toolbox-source') as sources_executor:
+        pending = set()
+        try:
+            for page in source_objects:
+                for source in page:
+                    if len(pending) >= workers * 2:
+                        # Do not queue every source of the workspace at once
+                        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            future.result()
+                    pending.add(sources_executor.submit(copy_source, source))
+            for future in pending:
+                future.result()
+        except BaseException:
+            for future in pending:
+                future.cancel()
+            raise
+
+
+async def fetch_source_children_async(source: dict, module_api, workspace_name: str) -> dict:
+    source_id = source['id']
+    containers, structures, fields, primary_keys, foreign_keys = await asyncio.gather(
+        module_api.list_children_objects(workspace_name, source_id, "containers"),
+        module_api.list_children_objects(workspace_name, source_id, "structures"),
+        module_api.list_children_objects(workspace_name, source_id, "fields"),
+        module_api.list_keys(workspace_name, source_id, "primary"),
+        module_api.list_keys(workspace_name, source_id, "foreign")
+    )
+    return {
+        'containers': containers,
+        'structures': structures,
+        'fields': fields,
+        'primary_keys': primary_keys,
+        'foreign_keys': foreign_keys
+    }
+
+
+def build_keys(source_path: str, structures: list, primary_keys: list, foreign_keys: list, table_paths: Optional[dict] = None):
+    # The paths of the tables are resolved with an index of the structures, built once per source
+    if table_paths is None:
+        table_paths = index_paths(structures)
+    pks = []
+    fks = []
+    # PK
+    for primary_key in primary_keys:
+        pk_name = primary_key['technicalName']
+        table_path = table_paths.get(primary_key["table"]["id"], "")
+        for column in primary_key["columns"]:
+            column_name = column["technicalName"]
+            pk_order = column["pkOrder"]
+            pk = {
+                'tablePath': table_path.replace(source_path, "", 1),
+                'columnName': column_name,
+                'pkName': pk_name,
+                'pkOrder': pk_order
+            }
+            pks.append(pk)
+    # FK
+    for foreign_key in foreign_keys:
+        fk_technical_name = foreign_key['technicalName']
+        fk_display_name = foreign_key['displayName']
+        if len(foreign_key['columns']) < 1:
+            logging.warn(f"FK {fk_technical_name} is a functional relationship, ignoring")
+            continue
+        pk_technical_name = foreign_key['primaryKey']['technicalName']
+        pk_table_path = table_paths.get(foreign_key['parents']['structure']['id'], "")
+        fk_table_path = table_paths.get(foreign_key['children']['structure']['id'], "")
+        parent_columns = foreign_key['parents']['columns']
+        if len(parent_columns) > 1:
+            # print("More than 1 column")
+            continue
+        for parent_column in parent_columns:
+            pk_column_name = parent_column['technicalName']
+
+        children_columns = foreign_key['children']['columns']
+        if len(children_columns) > 1:
+            # print("More than 1 column, ignoring this one")
+            continue
+        for children_column in children_columns:
+            fk_column_name = children_column['technicalName']
+        fk = {
+            'fkTechnicalName': fk_technical_name,
+            'pkTechnicalName': pk_technical_name,
+            'pkTablePath': pk_table_path.replace(source_path, "", 1),
+            'pkColumnName': pk_column_name,
+            'fkTablePath': fk_table_path.replace(source_path, "", 1),
+            'fkColumnName': fk_column_name,
+            'fkDisplayName': fk_display_name
+        }
+        fks.append(fk)
+    return pks, fks
+
+
+def upload_source(source: dict, children: dict, module_api, workspace_name: str, tag_value: Optional[str],
+                  delta_filter: Optional[DeltaFilter] = None, state: Optional[SyncState] = None):
+    # The children are lists or streams of pages: the paths of the structures are indexed while they are uploaded
+    table_paths = {}
+
+    def index_structures(pages):
+        for page in pages:
+            table_paths.update(index_paths([page]))
+            yield page
+
+    # create new source to fetch its id, unless the same source was already created by a previous sync
+    new_source_id = None
+    recorder = None
+    if state is not None:
+        recorder = FingerprintRecorder(state, module_api.module)
+        source_fingerprint = fingerprint(source)
+        if state.fingerprint(module_api.module, source['path']) == source_fingerprint:
+            new_source_id = state.target_id(source['id'])
+    created = new_source_id is None
+    if created:
+        new_source_id = module_api.create_source(
+            workspace_name=workspace_name,
+            source=source
+        )
+        if state is not None:
+            state.record_id(source['id'], new_source_id)
+
+    # bulk upsert source tree (the structures are indexed before the delta filter, for the keys)
+    objects = itertools.chain(children['containers'], index_structures(children['structures']), children['fields'])
+    if delta_filter is not None:
+        objects = delta_filter.filter_pages(objects, recorder)
+    module_api.bulk_upsert_source_tree(
+        workspace_name=workspace_name,
+        source=source,
+        objects=objects,
+        tag_value=tag_value,
+        on_uploaded=recorder.uploaded if recorder is not None else None
+    )
+
+    pks, fks = build_keys(source['path'], [], children['primary_keys'], children['foreign_keys'], table_paths)
+
+    # The keys already written to this source by a previous sync are not sent again
+    keys_fingerprint = content_hash([pks, fks])
+    if state is not None and not created and state.fingerprint('Keys', source['path']) == keys_fingerprint:
+        pks, fks = [], []
+
+    # create PKs and FKs if they exist
+    if len(pks) > 0:
+        module_api.create_keys(
+            workspace_name=workspace_name,
+            source_id=new_source_id,
+            keys=pks,
+            mode="primary")
+    if len(fks) > 0:
+        module_api.create_keys(
+            workspace_name=workspace_name,
+            source_id=new_source_id,
+            keys=fks,
+            mode="foreign")
+
+    # The source and its keys are recorded once the whole source is written
+    if state is not None:
+        recorder.record([(source['path'], source_fingerprint)])
+        state.record_fingerprints('Keys', [(source['path'], keys_fingerprint)])
+
+
+async def copy_sources_async(source_objects: Iterable[list], source_module_api, target_module_api, async_client: AsyncHttpClient,
+                             workspace_source_name: str, workspace_target_name: str, tag_value: Optional[str],
+                             delta_filter: Optional[DeltaFilter] = None, state: Optional[SyncState] = None):
+    # Each source needs 5 concurrent reads, so this is the number of sources that can be fetched at the same time
+    sources_semaphore = asyncio.Semaphore(max(1, async_client.max_concurrency // 5))
+
+    async def copy_source(source):
+        async with sources_semaphore:
+            children = await fetch_source_children_async(source, source_module_api, workspace_source_name)
+            # Writes keep their order for a given source: source, tree, PKs then FKs
+            await async_client.run(upload_source, source, children, target_module_api, workspace_target_name, tag_value, delta_filter, state)
+
+    await asyncio.gather(*[copy_source(source) for page in source_objects for source in page])
+
+
 # This is specific for the DataProcessings module
-def handle_dpis(objects: list, module_api, workspace_name: str):
-    # fetch dataprocessingsitems for each dp in source workspace (but not dataflows)
-    for page in objects:
-        page_index = objects.index(page)
-        for dp in page:
-            if dp['type'] == "DataFlow":
-                # a DataFlow do not have dpi
-                continue
-            dp_index = page.index(dp)
-            items = module_api.list_object_items(workspace_name=workspace_name, parent_id=dp['id'])
-            if len(items) < 1:
-                # no dpi, let's move on to the next one
-                continue
-            for item in items:
-                item_index = items.index(item)
-                # some objects have no summary, and some have a summary but set to "None" which raises an error in the API somehow
-                if "summary" in items[item_index] and items[item_index]['summary'] is None:
-                    items[item_index]['summary'] = ""
-                # for inputs and outputs, property 'path' must be named 'entityPath'
-                if 'inputs' in item:
-                    for input in item['inputs']:
-                        input_index = item['inputs'].index(input)
-                        items[item_index]['inputs'][input_index]['entityPath'] = input['path']
-                else:
-                    items[item_index]['inputs'] = []
-                if 'outputs' in item:
-                    for output in item['outputs']:
-                        output_index = item['outputs'].index(output)
-                        items[item_index]['outputs'][output_index]['entityPath'] = output['path']
-                else:
-                    items[item_index]['outputs'] = []
-                # Mapping some DPI types
-                if item['type'] == "Search":
-                    items[item_index]['type'] = "Lookup"
-                if item['type'] == "ConstantVariable":
-                    # items[item_index]['type'] = "Variable" (temporary)
-                    items[item_index]['type'] = "Undefined"
-                if item['type'] == "Calculation":
-                    # items[item_index]['type'] = "AnalyticalCalculation" (temporary)
-                    items[item_index]['type'] = "Undefined"
-            page[dp_index]['dataProcessingItems'] = items
-        objects[page_index] = page
+def handle_dpis(objects: list, module_api, workspace_name: str, workers: int = 1, progress: Optional[Progress] = None):
+    # fetch dataprocessingsitems for each dp in source workspace (but not dataflows), up to `workers` at the same time
+    dps = [dp for page in objects for dp in page if dp['type'] != "DataFlow"]
+    if progress is None:
+        progress = Progress('handle_dpis', len(dps), 'DPs')
+
+    def list_items(dp):
+        return module_api.list_object_items(workspace_name=workspace_name, parent_id=dp['id'])
+
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='toolbox-dpi')
+    try:
+        # The items come back in the order of the DPs
+        for dp, items in zip(dps, executor.map(list_items, dps)):
+            attach_dpis(dp, items)
+            progress.advance()
+    except BaseException:
+        executor.shutdown(cancel_futures=True)
+        raise
+    executor.shutdown()
+
+
+def stream_dpis(pages: list, module_api, workspace_name: str, workers: int = 1) -> Iterator[list]:
+    # The items of a page of DPs are fetched when the page is about to be uploaded
+    progress = Progress('handle_dpis', sum(1 for page in pages for dp in page if dp['type'] != "DataFlow"), 'DPs')
+    for page in consume_pages(pages):
+        handle_dpis([page], module_api, workspace_name, workers, progress)
+        yield page
+
+
+def consume_pages(pages: list) -> Iterator[list]:
+    # The pages are removed from the list when they are handed over, so that they can be freed once uploaded
+    pages.reverse()
+    while len(pages) > 0:
+        yield pages.pop()
+
+
+def index_dpis(objects: list, module_api, workspace_name: str, max_bytes: int) -> bool:
+    # Attach the items listed for the whole version, returns False if they have to be fetched per DP
+    if max_bytes <= 0:
+        return False
+    dps = [dp for page in objects for dp in page if dp['type'] != "DataFlow"]
+    items_by_dp = module_api.index_object_items(workspace_name, dps, max_bytes)
+    if items_by_dp is None:
+        return False
+    for dp in dps:
+        attach_dpis(dp, items_by_dp[dp['id']])
+    return True
+
+
+async def handle_dpis_async(objects: list, module_api, workspace_name: str):
+    dps = [dp for page in objects for dp in page if dp['type'] != "DataFlow"]
+    all_items = await asyncio.gather(*[module_api.list_object_items(workspace_name=workspace_name, parent_id=dp['id']) for dp in dps])
+    for dp, items in zip(dps, all_items):
+        attach_dpis(dp, items)
+
+
+def attach_dpis(dp: dict, items: list):
+    # The items are normalized with the bulktree (see normalization.py)
+    if len(items) < 1:
+        # no dpi, let's move on to the next one
+        return
+    dp['dataProcessingItems'] = items
 
 
 # Parsers
@@ -283,6 +517,10 @@ def copy_glossary_parse(subparsers):
         '--tag-value',
         type=str,
         help='select tag value to filter objects')
+    copy_glossary_parse.add_argument(
+        '--delta',
+        action='store_true',
+        help='upload only the objects that are missing or different in the target workspace')
 
 
 def copy_dictionary_parse(subparsers):
@@ -328,6 +566,21 @@ def copy_dictionary_parse(subparsers):
         '--tag-value',
         type=str,
         help='select tag value to filter objects')
+    copy_dictionary_parse.add_argument(
+        '--delta',
+        action='store_true',
+        help='upload only the objects that are missing or different in the target workspace')
+    copy_dictionary_parse.add_argument(
+        '--engine',
+        type=str,
+        choices=ENGINES,
+        default="sync",
+        help='engine used to call the API: "async" sends the independent requests concurrently (default: sync)')
+    copy_dictionary_parse.add_argument(
+        '--workers',
+        type=int,
+        default=1,
+        help='number of sources copied in parallel by the sync engine (default: 1)')
 
 
 def copy_dataprocessings_parse(subparsers):
@@ -373,6 +626,23 @@ def copy_dataprocessings_parse(subparsers):
         '--tag-value',
         type=str,
         help='select tag value to filter objects')
+    copy_dataprocessings_parse.add_argument(
+        '--engine',
+        type=str,
+        choices=ENGINES,
+        default="sync",
+        help='engine used to call the API: "async" sends the independent requests concurrently (default: sync)')
+    copy_dataprocessings_parse.add_argument(
+        '--workers',
+        type=int,
+        default=1,
+        help='number of DataProcessings whose items are fetched in parallel by the sync engine (default: 1)')
+    copy_dataprocessings_parse.add_argument(
+        '--dpi-index-budget',
+        type=int,
+        default=256,
+        help='maximum size in MB of the DataProcessingItems listed for the whole version at once, '
+             'beyond which they are listed per DataProcessing, 0 to always list them per DataProcessing (default: 256)')
 
 
 def copy_usages_parse(subparsers):
@@ -418,3 +688,7 @@ def copy_usages_parse(subparsers):
         '--tag-value',
         type=str,
         help='select tag value to filter objects')
+    copy_usages_parse.add_argument(
+        '--delta',
+        action='store_true',
+        help='upload only the objects that are missing or different in the target workspace')
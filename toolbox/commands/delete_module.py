@@ -1,6 +1,6 @@
 from typing import Optional
 
-from toolbox.api.datagalaxy_api_modules import DataGalaxyApiModules
+from toolbox.api.datagalaxy_api_modules import DataGalaxyApiModules, ModulesOptions
 from toolbox.api.datagalaxy_api import find_root_objects
 from toolbox.api.http_client import HttpClient
 from toolbox.commands.utils import config_workspace
@@ -11,7 +11,8 @@ def delete_module(module: str,
                   token: str,
                   workspace_name: str,
                   version_name: Optional[str],
-                  http_client: HttpClient) -> str:
+                  http_client: HttpClient,
+                  options: Optional[ModulesOptions] = None) -> str:
 
     # Workspace
     workspace = config_workspace(
@@ -31,15 +32,18 @@ def delete_module(module: str,
         token=token,
         workspace=workspace,
         module=module,
-        http_client=http_client
+        http_client=http_client,
+        options=options
     )
 
-    # Fetch objects from source workspace
-    objects = module_api.list_objects(workspace_name)
-
-    for page in objects:
+    # Fetch objects from source workspace, the root objects of a page are found while the next one is fetched
+    # Nothing is deleted before the end of the listing, which would otherwise shift the next pages
+    ids_per_page = []
+    for page in module_api.iter_pages(workspace_name):
         root_objects = find_root_objects(page)
-        ids = list(map(lambda object: object['id'], root_objects))
+        ids_per_page.append(list(map(lambda object: object['id'], root_objects)))
+
+    for ids in ids_per_page:
         module_api.delete_objects(
             workspace_name=workspace_name,
             ids=ids
@@ -0,0 +1,217 @@
+import logging
+from typing import Iterable, Iterator, Optional, Tuple
+
+from toolbox.api.datagalaxy_api import iter_batches
+from toolbox.api.datagalaxy_api_modules import CHILDREN_OBJECT_TYPES, DataGalaxyApiModules, ModulesOptions
+from toolbox.api.http_client import HttpClient
+from toolbox.api.snapshot import SnapshotReader, SnapshotWriter
+from toolbox.commands.copy_links import iter_link_pages, parse_links
+from toolbox.commands.copy_module import consume_pages, fetch_source_children, index_dpis, stream_dpis, upload_source
+from toolbox.commands.utils import config_workspace
+
+# In this order, so that the links are created once their objects exist
+SNAPSHOT_MODULES = ["Glossary", "Dictionary", "DataProcessing", "Uses"]
+
+
+def export_workspace(url: str,
+                     token: str,
+                     workspace_name: str,
+                     version_name: Optional[str],
+                     snapshot: str,
+                     http_client: HttpClient,
+                     dpi_index_budget: int = 256,
+                     options: Optional[ModulesOptions] = None) -> int:
+    workspace = config_workspace(
+        mode="source",
+        url=url,
+        token=token,
+        workspace_name=workspace_name,
+        version_name=version_name,
+        http_client=http_client
+    )
+    if not workspace:
+        return 1
+
+    writer = SnapshotWriter(snapshot, {'url': url, 'workspace': workspace_name, 'version': version_name, 'versionId': workspace['versionId']})
+    for module in SNAPSHOT_MODULES:
+        module_api = DataGalaxyApiModules(url=url, token=token, workspace=workspace, module=module, http_client=http_client, options=options)
+        section = writer.section(module)
+        if module == "Dictionary":
+            # Each source is followed by its keys then its children, so that they can be uploaded while they are read
+            sources = [source for page in module_api.iter_pages(workspace_name) for source in page]
+            module_api.prefetch_children_objects(workspace_name, sources)
+            for source in sources:
+                children = fetch_source_children(source, module_api, workspace_name, stream=True)
+                section.write('source', source)
+                section.write('primary_keys', children['primary_keys'])
+                section.write('foreign_keys', children['foreign_keys'])
+                for object_type in CHILDREN_OBJECT_TYPES:
+                    for page in children[object_type]:
+                        section.write(object_type, page)
+        else:
+            pages = module_api.iter_pages(workspace_name)
+            if module == "DataProcessing":
+                # The DPs are written with their items
+                dp_pages = list(pages)
+                if index_dpis(dp_pages, module_api, workspace_name, dpi_index_budget * 1024 * 1024):
+                    pages = consume_pages(dp_pages)
+                else:
+                    pages = stream_dpis(dp_pages, module_api, workspace_name)
+            for page in pages:
+                section.write('objects', page)
+        logging.info(f'export-workspace - {section.objects} objects of module {module} written to {section.path}')
+
+    section = writer.section("Links")
+    for page in iter_link_pages(url, token, workspace, workspace_name, http_client, options):
+        links = [link for obj in page for link in parse_links(obj)]
+        if len(links) > 0:
+            section.write('links', links)
+    logging.info(f'export-workspace - {section.objects} links written to {section.path}')
+
+    # The manifest is written last: an interrupted export cannot be imported
+    writer.close()
+    return 0
+
+
+def import_workspace(url: str,
+                     token: str,
+                     workspace_name: str,
+                     version_name: Optional[str],
+                     snapshot: str,
+                     tag_value: Optional[str],
+                     http_client: HttpClient,
+                     options: Optional[ModulesOptions] = None) -> int:
+    reader = SnapshotReader(snapshot)
+    manifest = reader.manifest
+    logging.info(f'import-workspace - snapshot of workspace {manifest["workspace"]} (version {manifest["versionId"]}) '
+                 f'exported at {manifest["exportedAt"]}')
+
+    workspace = config_workspace(
+        mode="target",
+        url=url,
+        token=token,
+        workspace_name=workspace_name,
+        version_name=version_name,
+        http_client=http_client
+    )
+    if not workspace:
+        return 1
+
+    for module in SNAPSHOT_MODULES:
+        if reader.sections.get(module, {}).get('objects', 0) < 1:
+            logging.info(f'import-workspace - no object of module {module} in the snapshot')
+            continue
+        module_api = DataGalaxyApiModules(url=url, token=token, workspace=workspace, module=module, http_client=http_client, options=options)
+        if module == "Dictionary":
+            for source, children in read_sources(reader.records(module)):
+                upload_source(source, children, module_api, workspace_name, tag_value)
+        else:
+            module_api.bulk_upsert_tree(
+                workspace_name=workspace_name,
+                objects=(page for _, page in reader.records(module)),
+                tag_value=tag_value
+            )
+        logging.info(f'import-workspace - {reader.sections[module]["objects"]} objects of module {module} imported')
+
+    if reader.sections.get("Links", {}).get('objects', 0) > 0:
+        links_api = DataGalaxyApiModules(url=url, token=token, workspace=workspace, module="Links", http_client=http_client, options=options)
+        links_api.bulk_create_links(workspace_name=workspace_name, links=iter_batches(links for _, links in reader.records("Links")))
+        logging.info(f'import-workspace - {reader.sections["Links"]["objects"]} links imported')
+    return 0
+
+
+def read_sources(records: Iterable[tuple]) -> Iterator[Tuple[dict, dict]]:
+    # The children of a source are streams of pages, read from the snapshot while they are uploaded
+    records = iter(records)
+    current = next(records, None)
+
+    def pages(record_type: str):
+        # The children are written by type, in the order of CHILDREN_OBJECT_TYPES: the previous types left unread are skipped
+        nonlocal current
+        previous_types = CHILDREN_OBJECT_TYPES[:CHILDREN_OBJECT_TYPES.index(record_type)]
+        while current is not None and current[0] in previous_types:
+            current = next(records, None)
+        while current is not None and current[0] == record_type:
+            yield current[1]
+            current = next(records, None)
+
+    while current is not None:
+        if current[0] != 'source':
+            # Children left unread by the previous source
+            current = next(records, None)
+            continue
+        source = current[1]
+        current = next(records, None)
+        keys = {'primary_keys': [], 'foreign_keys': []}
+        while current is not None and current[0] in keys:
+            keys[current[0]] = current[1]
+            current = next(records, None)
+        yield source, {**{object_type: pages(object_type) for object_type in CHILDREN_OBJECT_TYPES}, **keys}
+
+
+def export_workspace_parse(subparsers):
+    # create the parser for the "export_workspace" command
+    export_workspace_parse = subparsers.add_parser('export-workspace', help='export-workspace help')
+    export_workspace_parse.add_argument(
+        '--url',
+        type=str,
+        help='url environnement',
+        required=True)
+    export_workspace_parse.add_argument(
+        '--token',
+        type=str,
+        help='token',
+        required=True)
+    export_workspace_parse.add_argument(
+        '--workspace',
+        type=str,
+        help='workspace name',
+        required=True)
+    export_workspace_parse.add_argument(
+        '--version',
+        type=str,
+        help='version name')
+    export_workspace_parse.add_argument(
+        '--snapshot',
+        type=str,
+        help='directory of the snapshot',
+        required=True)
+    export_workspace_parse.add_argument(
+        '--dpi-index-budget',
+        type=int,
+        default=256,
+        help='maximum size in MB of the DataProcessingItems listed for the whole version at once, '
+             'beyond which they are listed per DataProcessing, 0 to always list them per DataProcessing (default: 256)')
+
+
+def import_workspace_parse(subparsers):
+    # create the parser for the "import_workspace" command
+    import_workspace_parse = subparsers.add_parser('import-workspace', help='import-workspace help')
+    import_workspace_parse.add_argument(
+        '--url',
+        type=str,
+        help='url environnement',
+        required=True)
+    import_workspace_parse.add_argument(
+        '--token',
+        type=str,
+        help='token',
+        required=True)
+    import_workspace_parse.add_argument(
+        '--workspace',
+        type=str,
+        help='workspace name',
+        required=True)
+    import_workspace_parse.add_argument(
+        '--version',
+        type=str,
+        help='version name')
+    import_workspace_parse.add_argument(
+        '--snapshot',
+        type=str,
+        help='directory of the snapshot',
+        required=True)
+    import_workspace_parse.add_argument(
+        '--tag-value',
+        type=str,
+        help='select tag value to filter objects')
@@ -1,4 +1,5 @@
 import logging
+import time
 from typing import Optional
 from toolbox.api.datagalaxy_api_workspaces import DataGalaxyApiWorkspace
 from toolbox.api.http_client import HttpClient
@@ -30,3 +31,30 @@ def config_workspace(mode: str, url: str, token: str, workspace_name: str, versi
             workspace['versionId'] = version['versionId']
             logging.info(f'config_workspace - Found version {version_name} with id {version["versionId"]} for {mode} workspace {workspace_name}')
     return workspace
+
+
+class Progress:
+    """
+    Logs the progress of a long operation (done / total and rate per second), at most every `interval` seconds.
+    """
+
+    def __init__(self, name: str, total: int, unit: str, interval: float = 10, clock=time.monotonic):
+        self.name = name
+        self.total = total
+        self.unit = unit
+        self.interval = interval
+        self.done = 0
+        self._clock = clock
+        self._start = clock()
+        self._last_log = self._start
+
+    def advance(self, count: int = 1):
+        self.done += count
+        now = self._clock()
+        if now - self._last_log >= self.interval or self.done == self.total:
+            self._last_log = now
+            logging.info(f'{self.name} - {self.done}/{self.total} {self.unit} ({self.rate():.1f} {self.unit}/s)')
+
+    def rate(self) -> float:
+        elapsed = self._clock() - self._start
+        return self.done / elapsed if elapsed > 0 else 0.0